@@ -0,0 +1,131 @@
+"""
+Shared helpers for the offline benchmark suite.
+
+Every benchmark runs against the stub LLM provider, inside a throwaway
+working directory (nodes write output/ and sandbox_env/ relative to cwd).
+"""
+
+import contextlib
+import json
+import math
+import os
+import statistics
+import tempfile
+import time
+from typing import Callable, Dict, Iterator, List, Optional
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "stub_responses.json")
+
+
+def install_stub(latency: float = 0.0, jitter: float = 0.0, fixture: str = FIXTURE, **stub_options):
+    """
+    Point every agent at the stub provider and disable the response and
+    prompt-prefix caches.
+
+    The recorded frontend/backend responses store some files as nested
+    objects ({"code": ...} or a parsed package.json). They are flattened to
+    {path: text} here so the sandbox and exporter see what the agents expect.
+    """
+    from src.utils import llm_helper
+    from src.utils.llm_providers import StubChatModel
+    from src.utils.prefix_cache import PrefixCache
+
+    stub = StubChatModel.from_file(fixture, latency=latency, jitter=jitter, **stub_options)
+    for rule in stub.rules:
+        response = rule.get("response")
+        if isinstance(response, dict) and "api_spec" not in response:
+            rule["response"] = {path: _as_text(content) for path, content in response.items()}
+
+    llm_helper.llm = stub
+    llm_helper.MODEL_NAME = stub.model_name
+    llm_helper.llm_cache = None
+    llm_helper.prefix_cache = PrefixCache()
+    return stub
+
+
+def _as_text(content) -> str:
+    if isinstance(content, dict) and isinstance(content.get("code"), str):
+        return content["code"]
+    if isinstance(content, (dict, list)):
+        return json.dumps(content, indent=2)
+    return str(content)
+
+
+def initial_state(story: str = "Build a simple To-Do List app.") -> dict:
+    return {
+        "user_story": story,
+        "iteration_count": 0,
+        "messages": [],
+        "api_spec": "",
+        "architecture_plan": "",
+        "frontend_files": {},
+        "backend_files": {},
+        "infra_files": {},
+        "human_feedback": "",
+        "structured_errors": [],
+    }
+
+
+@contextlib.contextmanager
+def workdir() -> Iterator[str]:
+    """Run the body inside a temporary working directory."""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as path:
+        os.chdir(path)
+        try:
+            yield path
+        finally:
+            os.chdir(cwd)
+
+
+@contextlib.contextmanager
+def quiet(enabled: bool = True) -> Iterator[None]:
+    """Silence the agents' console logging while timing."""
+    if not enabled:
+        yield
+        return
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile (pct in 0..100)."""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def measure(fn: Callable[[], object], repeat: int = 10, warmup: int = 1) -> Dict[str, float]:
+    """Time fn() `repeat` times and return p50/p95/mean in milliseconds."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return {
+        "n": len(samples),
+        "p50": percentile(samples, 50),
+        "p95": percentile(samples, 95),
+        "mean": statistics.fmean(samples),
+    }
+
+
+def print_report(title: str, rows: Dict[str, Dict[str, float]], out: Optional[str] = None) -> None:
+    """Print a p50/p95 table and optionally append it as JSON lines to `out`."""
+    width = max([len(name) for name in rows] + [9])
+    print(f"\n[BENCH] {title}")
+    print(f"   {'benchmark':<{width}}  {'n':>4}  {'p50 ms':>10}  {'p95 ms':>10}  {'mean ms':>10}")
+    for name, stats in rows.items():
+        print(
+            f"   {name:<{width}}  {stats['n']:>4}  {stats['p50']:>10.2f}  "
+            f"{stats['p95']:>10.2f}  {stats['mean']:>10.2f}"
+        )
+
+    if out:
+        with open(out, "a", encoding="utf-8") as f:
+            for name, stats in rows.items():
+                f.write(json.dumps({"suite": title, "benchmark": name, **stats}) + "\n")
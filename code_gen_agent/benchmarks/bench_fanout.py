@@ -0,0 +1,118 @@
+"""
+Wall-clock time per LangGraph superstep, sync vs async.
+
+Uses the stub LLM provider with a fixed per-call latency, then runs the pipeline up to the reflector interrupt three ways:
+
+- sequential: the node functions called one after another (blocking calls,
+  no overlap at all)
+- sync: graph.stream, where LangGraph runs a superstep's tasks on a thread pool
+- async: graph.astream, where the builders await ainvoke_llm_json on one loop
+
+The fan-out superstep (frontend/backend/infra) is where the difference shows.
+
+Usage (from code_gen_agent/):
+    python -m benchmarks.bench_fanout --latency 1.0
+"""
+
+import argparse
+import asyncio
+import time
+from collections import defaultdict
+
+from benchmarks._harness import initial_state, install_stub, quiet, workdir
+
+
+class StepTimer:
+    """Collect start/end timestamps per superstep from debug stream events."""
+
+    def __init__(self):
+        self.start = {}
+        self.end = {}
+        self.nodes = defaultdict(list)
+
+    def record(self, event: dict) -> None:
+        if not isinstance(event, dict) or event.get("type") not in ("task", "task_result"):
+            return
+        step = event.get("step")
+        now = time.perf_counter()
+        if event["type"] == "task":
+            self.start.setdefault(step, now)
+            self.nodes[step].append(event.get("payload", {}).get("name", "?"))
+        else:
+            self.end[step] = now
+
+    def rows(self):
+        for step in sorted(self.start):
+            if step in self.end:
+                yield step, ",".join(self.nodes[step]), self.end[step] - self.start[step]
+
+
+def run_sync(graph, story: str) -> StepTimer:
+    timer = StepTimer()
+    config = {"configurable": {"thread_id": "bench-sync"}}
+    for event in graph.stream(initial_state(story), config=config, stream_mode="debug"):
+        timer.record(event)
+    return timer
+
+
+async def run_async(graph, story: str) -> StepTimer:
+    timer = StepTimer()
+    config = {"configurable": {"thread_id": "bench-async"}}
+    async for event in graph.astream(initial_state(story), config=config, stream_mode="debug"):
+        timer.record(event)
+    return timer
+
+
+def run_sequential(story: str) -> StepTimer:
+    """Call the nodes back to back, mirroring the graph's supersteps."""
+    from src.agents.architect import architect_node
+    from src.agents.frontend import frontend_node
+    from src.agents.backend import backend_node
+    from src.agents.infra import infra_node
+    from src.agents.sandbox import sandbox_node
+
+    timer = StepTimer()
+    state = initial_state(story)
+    steps = [[architect_node], [frontend_node, backend_node, infra_node], [sandbox_node]]
+    for step, nodes in enumerate(steps, 1):
+        timer.start[step] = time.perf_counter()
+        updates = {}
+        for node in nodes:
+            timer.nodes[step].append(node.__name__.replace("_node", ""))
+            updates.update(node(state))
+        state.update(updates)
+        timer.end[step] = time.perf_counter()
+    return timer
+
+
+def print_table(label: str, timer: StepTimer) -> None:
+    print(f"\n[{label}]")
+    print(f"   {'step':>4}  {'seconds':>8}  nodes")
+    total = 0.0
+    for step, nodes, seconds in timer.rows():
+        total += seconds
+        print(f"   {step:>4}  {seconds:8.3f}  {nodes}")
+    print(f"   {'all':>4}  {total:8.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=1.0, help="Fake LLM latency per call in seconds")
+    parser.add_argument("--story", default="Build a simple To-Do List app.")
+    args = parser.parse_args()
+
+    from src.core.graph import create_graph
+
+    install_stub(latency=args.latency)
+
+    with workdir():
+        with quiet():
+            sequential = run_sequential(args.story)
+            sync = run_sync(create_graph(), args.story)
+            async_ = asyncio.run(run_async(create_graph(), args.story))
+        print_table("sequential nodes", sequential)
+        print_table("sync  graph.stream", sync)
+        print_table("async graph.astream", async_)
+
+if __name__ == "__main__":
+    main()
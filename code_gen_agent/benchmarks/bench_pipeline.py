@@ -0,0 +1,112 @@
+"""
+End-to-end offline benchmark of the AutoDev pipeline.
+
+Runs against the stub LLM provider (recorded responses, configurable
+latency) and reports p50/p95 for:
+
+- graph: a full create_graph() run up to the reflector interrupt
+- node:<name>: each agent node called on its own
+- sandbox: PythonSandbox.save_generated_files + run_tests
+- exporter: CodeExporter.export_by_agent appending one changed file to the run log
+
+Usage (from code_gen_agent/):
+    python -m benchmarks.bench_pipeline --repeat 20 --latency 0.0
+"""
+
+import argparse
+import itertools
+
+from benchmarks._harness import initial_state, install_stub, measure, print_report, quiet, workdir
+
+
+def bench_graph(repeat: int) -> dict:
+    from src.core.graph import create_graph
+
+    app = create_graph()
+    thread_ids = itertools.count()
+
+    def run():
+        config = {"configurable": {"thread_id": f"bench-{next(thread_ids)}"}}
+        app.invoke(initial_state(), config=config)
+
+    return {"graph": measure(run, repeat=repeat)}
+
+
+def bench_nodes(repeat: int) -> dict:
+    from src.agents.architect import architect_node
+    from src.agents.frontend import frontend_node
+    from src.agents.backend import backend_node
+    from src.agents.infra import infra_node
+    from src.agents.sandbox import sandbox_node
+
+    # Build a realistic post-fan-out state once, then time each node on it
+    state = initial_state()
+    state.update(architect_node(state))
+    for node in (frontend_node, backend_node, infra_node):
+        state.update(node(state))
+
+    rows = {}
+    for node in (architect_node, frontend_node, backend_node, infra_node, sandbox_node):
+        rows[f"node:{node.__name__.replace('_node', '')}"] = measure(lambda: node(state), repeat=repeat)
+    return rows, state
+
+
+def bench_sandbox(state: dict, repeat: int) -> dict:
+    from src.utils.blob_store import get_blob_store
+    from src.utils.python_sandbox import PythonSandbox
+
+    store = get_blob_store()
+    files = {key: store.materialize(state[key]) for key in ("frontend_files", "backend_files", "infra_files")}
+
+    def run():
+        sandbox = PythonSandbox(output_dir="sandbox_env")
+        sandbox.save_generated_files(files["frontend_files"], files["backend_files"], files["infra_files"])
+        sandbox.run_tests()
+
+    return {"sandbox": measure(run, repeat=repeat)}
+
+
+def bench_exporter(state: dict, repeat: int) -> dict:
+    from src.utils.blob_store import get_blob_store
+    from src.utils.code_exporter import CodeExporter
+
+    exporter = CodeExporter(run_id="bench")
+    frontend_files = get_blob_store().materialize(state["frontend_files"])
+    iterations = itertools.count()
+
+    def run():
+        # A repair iteration that changes one file: only that file is appended to the run log
+        iteration = next(iterations)
+        files = dict(frontend_files)
+        if files:
+            path = next(iter(files))
+            files[path] = f"{files[path]}\n// iteration {iteration}\n"
+        exporter.export_by_agent("frontend", files, metadata={"iteration": iteration})
+
+    return {"exporter": measure(run, repeat=repeat)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10, help="Timed iterations per benchmark")
+    parser.add_argument("--latency", type=float, default=0.0, help="Stub LLM latency per call in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random stub latency in seconds")
+    parser.add_argument("--out", help="Append results as JSON lines to this file")
+    parser.add_argument("--verbose", action="store_true", help="Keep the agents' console output")
+    args = parser.parse_args()
+
+    install_stub(latency=args.latency, jitter=args.jitter)
+
+    rows = {}
+    with workdir(), quiet(not args.verbose):
+        rows.update(bench_graph(args.repeat))
+        node_rows, state = bench_nodes(args.repeat)
+        rows.update(node_rows)
+        rows.update(bench_sandbox(state, args.repeat))
+        rows.update(bench_exporter(state, args.repeat))
+
+    print_report(f"pipeline (stub latency={args.latency}s)", rows, out=args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Cost and latency of the builder calls with and without prompt-prefix caching.
+
+Replays one project offline: the frontend, backend and infra generation
+calls, then several repair iterations of the frontend and backend. Every
+call shares its agent's stable prefix (system prompt + API contract + plan)
+and differs only in the delta. The stub model charges extra latency per
+uncached prompt token and reports cache reads, and the simulated prefix
+cache stands in for Gemini context caching.
+
+Usage (from code_gen_agent/):
+    python -m benchmarks.bench_prefix_cache --iterations 5 --input-latency 0.05
+"""
+
+import argparse
+import json
+import os
+import time
+
+from benchmarks._harness import install_stub, quiet
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def _calls(iterations: int):
+    """(agent, system prompt, user prompt) for one generation pass plus repairs."""
+    from src.agents.infra import INFRA_PROMPT
+    from src.prompts.fix_templates import full_repair_prompt
+    from src.prompts.system_prompts import BACKEND_PROMPT, FRONTEND_PROMPT
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with open(os.path.join(root, "backend.json"), "r", encoding="utf-8") as f:
+        backend_files = {path: json.dumps(code) if not isinstance(code, str) else code for path, code in json.load(f).items()}
+
+    calls = [
+        ("frontend", FRONTEND_PROMPT, "Generate a React app for the API Contract above."),
+        ("backend", BACKEND_PROMPT, "Generate a FastAPI app for the API Contract above."),
+        ("infra", INFRA_PROMPT, "Generate Docker config for the system described above."),
+    ]
+    for i in range(iterations):
+        errors = [{"agent": "backend", "instruction": f"Fix failing check #{i} in the todo routes"}]
+        calls.append(("backend", BACKEND_PROMPT, full_repair_prompt(backend_files, errors)))
+        calls.append(("frontend", FRONTEND_PROMPT, f"Fix UI issue #{i}: the list does not refresh after adding a todo."))
+    return calls
+
+
+def run(mode: str, iterations: int) -> dict:
+    from src.utils import llm_helper
+    from src.utils.prefix_cache import PrefixCache, SimulatedPrefixCache, shared_context
+    from src.utils.telemetry import cost_usd
+    from src.utils.usage import track_usage
+
+    with open(os.path.join(FIXTURES, "architect.json"), "r", encoding="utf-8") as f:
+        context = shared_context(json.load(f))
+
+    llm_helper.prefix_cache = SimulatedPrefixCache() if mode == "cached" else PrefixCache()
+    started = time.perf_counter()
+    with track_usage() as usage, quiet():
+        for agent, system_prompt, user_prompt in _calls(iterations):
+            llm_helper.invoke_llm_json(system_prompt, user_prompt, agent=agent, context=context)
+    elapsed = time.perf_counter() - started
+    return {
+        "calls": usage["calls"],
+        "input_tokens": usage["input_tokens"],
+        "cached_input_tokens": usage["cached_input_tokens"],
+        "cost_usd": cost_usd(usage["input_tokens"], usage["output_tokens"], usage["cached_input_tokens"]),
+        "seconds": elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=5, help="Repair iterations after the first generation")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fixed stub latency per call in seconds")
+    parser.add_argument("--input-latency", type=float, default=0.05, help="Stub seconds per 1000 uncached prompt tokens")
+    args = parser.parse_args()
+
+    install_stub(latency=args.latency, input_latency_per_1k=args.input_latency)
+
+    print(f"\n[BENCH] Prompt-prefix caching ({args.iterations} repair iterations)")
+    print(f"   {'mode':<10}{'calls':>7}{'input tok':>11}{'cached':>9}{'cost $':>10}{'seconds':>9}")
+    for mode in ("uncached", "cached"):
+        r = run(mode, args.iterations)
+        print(f"   {mode:<10}{r['calls']:>7}{r['input_tokens']:>11}{r['cached_input_tokens']:>9}"
+              f"{r['cost_usd']:>10.4f}{r['seconds']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,7 +11,7 @@ def architect_node(state: GraphState):
     user_story = state["user_story"]
     
     # Call LLM
-    output = invoke_llm_json(ARCHITECT_PROMPT, f"User Story: {user_story}")
+    output = invoke_llm_json(ARCHITECT_PROMPT, f"User Story: {user_story}", agent="architect")
     
     api_spec = output.get("api_spec", "{}")
     plan = output.get("architecture_plan", "No plan generated")
@@ -1,37 +1,38 @@
-import json
+from typing import Optional
 from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableConfig
 from src.core.state import GraphState
-from src.utils.llm_helper import invoke_llm_json, print_message_event
-from src.utils.code_exporter import CodeExporter
+from src.utils.llm_helper import print_message_event
+from src.utils.code_exporter import CodeExporter, run_id_from_config
+from src.utils.blob_store import get_blob_store
 from src.prompts.system_prompts import BACKEND_PROMPT
+from src.utils.prefix_cache import shared_context
+from src.agents.repair import plan_generation, plan_repair, execute_plan, aexecute_plan, files_update
 
-def backend_node(state: GraphState):
+def _build_plan(state: GraphState):
     print("\n" + "="*60)
     print("⚙️  BACKEND: Generating FastAPI Code")
     print("="*60)
     
-    api_spec = state["api_spec"]
     errors = state.get("structured_errors", [])
     
     my_errors = [e for e in errors if e['agent'] == 'backend']
     
     if not my_errors:
         print("📝 Mode: Initial Code Generation")
-        user_prompt = f"Generate a FastAPI app for this API: {api_spec}"
+        plan = plan_generation("Generate a FastAPI app for the API Contract above.")
     else:
         print(f"🔧 Mode: Fixing {len(my_errors)} error(s)")
-        current_code = state.get("backend_files", {})
-        user_prompt = (
-            f"Here is your previous code: {json.dumps(current_code)}\n"
-            f"Here are the errors you must fix: {json.dumps(my_errors)}\n"
-            f"Return the full corrected code."
-        )
-    
-    files = invoke_llm_json(BACKEND_PROMPT, user_prompt)
-    
-    # 4. Export to JSON
+        current_code = get_blob_store().materialize(state.get("backend_files", {}))
+        plan = plan_repair(current_code, my_errors, agent="backend")
+    # API contract + plan form the cacheable prompt prefix shared by every call
+    plan["context"] = shared_context(state)
+    return plan, my_errors
+
+def _finish(state: GraphState, files: dict, my_errors: list, config: Optional[RunnableConfig] = None):
+    # 4. Append the changed files to the thread's run log
     if files:
-        exporter = CodeExporter()
+        exporter = CodeExporter(run_id=run_id_from_config(config))
         metadata = {
             "user_story": state.get("user_story", ""),
             "iteration": state.get("iteration_count", 0),
@@ -39,10 +40,21 @@ def backend_node(state: GraphState):
         }
         exporter.export_by_agent("backend", files, metadata=metadata)
     
-    ai_msg = AIMessage(content="Backend code generated/updated.")
+    ai_msg = AIMessage(content="Backend code generated/updated." if files else "Backend generation failed; previous code kept.")
     print_message_event("backend", ai_msg.content, "new_message_added")
     
     return {
-        "backend_files": files,
+        **files_update("backend", state.get("backend_files"), files),
         "messages": [ai_msg]
-    }
\ No newline at end of file
+    }
+
+def backend_node(state: GraphState, config: Optional[RunnableConfig] = None):
+    plan, my_errors = _build_plan(state)
+    files = execute_plan(BACKEND_PROMPT, plan, agent="backend")
+    return _finish(state, files, my_errors, config)
+
+async def abackend_node(state: GraphState, config: Optional[RunnableConfig] = None):
+    """Async twin of backend_node used when the graph runs on an event loop."""
+    plan, my_errors = _build_plan(state)
+    files = await aexecute_plan(BACKEND_PROMPT, plan, agent="backend")
+    return _finish(state, files, my_errors, config)
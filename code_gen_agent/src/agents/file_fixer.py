@@ -0,0 +1,150 @@
+"""
+Per-file repair: one LLM call per broken file.
+
+When every error of an agent points at files that already exist, the router
+sends one "fix_file" task per file (a LangGraph Send) instead of re-running
+the whole agent. The tasks run in parallel; each sends only its own file and
+returns only the paths it changed, which the merge_files reducer folds back
+into the agent's manifest. Errors that name no existing file still go to the
+agent node, which repairs or regenerates its whole output.
+"""
+
+import os
+from typing import Dict, List, Optional
+
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.types import Send
+
+from src.core.state import GraphState
+from src.utils.blob_store import get_blob_store
+from src.utils.code_exporter import CodeExporter, run_id_from_config
+from src.utils.llm_helper import print_message_event
+from src.utils.patching import select_target_files
+from src.utils.prefix_cache import shared_context
+from src.prompts.system_prompts import FRONTEND_PROMPT, BACKEND_PROMPT
+from src.prompts.fix_templates import patch_repair_prompt
+from src.agents.infra import INFRA_PROMPT
+from src.agents.repair import execute_plan, aexecute_plan, full_repair_plan
+
+SYSTEM_PROMPTS = {"frontend": FRONTEND_PROMPT, "backend": BACKEND_PROMPT, "infra": INFRA_PROMPT}
+
+# More broken files than this is closer to a rewrite; let the agent node handle it
+MAX_FILE_TASKS = 8
+
+
+def group_errors_by_file(manifest: Dict[str, str], errors: List[Dict]) -> Optional[Dict[str, List[Dict]]]:
+    """
+    Assign each error to the existing files it refers to.
+
+    Returns:
+        {path: [errors]}, or None if some error matches no file (or too many
+        files are involved) and the agent has to run as a whole
+    """
+    if os.getenv("AUTODEV_REPAIR_MODE", "patch").strip().lower() != "patch":
+        return None
+    groups: Dict[str, List[Dict]] = {}
+    for error in errors:
+        targets = select_target_files(manifest, [error])
+        if not targets:
+            return None
+        for path in targets:
+            groups.setdefault(path, []).append(error)
+    if not groups or len(groups) > MAX_FILE_TASKS:
+        return None
+    return groups
+
+
+def file_fix_sends(state: GraphState, agent: str, errors: List[Dict]) -> Optional[List[Send]]:
+    """One Send("fix_file", task) per affected file, or None to run the whole agent."""
+    manifest = state.get(f"{agent}_files") or {}
+    groups = group_errors_by_file(manifest, errors)
+    if groups is None:
+        return None
+    return [
+        Send("fix_file", {
+            "agent": agent,
+            "path": path,
+            "errors": file_errors,
+            "files": manifest,
+            "api_spec": state.get("api_spec", ""),
+            "architecture_plan": state.get("architecture_plan", ""),
+            "iteration": state.get("iteration_count", 0),
+        })
+        for path, file_errors in groups.items()
+    ]
+
+
+def _build_plan(task: Dict) -> Dict:
+    agent, path, errors = task["agent"], task["path"], task["errors"]
+    print(f"🔧 {agent.upper()}: Fixing {path} ({len(errors)} error(s))")
+    current = {path: get_blob_store().resolve(task["files"][path])}
+    others = [p for p in task["files"] if p != path]
+    full = full_repair_plan(current, errors, agent, relevant=[path])
+    return {
+        "prompt": patch_repair_prompt(current, others, full["errors"]),
+        "patch": True,
+        "current": current,
+        "keep_deletions": True,
+        "fallback": full["prompt"],
+        "context": shared_context(task),
+    }
+
+
+def _deletes(value) -> bool:
+    """True for a reply value that removes its file: None or {"delete": true}."""
+    return value is None or (isinstance(value, dict) and bool(value.get("delete")))
+
+
+def _finish(task: Dict, files: Dict, config: Optional[RunnableConfig] = None) -> Dict:
+    agent, path = task["agent"], task["path"]
+    files = dict(files or {})
+    # Other existing files may be repaired by parallel tasks; only this one is ours
+    foreign = [p for p in files if p != path and p in task["files"]]
+    if foreign:
+        print(f"[WARN] Ignoring edits to {', '.join(foreign)} from the {path} repair")
+        for p in foreign:
+            files.pop(p)
+
+    # Deleting a path the project does not have is a no-op
+    deleted = [p for p, value in files.items() if _deletes(value)]
+    for p in deleted:
+        files.pop(p)
+    if path in deleted:
+        print(f"[INFO] The {path} repair deletes the file")
+        ai_msg = AIMessage(content=f"{agent.capitalize()} file {path} deleted.")
+        print_message_event(agent, ai_msg.content, "new_message_added")
+        return {
+            f"{agent}_files": {**get_blob_store().put_files(files), path: None},
+            "messages": [ai_msg],
+        }
+
+    if path not in files:
+        # Failed call, unparsable output or a reply for another path: keep the file as it is
+        print(f"[WARN] The {path} repair returned no version of the file; leaving it unchanged")
+        ai_msg = AIMessage(content=f"{agent.capitalize()} file {path} could not be repaired.")
+        print_message_event(agent, ai_msg.content, "new_message_added")
+        return {"messages": [ai_msg]}
+
+    metadata = {"iteration": task.get("iteration", 0), "mode": "file_repair", "path": path}
+    CodeExporter(run_id=run_id_from_config(config)).export_by_agent(agent, files, metadata=metadata, complete=False)
+
+    ai_msg = AIMessage(content=f"{agent.capitalize()} file {path} repaired.")
+    print_message_event(agent, ai_msg.content, "new_message_added")
+    # Only the paths in the reply are updated; nothing else is deleted
+    return {
+        f"{agent}_files": get_blob_store().put_files(files),
+        "messages": [ai_msg],
+    }
+
+
+def fix_file_node(task: Dict, config: Optional[RunnableConfig] = None):
+    """Repair one file; `task` is the payload of a Send from the router."""
+    files = execute_plan(SYSTEM_PROMPTS[task["agent"]], _build_plan(task), agent=f"{task['agent']}:{task['path']}")
+    return _finish(task, files, config)
+
+
+async def afix_file_node(task: Dict, config: Optional[RunnableConfig] = None):
+    """Async twin of fix_file_node used when the graph runs on an event loop."""
+    files = await aexecute_plan(SYSTEM_PROMPTS[task["agent"]], _build_plan(task), agent=f"{task['agent']}:{task['path']}")
+    return _finish(task, files, config)
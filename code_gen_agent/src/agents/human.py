@@ -2,11 +2,12 @@ import os
 from langchain_core.messages import HumanMessage
 from src.core.state import GraphState
 from src.utils.llm_helper import print_message_event
+from src.utils.blob_store import get_blob_store
 
 def save_files(base_path, files_dict):
     """Helper to write dict of files to disk"""
     if not files_dict: return
-    for path, content in files_dict.items():
+    for path, content in get_blob_store().open_files(files_dict).items():
         full_path = os.path.join(base_path, path)
         os.makedirs(os.path.dirname(full_path), exist_ok=True)
         with open(full_path, "w", encoding="utf-8") as f:
@@ -1,7 +1,11 @@
-import json
+from typing import Optional
 from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableConfig
 from src.core.state import GraphState
-from src.utils.llm_helper import invoke_llm_json
+from src.utils.llm_helper import invoke_llm_json, ainvoke_llm_json
+from src.utils.code_exporter import CodeExporter, run_id_from_config
+from src.utils.prefix_cache import shared_context
+from src.agents.repair import files_update
 
 INFRA_PROMPT = """You are a DevOps Engineer.
 Goal: Generate a 'docker-compose.yml' to run the frontend and backend.
@@ -15,18 +19,35 @@ Strict JSON: {"docker-compose.yml": "content...", "frontend/Dockerfile": "...",
 Ensure services are named 'frontend' and 'backend'.
 """
 
-def infra_node(state: GraphState):
+def _build_prompt(state: GraphState) -> str:
     print("--- INFRA: Generating Docker Config ---")
     
-    api_spec = state["api_spec"]
-    # We pass the plan so it knows if it needs a DB
-    plan = state["architecture_plan"]
-    
-    user_prompt = f"Generate Docker config for this system.\nPlan: {plan}\nAPI: {api_spec}"
-    
-    files = invoke_llm_json(INFRA_PROMPT, user_prompt)
-    
+    # The plan (so it knows if it needs a DB) and API spec arrive as the
+    # shared context prefix, see shared_context()
+    prompt = "Generate Docker config for the system described above."
+    my_errors = [e for e in state.get("structured_errors", []) if e.get("agent") == "infra"]
+    if my_errors:
+        print(f"🔧 Mode: Fixing {len(my_errors)} error(s)")
+        fixes = "\n".join(f"- {e.get('instruction', '')}" for e in my_errors)
+        prompt += f"\nThe previous config had these problems, fix them:\n{fixes}"
+    return prompt
+
+def _finish(state: GraphState, files: dict, config: Optional[RunnableConfig] = None):
+    if files:
+        metadata = {"user_story": state.get("user_story", ""), "iteration": state.get("iteration_count", 0)}
+        CodeExporter(run_id=run_id_from_config(config)).export_by_agent("infra", files, metadata=metadata)
     return {
-        "infra_files": files,
-        "messages": [AIMessage(content="Docker configuration generated.")]
-    }
\ No newline at end of file
+        **files_update("infra", state.get("infra_files"), files),
+        "messages": [AIMessage(content="Docker configuration generated." if files else "Docker configuration failed; previous config kept.")]
+    }
+
+def infra_node(state: GraphState, config: Optional[RunnableConfig] = None):
+    user_prompt = _build_prompt(state)
+    files = invoke_llm_json(INFRA_PROMPT, user_prompt, agent="infra", context=shared_context(state))
+    return _finish(state, files, config)
+
+async def ainfra_node(state: GraphState, config: Optional[RunnableConfig] = None):
+    """Async twin of infra_node used when the graph runs on an event loop."""
+    user_prompt = _build_prompt(state)
+    files = await ainvoke_llm_json(INFRA_PROMPT, user_prompt, agent="infra", context=shared_context(state))
+    return _finish(state, files, config)
@@ -1,37 +1,100 @@
+import json
 from src.core.state import GraphState
 from src.utils.llm_helper import invoke_llm_json, print_message_event
+from src.utils.error_classifier import classify_log, classify_sandbox, merge_errors
+from src.utils.convergence import assess, error_fingerprint, files_fingerprint, max_iterations
 from src.prompts.system_prompts import REFLECTOR_PROMPT
 
+
+def _sandbox_summary(state: GraphState) -> dict:
+    """The last sandbox results (older checkpoints stored them as a JSON string)."""
+    raw = state.get("sandbox_logs") or {}
+    if isinstance(raw, str):
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return {}
+    return dict(raw)
+
+
 def reflector_node(state: GraphState):
+    """
+    Turn sandbox results and human feedback into structured errors.
+
+    Mechanical failures (checker errors, tracebacks, JSON/npm errors) are
+    classified by rules in src/utils/error_classifier.py; the LLM is only
+    asked when the feedback contains free-form text the rules cannot explain.
+
+    Each pass also appends a fingerprint of the errors and files to
+    `iteration_history` and records whether the loop should stop, and why,
+    in `stop_reason` (see src/utils/convergence.py).
+    """
     print("\n" + "="*60)
     print("🔍 REFLECTOR: Analyzing Feedback")
     print("="*60)
-    
-    feedback = state.get("human_feedback", "")
+
+    feedback = state.get("human_feedback", "") or ""
     iteration = state.get("iteration_count", 0)
-    
+
     print(f"[INFO] Iteration: {iteration + 1}")
-    
+
     if feedback.lower().strip() in ["success", "done", "looks good"]:
         print("[OK] SUCCESS! Code passed all tests. No errors to fix.")
-        return {"structured_errors": []}
-        
-    # Call LLM to parse the error
-    print("\n[PARSE] Parsing error feedback with AI...")
-    structured_errors = invoke_llm_json(REFLECTOR_PROMPT, f"Log: {feedback}")
-    
-    # Ensure it's a list
-    if not isinstance(structured_errors, list):
-        structured_errors = []
-    
+        return {"structured_errors": [], "stop_reason": "passed"}
+
+    # Fast path: deterministic classification of the sandbox results and logs
+    summary = _sandbox_summary(state)
+    if summary.get("status") == "ERROR":
+        print(f"[ERROR] The sandbox did not run: {summary.get('error', 'unknown error')}")
+    sandbox_errors = classify_sandbox(summary, frontend_paths=(state.get("frontend_files") or {}).keys())
+    log_errors, explained = classify_log(feedback)
+
+    llm_errors = []
+    if feedback.strip() and not explained:
+        # Call LLM to parse the free-form part of the feedback
+        print("\n[PARSE] Parsing error feedback with AI...")
+        llm_errors = invoke_llm_json(REFLECTOR_PROMPT, f"Log: {feedback}", agent="reflector")
+
+        # Ensure it's a list
+        if not isinstance(llm_errors, list):
+            llm_errors = []
+    else:
+        print(f"[OK] Classified {len(sandbox_errors) + len(log_errors)} error(s) by rules, skipping the LLM")
+
+    # Agents whose last LLM call produced nothing kept their old files; ask them again
+    failed_calls = [
+        {"agent": agent, "instruction": f"Your previous response could not be used ({reason}). Return the complete files as a JSON object.", "source": "llm"}
+        for agent, reason in (state.get("agent_errors") or {}).items()
+    ]
+
+    structured_errors = merge_errors(failed_calls, sandbox_errors, log_errors, [e for e in llm_errors if isinstance(e, dict)])
+
     if structured_errors:
         print(f"\n[INFO] Found {len(structured_errors)} error(s) to fix:")
         for i, err in enumerate(structured_errors, 1):
             agent = err.get('agent', 'unknown')
             instruction = err.get('instruction', 'No instruction')[:100]
             print(f"   {i}. [{agent}] {instruction}...")
-    
+
+    history = list(state.get("iteration_history") or [])
+    history.append({
+        "iteration": iteration + 1,
+        "errors": len(structured_errors),
+        "error_fp": error_fingerprint(structured_errors),
+        "files_fp": files_fingerprint(*(state.get(f"{s}_files") or {} for s in ("frontend", "backend", "infra"))),
+    })
+    budget = state.get("iteration_budget") or max_iterations()
+    # Without errors the run only passed if the sandbox said so (a crash yields none)
+    stop_reason, new_budget = assess(history, iteration + 1, budget, sandbox_status=summary.get("status", ""))
+    if new_budget > budget:
+        print(f"[INFO] Error count falling ({' -> '.join(str(h['errors']) for h in history[-3:])}), repair budget raised to {new_budget}")
+    if stop_reason and stop_reason != "passed":
+        print(f"[WARN] Stopping the repair loop: {stop_reason}")
+
     return {
         "structured_errors": structured_errors,
-        "iteration_count": iteration + 1
-    }
\ No newline at end of file
+        "iteration_count": iteration + 1,
+        "iteration_history": history,
+        "iteration_budget": new_budget,
+        "stop_reason": stop_reason,
+    }
@@ -0,0 +1,148 @@
+"""
+Shared generation/repair flow for the frontend and backend agents.
+
+In repair mode the agents default to patch mode (AUTODEV_REPAIR_MODE=patch):
+only the files the structured errors touch are sent, the LLM answers with
+per-file diffs or replacements, and those are applied to the existing files.
+If no file can be matched to the errors, or a patch does not apply, the
+agent falls back to full regeneration (AUTODEV_REPAIR_MODE=full forces it).
+
+Repair prompts are kept under a per-agent token budget (token_budget.py):
+files the errors refer to are always sent in full; the others are outlined
+or left out of the full regeneration prompt and merged back unchanged
+afterwards.
+"""
+
+import json
+import os
+from typing import Dict, List, Optional
+
+from src.utils.blob_store import get_blob_store
+from src.utils.llm_helper import invoke_llm_json, ainvoke_llm_json
+from src.utils.patching import PatchError, apply_file_patches, select_target_files
+from src.utils.token_budget import budget_for
+from src.utils.usage import estimate_tokens
+from src.prompts.fix_templates import full_repair_prompt, patch_repair_prompt
+
+
+def plan_generation(user_prompt: str) -> Dict:
+    """Plan for an initial generation call."""
+    return {"prompt": user_prompt, "patch": False}
+
+
+def full_repair_plan(current_code: Dict[str, str], errors: List[Dict], agent: str = "", relevant: Optional[List[str]] = None) -> Dict:
+    """
+    Budgeted full regeneration prompt.
+
+    Returns:
+        {"errors", "prompt", "elided"}; "elided" holds the original text of
+        files not sent in full, merged back into the response by execute_plan
+    """
+    budget = budget_for(agent)
+    errors = budget.fit_errors(errors)
+    if relevant is None:
+        relevant = select_target_files(current_code, errors)
+    shown, elided = budget.fit_files(current_code, relevant, reserved=estimate_tokens(json.dumps(errors)))
+    budget.report()
+    # Elided files are unrelated to the errors only when the errors name files
+    prompt = full_repair_prompt(shown, errors, elided=list(elided), unrelated=bool(relevant))
+    return {"errors": errors, "prompt": prompt, "elided": elided}
+
+
+def plan_repair(current_code: Dict[str, str], errors: List[Dict], agent: str = "") -> Dict:
+    """
+    Plan a repair call.
+
+    Returns:
+        {"prompt", "patch", "current", "fallback", "elided"}; "fallback" is
+        the full regeneration prompt used when the patch does not apply.
+    """
+    full = full_repair_plan(current_code, errors, agent)
+    errors = full["errors"]
+    mode = os.getenv("AUTODEV_REPAIR_MODE", "patch").strip().lower()
+
+    targets = select_target_files(current_code, errors) if mode == "patch" else []
+    if not targets:
+        if mode == "patch":
+            print("[INFO] Errors do not name specific files, regenerating everything")
+        return {"prompt": full["prompt"], "patch": False, "elided": full["elided"]}
+
+    print(f"[INFO] Patch mode: sending {len(targets)} of {len(current_code)} file(s)")
+    target_code = {path: current_code[path] for path in targets}
+    others = [path for path in current_code if path not in target_code]
+    return {
+        "prompt": patch_repair_prompt(target_code, others, errors),
+        "patch": True,
+        "current": current_code,
+        "fallback": full["prompt"],
+        "elided": full["elided"],
+    }
+
+
+def _restore_elided(plan: Dict, files: Dict) -> Dict:
+    """Add back files the budget left out of a full regeneration prompt."""
+    elided = plan.get("elided") or {}
+    if not elided or not isinstance(files, dict) or not files:
+        # An empty response stays empty, so the caller keeps the previous files
+        return files
+    return {**{p: text for p, text in elided.items() if p not in files}, **files}
+
+
+def files_update(agent: str, previous: Optional[Dict[str, str]], files: Optional[Dict]) -> Dict:
+    """
+    State update for an agent that regenerated its whole file set.
+
+    An empty response (the LLM call failed after its retries, or the reply
+    was not valid JSON) leaves the previous manifest untouched and records
+    the failure in `agent_errors`, where the reflector picks it up.
+    """
+    if not files:
+        print(f"[ERROR] {agent}: the LLM returned no files; keeping the previous version")
+        return {"agent_errors": {agent: "the LLM call failed or its reply was not valid JSON, so no files were produced"}}
+    return {
+        f"{agent}_files": get_blob_store().replace_files(previous, files),
+        "agent_errors": {agent: None},
+    }
+
+
+def _apply(plan: Dict, response: Dict) -> Optional[Dict[str, str]]:
+    """
+    Apply a patch response, or return None if the full prompt must be used.
+
+    With plan["keep_deletions"] the files the patch deleted come back as
+    {path: None} instead of being left out, for callers that only hold
+    part of the file set.
+    """
+    try:
+        files = apply_file_patches(plan["current"], response)
+    except PatchError as e:
+        print(f"[WARN] Patch rejected ({e}), falling back to full regeneration")
+        return None
+    print(f"[OK] Applied patches to {len(response)} file(s)")
+    if plan.get("keep_deletions"):
+        files.update({path: None for path in plan["current"] if path not in files})
+    return files
+
+
+def execute_plan(system_prompt: str, plan: Dict, agent: str = "") -> Dict:
+    """Run a generation or repair plan and return the resulting {path: text} dict."""
+    response = invoke_llm_json(system_prompt, plan["prompt"], agent=agent, context=plan.get("context", ""))
+    if not plan["patch"]:
+        return _restore_elided(plan, response)
+
+    files = _apply(plan, response)
+    if files is None:
+        files = _restore_elided(plan, invoke_llm_json(system_prompt, plan["fallback"], agent=agent, context=plan.get("context", "")))
+    return files
+
+
+async def aexecute_plan(system_prompt: str, plan: Dict, agent: str = "") -> Dict:
+    """Async variant of execute_plan."""
+    response = await ainvoke_llm_json(system_prompt, plan["prompt"], agent=agent, context=plan.get("context", ""))
+    if not plan["patch"]:
+        return _restore_elided(plan, response)
+
+    files = _apply(plan, response)
+    if files is None:
+        files = _restore_elided(plan, await ainvoke_llm_json(system_prompt, plan["fallback"], agent=agent, context=plan.get("context", "")))
+    return files
@@ -1,9 +1,18 @@
-from typing import List, Literal
+from typing import List, Literal, Union
+from langgraph.types import Send
 from src.core.state import GraphState
+from src.agents.file_fixer import file_fix_sends
+from src.utils.convergence import max_iterations
 
-def route_after_reflection(state: GraphState) -> List[str]:
+def route_after_reflection(state: GraphState) -> List[Union[str, Send]]:
     """
     Determines next steps. Returns a LIST of node names for parallel execution.
+
+    Agents whose errors all name existing files get one Send("fix_file", ...)
+    per file instead of a full agent run (see src/agents/file_fixer.py).
+    The reflector decides when the loop has stopped converging and records
+    it as `stop_reason`; the fixed budget is the fallback for states
+    without one.
     """
     errors = state.get("structured_errors", [])
     
@@ -11,19 +20,27 @@ def route_after_reflection(state: GraphState) -> List[str]:
     if not errors:
         return ["end_node"]
     
-    # If max iterations reached, stop to prevent infinite loops
-    if state.get("iteration_count", 0) > 3:
+    # Not converging (repeated errors, oscillating code) or out of budget
+    if state.get("stop_reason"):
+        print(f"Stopping: {state['stop_reason']}.")
+        return ["end_node"]
+    if state.get("iteration_count", 0) > (state.get("iteration_budget") or max_iterations()):
         print("Max iterations reached. Stopping.")
         return ["end_node"]
     
-    # Determine which agents need to work
-    agents_to_retry = []
-    agent_names = {e.get("agent") for e in errors}
+    # Determine which agents (or which of their files) need to work
+    agents_to_retry: List[Union[str, Send]] = []
     
-    if "frontend" in agent_names:
-        agents_to_retry.append("frontend")
-    if "backend" in agent_names:
-        agents_to_retry.append("backend")
+    for agent in ("frontend", "backend", "infra"):
+        agent_errors = [e for e in errors if e.get("agent") == agent]
+        if not agent_errors:
+            continue
+        sends = file_fix_sends(state, agent, agent_errors)
+        if sends:
+            print(f"[INFO] Routing {agent} errors to {len(sends)} per-file repair(s)")
+            agents_to_retry.extend(sends)
+        else:
+            agents_to_retry.append(agent)
         
     # If reflector hallucinated an unknown agent, default to end
     if not agents_to_retry:
@@ -1,30 +1,70 @@
-import json
-import os
 from datetime import datetime
-from src.core.state import GraphState
+from typing import TYPE_CHECKING, Optional
+from src.core.state import GraphState, SandboxResult
 from src.utils.python_sandbox import PythonSandbox
+from src.utils.blob_store import get_blob_store
+from src.utils.contract_checker import check_contract, contract_mode
 
+if TYPE_CHECKING:
+    from langchain_core.runnables import RunnableConfig
 
-def sandbox_node(state: GraphState):
+
+def sandbox_status(test_results: dict, verbose: bool = False) -> str:
+    """Return "SUCCESS" or "FAILED" for the results of PythonSandbox.run_tests()."""
+    check_errors = [
+        issue
+        for issues in test_results.get("file_checks", {}).values()
+        for issue in issues
+        if issue.get("severity") == "error"
+    ]
+    if test_results.get("backend_syntax_errors"):
+        if verbose:
+            print("[ERROR] Syntax errors found in backend code")
+        return "FAILED"
+    if check_errors:
+        if verbose:
+            print(f"[ERROR] Static checks found {len(check_errors)} error(s)")
+        return "FAILED"
+    if (test_results.get("runtime") or {}).get("status") == "failed":
+        if verbose:
+            print("[ERROR] Backend failed the runtime smoke test")
+        return "FAILED"
+    contract = test_results.get("contract") or {}
+    if contract.get("mode") == "on" and contract.get("errors"):
+        if verbose:
+            print(f"[ERROR] Code does not match the API spec ({len(contract['errors'])} mismatch(es))")
+        return "FAILED"
+    if verbose:
+        print("[SUCCESS] All tests passed")
+    return "SUCCESS"
+
+
+def sandbox_node(state: GraphState, config: "Optional[RunnableConfig]" = None):
     """
     Run generated code in a Python-based sandbox environment.
     Tests syntax and structure without requiring Node.js.
+
+    The directory defaults to sandbox_env/; concurrent runs (batch mode)
+    pass their own via config["configurable"]["sandbox_dir"]. The results
+    are returned as the `sandbox_logs` state field (a SandboxResult).
     """
     print("\n" + "="*60)
     print("[SANDBOX] Testing Generated Code")
     print("="*60)
     
     # Initialize sandbox
-    sandbox = PythonSandbox(output_dir="sandbox_env")
+    configurable = (config or {}).get("configurable", {})
+    sandbox = PythonSandbox(output_dir=configurable.get("sandbox_dir") or "sandbox_env")
     
-    # Save generated files
-    frontend_files = state.get("frontend_files", {})
-    backend_files = state.get("backend_files", {})
-    infra_files = state.get("infra_files", {})
+    # Save generated files (state holds {path: digest}; text is read on demand)
+    store = get_blob_store()
+    frontend_files = store.open_files(state.get("frontend_files", {}))
+    backend_files = store.open_files(state.get("backend_files", {}))
+    infra_files = store.open_files(state.get("infra_files", {}))
     
     if not frontend_files and not backend_files:
-        logs = {"error": "No code generated yet"}
-        return {"sandbox_logs": json.dumps(logs)}
+        logs: SandboxResult = {"status": "ERROR", "error": "No code generated yet"}
+        return {"sandbox_logs": logs}
     
     try:
         # Save files to sandbox
@@ -32,36 +72,43 @@ def sandbox_node(state: GraphState):
         
         # Run validation tests
         print("\n[TESTS] Running validation tests...")
-        test_results = sandbox.run_tests()
+        test_results = sandbox.run_tests(api_spec=state.get("api_spec") or "")
+        mode = contract_mode()
+        if mode != "off":
+            contract = check_contract(state.get("api_spec") or "", frontend_files, backend_files)
+            contract["mode"] = mode
+            test_results["contract"] = contract
+            print(f"[INFO] API contract: {len(contract['errors'])} mismatch(es) in {contract['ms']:.1f} ms")
         
         # Save logs
         sandbox.save_logs(test_results)
         
         # Format logs for display
-        logs_summary = {
+        logs_summary: SandboxResult = {
             "timestamp": test_results.get("timestamp"),
             "backend_syntax_errors": test_results.get("backend_syntax_errors", {}),
             "frontend_ok": test_results.get("frontend_structure_check", {}).get("total_files", 0) > 0,
             "docker_valid": test_results.get("docker_compose_valid", False),
+            "incremental": test_results.get("incremental", {}),
+            "file_checks": test_results.get("file_checks", {}),
         }
+        if "runtime" in test_results:
+            logs_summary["runtime"] = test_results["runtime"]
+        if "contract" in test_results:
+            logs_summary["contract"] = test_results["contract"]
         
         # Check for errors
-        if test_results.get("backend_syntax_errors"):
-            print("[ERROR] Syntax errors found in backend code")
-            logs_summary["status"] = "FAILED"
-        else:
-            print("[SUCCESS] All tests passed")
-            logs_summary["status"] = "SUCCESS"
+        logs_summary["status"] = sandbox_status(test_results, verbose=True)
         
-        return {"sandbox_logs": json.dumps(logs_summary, indent=2)}
+        return {"sandbox_logs": logs_summary}
         
     except Exception as e:
-        error_log = {
-            "error": str(e),
-            "type": type(e).__name__,
+        error_log: SandboxResult = {
+            "status": "ERROR",
+            "error": f"{type(e).__name__}: {e}",
             "timestamp": datetime.now().isoformat()
         }
-        return {"sandbox_logs": json.dumps(error_log, indent=2)}
+        return {"sandbox_logs": error_log}
     finally:
         # Optional: Clean up sandbox (comment out to keep for debugging)
         pass
\ No newline at end of file
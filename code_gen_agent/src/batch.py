@@ -0,0 +1,285 @@
+"""
+Batch mode: run many user stories through one compiled graph.
+
+    python -m src.batch stories.jsonl --out results.jsonl --concurrency 4
+
+Each input line is {"id": ..., "story": ...} (or "user_story"); a bare JSON
+string is also accepted. Stories without an id get one derived from their
+text, so re-running the same file is stable.
+
+Every story runs on its own thread_id ("batch-<id>") with its own sandbox
+directory, in automatic mode: the sandbox -> reflector -> builders loop runs
+until the sandbox passes or the repair budget is spent. One result
+line is appended per story as soon as it finishes. On restart, stories
+that already passed (status SUCCESS) are skipped and the others run again;
+with AUTODEV_CHECKPOINT_DB set, a story that was interrupted mid-run
+resumes from its last checkpoint.
+When the batch finishes, file blobs no checkpoint refers to are deleted.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Set
+
+from dotenv import load_dotenv
+
+from src.utils.telemetry import get_tracer
+from src.utils.usage import track_usage, usage_totals
+
+
+def load_stories(path: str) -> List[Dict[str, str]]:
+    """
+    Read stories from a JSONL file.
+
+    Returns:
+        [{"id": str, "story": str}] in file order; blank lines are skipped
+    """
+    stories = []
+    seen = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"[WARN] {path}:{line_no}: skipping invalid JSON ({e})", file=sys.stderr)
+                continue
+            if isinstance(record, str):
+                record = {"story": record}
+            story = record.get("story") or record.get("user_story") or ""
+            if not story:
+                print(f"[WARN] {path}:{line_no}: skipping line without a story", file=sys.stderr)
+                continue
+            story_id = str(record.get("id") or hashlib.sha1(story.encode("utf-8")).hexdigest()[:12])
+            if story_id in seen:
+                print(f"[WARN] {path}:{line_no}: duplicate id {story_id!r}, skipping", file=sys.stderr)
+                continue
+            seen.add(story_id)
+            stories.append({"id": story_id, "story": story})
+    return stories
+
+
+def completed_ids(results_path: str) -> Set[str]:
+    """
+    Ids recorded as passed (status SUCCESS) in a results file.
+
+    Failed, crashed (ERROR) and unfinished stories are left out so a re-run
+    retries them; a torn last line is ignored.
+    """
+    done = set()
+    if not os.path.exists(results_path):
+        return done
+    with open(results_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+                if result.get("status") == "SUCCESS":
+                    done.add(str(result["id"]))
+            except (json.JSONDecodeError, KeyError, TypeError, AttributeError):
+                continue
+    return done
+
+
+def initial_state(story: str) -> dict:
+    """Graph input for a new story, with the repair loop's bookkeeping reset."""
+    return {
+        "user_story": story,
+        "iteration_count": 0,
+        "messages": [],
+        "api_spec": "",
+        "architecture_plan": "",
+        "frontend_files": {},
+        "backend_files": {},
+        "infra_files": {},
+        "human_feedback": "",
+        "structured_errors": [],
+        "iteration_history": [],
+        "iteration_budget": 0,  # 0 = start from max_iterations()
+        "stop_reason": "",
+        "agent_errors": {},
+    }
+
+
+class BatchRunner:
+    """Run stories concurrently and append one result line per story."""
+
+    def __init__(self, graph, results_path: str, concurrency: int = 4, sandbox_root: str = "batch_sandboxes"):
+        """
+        Args:
+            graph: Compiled AutoDev graph (shared by every story)
+            results_path: JSONL file results are appended to
+            concurrency: Maximum number of stories in flight
+            sandbox_root: Parent directory of the per-story sandboxes
+        """
+        self.graph = graph
+        self.results_path = results_path
+        self.concurrency = max(1, concurrency)
+        self.sandbox_root = sandbox_root
+        self.finished = 0
+        self.failed = 0
+        self.total = 0
+        self.started_at = 0.0
+        self._tokens_at_start = 0
+        self._write_lock = asyncio.Lock()
+
+    def _config(self, story_id: str) -> dict:
+        return {
+            "configurable": {
+                "thread_id": f"batch-{story_id}",
+                "sandbox_dir": os.path.join(self.sandbox_root, story_id),
+            }
+        }
+
+    async def _run_story(self, item: Dict[str, str]) -> dict:
+        config = self._config(item["id"])
+        started = time.perf_counter()
+        with track_usage() as usage, get_tracer().span(item["id"], kind="story"):
+            try:
+                snapshot = await self.graph.aget_state(config)
+                if snapshot.values and snapshot.next:
+                    # Checkpoint from an earlier, interrupted run of this story
+                    if tuple(snapshot.next) == ("reflector",) and "reflector" in self.graph.interrupt_before_nodes:
+                        state = snapshot.values  # already reached the review pause
+                    else:
+                        print(f"[INFO] Resuming {item['id']} at {', '.join(snapshot.next)}", file=sys.stderr)
+                        state = await self.graph.ainvoke(None, config=config)
+                else:
+                    state = await self.graph.ainvoke(initial_state(item["story"]), config=config)
+                error = None
+            except Exception as e:
+                state, error = {}, f"{type(e).__name__}: {e}"
+
+        result = {
+            "id": item["id"],
+            "thread_id": config["configurable"]["thread_id"],
+            "status": "ERROR" if error else (state.get("sandbox_logs") or {}).get("status", "UNKNOWN"),
+            "iterations": state.get("iteration_count", 0),
+            "stop_reason": state.get("stop_reason", ""),
+            "seconds": round(time.perf_counter() - started, 3),
+            "files": {
+                section: len(state.get(f"{section}_files") or {})
+                for section in ("frontend", "backend", "infra")
+            },
+            "usage": usage,
+        }
+        if error:
+            result["error"] = error
+        return result
+
+    async def _record(self, result: dict) -> None:
+        async with self._write_lock:
+            with open(self.results_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(result) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.finished += 1
+            if result["status"] != "SUCCESS":
+                self.failed += 1
+            print(f"[OK] {self.finished}/{self.total} {result['id']}: {result['status']} "
+                  f"({result['seconds']:.1f}s) | {self.throughput_line()}", file=sys.stderr)
+
+    def throughput(self) -> Dict[str, float]:
+        minutes = max(time.perf_counter() - self.started_at, 1e-9) / 60
+        tokens = usage_totals()["total_tokens"] - self._tokens_at_start
+        return {
+            "stories_per_min": self.finished / minutes,
+            "tokens_per_min": tokens / minutes,
+            "tokens": tokens,
+            "minutes": minutes,
+        }
+
+    def throughput_line(self) -> str:
+        t = self.throughput()
+        return f"{t['stories_per_min']:.2f} stories/min, {t['tokens_per_min']:,.0f} tokens/min"
+
+    async def run(self, stories: List[Dict[str, str]]) -> Dict[str, float]:
+        """
+        Run every story not yet in the results file.
+
+        Returns:
+            Throughput figures for this invocation
+        """
+        done = completed_ids(self.results_path)
+        pending = [s for s in stories if s["id"] not in done]
+        if done:
+            print(f"[INFO] Skipping {len(stories) - len(pending)} stories that already passed in {self.results_path}", file=sys.stderr)
+        self.total = len(pending)
+        self.started_at = time.perf_counter()
+        self._tokens_at_start = usage_totals()["total_tokens"]
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def worker(item):
+            async with semaphore:
+                result = await self._run_story(item)
+                await self._record(result)
+
+        await asyncio.gather(*(worker(item) for item in pending))
+        return self.throughput()
+
+
+def collect_garbage(checkpointer) -> None:
+    """
+    Delete the file blobs no checkpoint refers to any more.
+
+    A SQLite checkpointer is pruned first (old checkpoints, WAL), which
+    collects the blobs itself.
+    """
+    from src.core.checkpointer import collect_blob_garbage
+
+    try:
+        # LangGraph's own savers have a prune() with another signature
+        if hasattr(checkpointer, "prune_thread"):
+            checkpointer.prune()
+        else:
+            collect_blob_garbage(checkpointer)
+    except Exception as e:
+        print(f"[WARN] Blob garbage collection failed: {e}", file=sys.stderr)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run a JSONL file of user stories through AutoDev.")
+    parser.add_argument("stories", help="JSONL file: one {\"id\", \"story\"} object per line")
+    parser.add_argument("--out", default="batch_results.jsonl", help="Results JSONL (appended to; enables resume)")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("AUTODEV_BATCH_CONCURRENCY", "4")),
+                        help="Stories run at the same time (default: AUTODEV_BATCH_CONCURRENCY or 4)")
+    parser.add_argument("--sandbox-root", default="batch_sandboxes", help="Parent directory of per-story sandboxes")
+    parser.add_argument("--verbose", action="store_true", help="Keep the agents' console output")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    from src.core.graph import create_graph
+
+    stories = load_stories(args.stories)
+    graph = create_graph(auto=True)
+    runner = BatchRunner(graph, args.out, concurrency=args.concurrency, sandbox_root=args.sandbox_root)
+
+    # Agent logs interleave unreadably at concurrency > 1; progress goes to stderr
+    # One trace for the whole batch; its span summary is printed at the end
+    with get_tracer().run("batch", stories=len(stories)):
+        with open(os.devnull, "w") as devnull:
+            with contextlib.redirect_stdout(sys.stdout if args.verbose else devnull):
+                stats = asyncio.run(runner.run(stories))
+
+    print(f"[OK] Batch finished: {runner.finished} stories ({runner.failed} not SUCCESS) in "
+          f"{stats['minutes']:.1f} min | {stats['stories_per_min']:.2f} stories/min, "
+          f"{stats['tokens_per_min']:,.0f} tokens/min ({stats['tokens']:,} tokens)")
+
+    from src.utils import llm_helper
+    if llm_helper.rate_limiter is not None:
+        waits = llm_helper.rate_limiter.stats()
+        print(f"[INFO] Rate limiter queue wait: mean {waits['wait_mean_s']:.2f}s, "
+              f"p95 {waits['wait_p95_s']:.2f}s, max {waits['wait_max_s']:.2f}s over {waits['acquired']} calls")
+    collect_garbage(graph.checkpointer)
+    return 1 if runner.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+"""
+Checkpointer selection for the LangGraph workflow.
+
+By default threads live in an in-memory MemorySaver. Setting
+AUTODEV_CHECKPOINT_DB to a file path switches to a SQLite database in WAL
+mode, so paused threads survive restarts and history stays out of the heap.
+
+SQLite checkpoints are zlib-compressed and each thread keeps only its most
+recent AUTODEV_CHECKPOINT_KEEP checkpoints (default 20). Pruning the whole
+database also deletes the file blobs (src/utils/blob_store.py) that no
+remaining checkpoint refers to.
+"""
+
+import asyncio
+import os
+import sqlite3
+import zlib
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.types import Send
+
+from src.utils.blob_store import BlobStore, get_blob_store
+
+try:
+    # pip install langgraph-checkpoint-sqlite
+    from langgraph.checkpoint.sqlite import SqliteSaver
+except ImportError:
+    SqliteSaver = None
+
+
+class CompressedSerializer:
+    """Wrap a LangGraph serializer and zlib-compress payloads above a size threshold."""
+
+    PREFIX = "zlib:"
+
+    def __init__(self, inner: Any = None, min_size: int = 512, level: int = 6):
+        """
+        Args:
+            inner: Serializer producing (type, bytes) pairs (default: JsonPlusSerializer)
+            min_size: Payloads smaller than this many bytes are stored uncompressed
+            level: zlib compression level
+        """
+        self.inner = inner or JsonPlusSerializer()
+        self.min_size = min_size
+        self.level = level
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        type_, data = self.inner.dumps_typed(obj)
+        if len(data) < self.min_size:
+            return type_, data
+        return self.PREFIX + type_, zlib.compress(data, self.level)
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if type_.startswith(self.PREFIX):
+            return self.inner.loads_typed((type_[len(self.PREFIX):], zlib.decompress(payload)))
+        return self.inner.loads_typed((type_, payload))
+
+
+# Blobs younger than this survive gc: a running node stores its files before
+# the checkpoint that refers to them is written
+BLOB_GC_GRACE = 600.0
+
+
+def _nested_dicts(value: Any) -> Iterator[Dict]:
+    if isinstance(value, Send):
+        value = value.arg
+    if isinstance(value, dict):
+        yield value
+        for item in value.values():
+            yield from _nested_dicts(item)
+    elif isinstance(value, (list, tuple, set)):
+        for item in value:
+            yield from _nested_dicts(item)
+
+
+def live_manifests(checkpointer: Any) -> Iterator[Dict]:
+    """
+    Every dict in the checkpoints and pending writes of every thread.
+
+    File manifests are among them (the *_files channels, and the manifests
+    carried by fix_file Sends), so these are the manifests blob gc must keep.
+    """
+    for item in checkpointer.list(None):
+        yield from _nested_dicts(item.checkpoint.get("channel_values", {}))
+        yield from _nested_dicts([write[2] for write in item.pending_writes or []])
+
+
+def collect_blob_garbage(*checkpointers: Any, store: Optional[BlobStore] = None, min_age: float = BLOB_GC_GRACE) -> int:
+    """
+    Delete the blobs no checkpoint of the given checkpointers refers to any more.
+
+    Returns:
+        Number of blobs removed
+    """
+    store = store or get_blob_store()
+    removed = store.gc((m for saver in checkpointers for m in live_manifests(saver)), min_age=min_age)
+    if removed:
+        print(f"[INFO] Removed {removed} unreferenced file blob(s)")
+    return removed
+
+
+def copy_thread(source: Any, target: Any, thread_id: str) -> int:
+    """
+    Copy every checkpoint and pending write of a thread to another checkpointer.
+
+    Checkpoints are written oldest first with their parent links, so the
+    target sees the same history (a pruning target keeps only the newest).
+
+    Returns:
+        Number of checkpoints copied
+    """
+    items = list(source.list({"configurable": {"thread_id": thread_id}}))
+    for item in reversed(items):
+        checkpoint_ns = item.config["configurable"].get("checkpoint_ns", "")
+        parent = item.parent_config or {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns}}
+        target.put(parent, item.checkpoint, item.metadata, dict(item.checkpoint.get("channel_versions", {})))
+        writes_by_task: Dict[str, list] = {}
+        for task_id, channel, value in item.pending_writes or []:
+            writes_by_task.setdefault(task_id, []).append((channel, value))
+        for task_id, writes in writes_by_task.items():
+            target.put_writes(item.config, writes, task_id)
+    return len(items)
+
+
+if SqliteSaver is not None:
+
+    class PruningSqliteSaver(SqliteSaver):
+        """
+        SqliteSaver that keeps a bounded history per thread.
+
+        After every checkpoint write, older checkpoints of the same thread (and
+        their pending writes) beyond `keep_last` are deleted. The async methods
+        run the sync ones in a worker thread so graph.astream works too.
+        """
+
+        def __init__(self, conn: sqlite3.Connection, keep_last: int = 20, **kwargs: Any):
+            super().__init__(conn, **kwargs)
+            self.keep_last = keep_last
+
+        def put(self, config, checkpoint, metadata, new_versions):
+            next_config = super().put(config, checkpoint, metadata, new_versions)
+            if self.keep_last:
+                self.prune_thread(
+                    str(config["configurable"]["thread_id"]),
+                    config["configurable"].get("checkpoint_ns", ""),
+                )
+            return next_config
+
+        def prune_thread(self, thread_id: str, checkpoint_ns: str = "", keep_last: Optional[int] = None) -> int:
+            """
+            Delete all but the newest checkpoints of a thread.
+
+            Checkpoint ids are time-ordered (uuid6), so ordering by id is
+            ordering by creation time.
+
+            Returns:
+                Number of checkpoints removed
+            """
+            keep = self.keep_last if keep_last is None else keep_last
+            self.setup()
+            with self.cursor() as cur:
+                cur.execute(
+                    "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id NOT IN ("
+                    " SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?"
+                    " ORDER BY checkpoint_id DESC LIMIT ?)",
+                    (thread_id, checkpoint_ns, thread_id, checkpoint_ns, keep),
+                )
+                removed = cur.rowcount
+                if removed:
+                    cur.execute(
+                        "DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id NOT IN ("
+                        " SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?)",
+                        (thread_id, checkpoint_ns, thread_id, checkpoint_ns),
+                    )
+            return removed
+
+        def prune(self, keep_last: Optional[int] = None, store: Optional[BlobStore] = None) -> int:
+            """
+            Prune every thread in the database, truncate the WAL file and
+            delete the file blobs no remaining checkpoint refers to.
+
+            Args:
+                keep_last: Checkpoints kept per thread (default: self.keep_last)
+                store: Blob store to collect (default: get_blob_store())
+
+            Returns:
+                Number of checkpoints removed
+            """
+            self.setup()
+            with self.cursor(transaction=False) as cur:
+                cur.execute("SELECT DISTINCT thread_id, checkpoint_ns FROM checkpoints")
+                threads = cur.fetchall()
+            removed = sum(self.prune_thread(t, ns, keep_last) for t, ns in threads)
+            with self.cursor(transaction=False) as cur:
+                cur.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            collect_blob_garbage(self, store=store)
+            return removed
+
+        async def aget_tuple(self, config):
+            return await asyncio.to_thread(self.get_tuple, config)
+
+        async def alist(self, config, *, filter=None, before=None, limit=None):
+            items = await asyncio.to_thread(
+                lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+            )
+            for item in items:
+                yield item
+
+        async def aput(self, config, checkpoint, metadata, new_versions):
+            return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+        async def aput_writes(self, config, writes, task_id, task_path=""):
+            return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+        async def adelete_thread(self, thread_id):
+            return await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+def create_checkpointer(db_path: Optional[str] = None, keep_last: Optional[int] = None):
+    """
+    Build the checkpointer for create_graph().
+
+    Args:
+        db_path: SQLite file path (default: AUTODEV_CHECKPOINT_DB). Empty means in-memory.
+        keep_last: Checkpoints kept per thread (default: AUTODEV_CHECKPOINT_KEEP or 20, 0 disables pruning)
+
+    Returns:
+        A PruningSqliteSaver when a path is configured, else a MemorySaver
+    """
+    db_path = db_path if db_path is not None else os.getenv("AUTODEV_CHECKPOINT_DB", "")
+    if not db_path:
+        return MemorySaver()
+
+    if SqliteSaver is None:
+        print("⚠️ Warning: 'langgraph-checkpoint-sqlite' not found, falling back to in-memory checkpoints.")
+        print("   Please run: pip install langgraph-checkpoint-sqlite")
+        return MemorySaver()
+
+    if keep_last is None:
+        keep_last = int(os.getenv("AUTODEV_CHECKPOINT_KEEP", "20"))
+
+    if os.path.dirname(db_path):
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+    # One connection shared by every graph task; SqliteSaver serializes access with a lock
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+
+    saver = PruningSqliteSaver(conn, keep_last=keep_last, serde=CompressedSerializer())
+    print(f"[OK] Using SQLite checkpoints at {db_path} (keeping {keep_last or 'all'} per thread)")
+    return saver
@@ -1,26 +1,53 @@
+import os
+from typing import Optional
 from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.memory import MemorySaver
+from langchain_core.runnables import RunnableLambda
 from src.core.state import GraphState
+from src.core.checkpointer import create_checkpointer
+from src.utils.telemetry import traced
 
 # Nodes
 from src.agents.architect import architect_node
-from src.agents.frontend import frontend_node
-from src.agents.backend import backend_node
-from src.agents.infra import infra_node  # <--- NEW
+from src.agents.frontend import frontend_node, afrontend_node
+from src.agents.backend import backend_node, abackend_node
+from src.agents.infra import infra_node, ainfra_node  # <--- NEW
 from src.agents.sandbox import sandbox_node # <--- NEW (Replaces Human)
 from src.agents.reflector import reflector_node
+from src.agents.file_fixer import fix_file_node, afix_file_node
 from src.agents.router import route_after_reflection
 
-def create_graph():
+def auto_mode_from_env() -> bool:
+    """True when AUTODEV_AUTO asks for unattended runs."""
+    return os.getenv("AUTODEV_AUTO", "off").strip().lower() in ("1", "on", "true", "yes")
+
+def create_graph(checkpointer=None, auto: Optional[bool] = None):
+    """
+    Build and compile the AutoDev workflow.
+
+    Args:
+        checkpointer: LangGraph checkpointer (default: create_checkpointer(),
+            i.e. SQLite when AUTODEV_CHECKPOINT_DB is set, else in-memory)
+        auto: Run sandbox -> reflector -> builders until the sandbox passes or
+            the repair budget (AUTODEV_MAX_ITERATIONS) is spent, without pausing
+            for human review before the reflector (default: AUTODEV_AUTO)
+    """
+    if auto is None:
+        auto = auto_mode_from_env()
     workflow = StateGraph(GraphState)
 
     # 1. Add Nodes
-    workflow.add_node("architect", architect_node)
-    workflow.add_node("frontend", frontend_node)
-    workflow.add_node("backend", backend_node)
-    workflow.add_node("infra", infra_node) # <--- NEW
-    workflow.add_node("sandbox", sandbox_node) # <--- NEW
-    workflow.add_node("reflector", reflector_node)
+    # Every node is wrapped in a telemetry span (see src/utils/telemetry.py)
+    workflow.add_node("architect", traced("architect", architect_node))
+    # Builders carry a sync and an async implementation: graph.stream/invoke
+    # uses the former, graph.astream/ainvoke awaits the latter so the three
+    # Gemini calls of the fan-out overlap on one event loop.
+    workflow.add_node("frontend", RunnableLambda(traced("frontend", frontend_node), afunc=traced("frontend", afrontend_node), name="frontend"))
+    workflow.add_node("backend", RunnableLambda(traced("backend", backend_node), afunc=traced("backend", abackend_node), name="backend"))
+    workflow.add_node("infra", RunnableLambda(traced("infra", infra_node), afunc=traced("infra", ainfra_node), name="infra")) # <--- NEW
+    workflow.add_node("sandbox", traced("sandbox", sandbox_node)) # <--- NEW
+    workflow.add_node("reflector", traced("reflector", reflector_node))
+    # Targeted repair of a single file, fanned out by the router with Send
+    workflow.add_node("fix_file", RunnableLambda(traced("fix_file", fix_file_node), afunc=traced("fix_file", afix_file_node), name="fix_file"))
     
     # 2. Edges
     workflow.set_entry_point("architect")
@@ -34,6 +61,7 @@ def create_graph():
     workflow.add_edge("frontend", "sandbox")
     workflow.add_edge("backend", "sandbox")
     workflow.add_edge("infra", "sandbox")
+    workflow.add_edge("fix_file", "sandbox")
     
     # Sandbox -> Reflector
     workflow.add_edge("sandbox", "reflector")
@@ -50,5 +78,8 @@ def create_graph():
         }
     )
     
-    memory = MemorySaver()
-    return workflow.compile(checkpointer=memory, interrupt_before=["reflector"])# No interrupt needed now!
\ No newline at end of file
+    memory = checkpointer if checkpointer is not None else create_checkpointer()
+    if auto:
+        return workflow.compile(checkpointer=memory)
+    # Pause for human feedback before each reflection
+    return workflow.compile(checkpointer=memory, interrupt_before=["reflector"])
\ No newline at end of file
@@ -0,0 +1,187 @@
+"""
+Per-user threads on a shared graph, with bounded resident memory.
+
+Every browser session gets its own thread_id on one compiled graph. The
+registry remembers when each thread was last used and releases threads
+that have been idle longer than AUTODEV_THREAD_TTL, or the least recently
+used ones beyond AUTODEV_MAX_THREADS.
+
+Releasing a thread frees what the process holds for it:
+    - With the in-memory checkpointer (MemorySaver) the thread's history is
+      moved to a SQLite spill file (AUTODEV_THREAD_SPILL_DB) and deleted
+      from the heap. Touching the thread again loads it back, so a user
+      returning after the TTL resumes where they left off.
+    - With a durable checkpointer (AUTODEV_CHECKPOINT_DB) the history is
+      already on disk and stays there.
+    - In both cases the thread's cached run log is dropped, and the file
+      blobs no checkpoint refers to any more are deleted (at most once every
+      `gc_interval` seconds).
+
+Configuration:
+    AUTODEV_MAX_THREADS      threads kept resident (default: 200)
+    AUTODEV_THREAD_TTL       seconds a thread may stay idle (default: 3600, 0 = no limit)
+    AUTODEV_THREAD_SPILL_DB  SQLite file for released in-memory threads
+                             (default: thread_spill.db, empty = delete them)
+"""
+
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, List, Optional
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from src.core.checkpointer import collect_blob_garbage, copy_thread, create_checkpointer
+from src.utils.code_exporter import release_run_log
+
+
+def new_thread_id() -> str:
+    """A fresh, unguessable thread id for one user's project."""
+    return uuid.uuid4().hex
+
+
+class ThreadRegistry:
+    """LRU + idle-TTL bookkeeping of the threads using a shared checkpointer."""
+
+    def __init__(self, checkpointer: Any, max_threads: Optional[int] = None, idle_ttl: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic, gc_interval: float = 300.0,
+                 spill_db: Optional[str] = None, in_use: Optional[Callable[[str], bool]] = None,
+                 on_release: Optional[Callable[[str], None]] = None):
+        """
+        Args:
+            checkpointer: The checkpointer the graphs were compiled with
+            max_threads: Threads kept resident (default: AUTODEV_MAX_THREADS or 200)
+            idle_ttl: Seconds a thread may stay idle (default: AUTODEV_THREAD_TTL or 3600; 0 = no limit)
+            clock: Time source (seconds)
+            gc_interval: Minimum seconds between two blob collections
+            spill_db: SQLite file for released in-memory threads
+                (default: AUTODEV_THREAD_SPILL_DB or thread_spill.db; empty = delete them)
+            in_use: Returns True for threads that must not be released now
+                (e.g. with jobs queued or running); they are skipped
+            on_release: Called with each released thread id, for cleanup the
+                caller owns (e.g. its sandbox directory)
+        """
+        self.checkpointer = checkpointer
+        self.max_threads = max_threads if max_threads is not None else int(os.getenv("AUTODEV_MAX_THREADS", "200"))
+        self.idle_ttl = idle_ttl if idle_ttl is not None else float(os.getenv("AUTODEV_THREAD_TTL", "3600"))
+        self.clock = clock
+        self.gc_interval = gc_interval
+        self.in_use = in_use
+        self.on_release = on_release
+        self.evicted = 0
+        self.spill = None
+        if not self.durable:
+            if spill_db is None:
+                spill_db = os.getenv("AUTODEV_THREAD_SPILL_DB", "thread_spill.db")
+            spill = create_checkpointer(spill_db) if spill_db else None
+            # Without the SQLite package create_checkpointer falls back to memory
+            self.spill = None if isinstance(spill, MemorySaver) else spill
+            if self.spill is None:
+                print("[WARN] No thread spill file; released threads will be deleted")
+        self._last_gc: Optional[float] = None
+        self._last_used: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def durable(self) -> bool:
+        """True when the checkpointer itself keeps threads on disk."""
+        return not isinstance(self.checkpointer, MemorySaver)
+
+    def __len__(self) -> int:
+        return len(self._last_used)
+
+    def __contains__(self, thread_id: str) -> bool:
+        return thread_id in self._last_used
+
+    def touch(self, thread_id: str) -> List[str]:
+        """
+        Mark a thread as used now, load it back if it was spilled, and
+        release the ones over the limits.
+
+        Returns:
+            The thread ids released
+        """
+        with self._lock:
+            if thread_id not in self._last_used:
+                self._restore(thread_id)
+            self._last_used[thread_id] = self.clock()
+            self._last_used.move_to_end(thread_id)
+            released = self._evict(keep=thread_id)
+        if released:
+            self.collect_garbage()
+        return released
+
+    def spilled(self, thread_id: str) -> bool:
+        """True if a released thread waits in the spill file for its next touch()."""
+        if self.spill is None or thread_id in self._last_used:
+            return False
+        return self.spill.get_tuple({"configurable": {"thread_id": thread_id}}) is not None
+
+    def release(self, thread_id: str) -> None:
+        """Release a thread at once (e.g. its user started a new project)."""
+        with self._lock:
+            if self._last_used.pop(thread_id, None) is None:
+                return
+            self._drop(thread_id)
+        self.collect_garbage()
+
+    def _evict(self, keep: str) -> List[str]:
+        released = []
+        cutoff = self.clock() - self.idle_ttl if self.idle_ttl else None
+        # Least recently used first; stop at the first thread that is neither idle nor over the limit
+        for thread_id, last_used in list(self._last_used.items()):
+            over_limit = self.max_threads and len(self._last_used) > self.max_threads
+            if not over_limit and (cutoff is None or last_used >= cutoff):
+                break
+            if thread_id == keep or (self.in_use is not None and self.in_use(thread_id)):
+                continue
+            del self._last_used[thread_id]
+            released.append(thread_id)
+        for thread_id in released:
+            self._drop(thread_id)
+        return released
+
+    def _drop(self, thread_id: str) -> None:
+        self.evicted += 1
+        release_run_log(thread_id)
+        if self.on_release is not None:
+            try:
+                self.on_release(thread_id)
+            except Exception as e:
+                print(f"[WARN] Cleanup of thread {thread_id} failed: {e}")
+        if self.durable:
+            return
+        if self.spill is not None:
+            try:
+                copy_thread(self.checkpointer, self.spill, thread_id)
+            except Exception as e:
+                # Keep it in memory rather than lose it
+                print(f"[WARN] Could not spill thread {thread_id}: {e}")
+                return
+        self.checkpointer.delete_thread(thread_id)
+
+    def _restore(self, thread_id: str) -> None:
+        if self.spill is None or self.spill.get_tuple({"configurable": {"thread_id": thread_id}}) is None:
+            return
+        try:
+            copy_thread(self.spill, self.checkpointer, thread_id)
+        except Exception as e:
+            print(f"[WARN] Could not restore thread {thread_id}: {e}")
+            self.checkpointer.delete_thread(thread_id)
+            return
+        self.spill.delete_thread(thread_id)
+
+    def collect_garbage(self) -> None:
+        """Delete unreferenced file blobs, unless that already ran in the last `gc_interval` seconds."""
+        now = self.clock()
+        with self._lock:
+            if self._last_gc is not None and now - self._last_gc < self.gc_interval:
+                return
+            self._last_gc = now
+        try:
+            savers = [self.checkpointer] + ([self.spill] if self.spill is not None else [])
+            collect_blob_garbage(*savers)
+        except Exception as e:
+            print(f"[WARN] Blob garbage collection failed: {e}")
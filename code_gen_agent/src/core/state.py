@@ -1,13 +1,53 @@
 from typing import TypedDict, List, Dict, Annotated, Optional
-from langgraph.graph.message import add_messages
-from langchain_core.messages import BaseMessage
+
+
+def add_messages(left, right):
+    """
+    Reducer for `messages`: LangGraph's add_messages, imported on first use.
+
+    Keeps `import src.core.state` free of LangGraph, so the sandbox path and
+    its validation script start quickly.
+    """
+    from langgraph.graph.message import add_messages as _add_messages
+    return _add_messages(left, right)
+
+
+def merge_files(current: Optional[Dict[str, str]], update: Optional[Dict[str, Optional[str]]]) -> Dict[str, str]:
+    """
+    Reducer for the file manifests.
+
+    Updates are merged path by path, so per-file repairs running in parallel
+    can each return just the file they fixed. A None value deletes the path.
+    """
+    merged = dict(current or {})
+    for path, digest in (update or {}).items():
+        if digest is None:
+            merged.pop(path, None)
+        else:
+            merged[path] = digest
+    return merged
+
+class SandboxResult(TypedDict, total=False):
+    """
+    Summary of the last sandbox run (see sandbox_node).
+    """
+    status: str                                 # "SUCCESS", "FAILED" or "ERROR"
+    timestamp: str
+    backend_syntax_errors: Dict[str, str]       # {path: 'message (line N)'}
+    frontend_ok: bool
+    docker_valid: bool
+    incremental: Dict                           # Changed/reused file counts
+    file_checks: Dict[str, List[Dict]]          # {path: [{'file', 'line', 'checker', 'severity', 'message'}]}
+    runtime: Dict                               # Smoke test: {'status', 'import_ok', 'endpoints': [{'method', 'path', 'ok', 'status', 'ms'}]}
+    contract: Dict                              # API contract check: {'mode', 'errors', 'warnings', 'ms'}
+    error: str                                  # Set when the sandbox itself failed
 
 class GraphState(TypedDict):
     """
     Represents the state of our graph.
     """
     # --- Conversation History ---
-    messages: Annotated[List[BaseMessage], add_messages]
+    messages: Annotated[List, add_messages]  # langchain_core BaseMessage objects
     
     # --- The Contract (Immutable after Architect) ---
     user_story: str
@@ -15,11 +55,18 @@ class GraphState(TypedDict):
     architecture_plan: str # Text summary of the plan
     
     # --- The Codebase (Mutable) ---
-    frontend_files: Dict[str, str]  # {'App.js': 'code'}
-    backend_files: Dict[str, str]   # {'main.py': 'code'}
-    infra_files: Dict[str, str]     # {'docker-compose.yml': 'code'}
+    # Manifests of {path: digest}; the text lives in the blob store (src/utils/blob_store.py)
+    # Merged with merge_files; nodes return only the paths they changed
+    frontend_files: Annotated[Dict[str, str], merge_files]  # {'App.js': 'sha256:...'}
+    backend_files: Annotated[Dict[str, str], merge_files]   # {'main.py': 'sha256:...'}
+    infra_files: Annotated[Dict[str, str], merge_files]     # {'docker-compose.yml': 'sha256:...'}
     
     # --- Feedback Loop ---
+    sandbox_logs: SandboxResult     # Written by sandbox_node, read by the reflector
     human_feedback: str             # Raw error pasted by you
     structured_errors: List[Dict]   # Parsed errors: [{'agent': 'backend', 'instruction': '...'}]
-    iteration_count: int            # Safety breaker
\ No newline at end of file
+    agent_errors: Annotated[Dict[str, str], merge_files]  # {agent: why its last LLM call produced no files}; None clears
+    iteration_count: int            # Safety breaker
+    iteration_budget: int           # Current repair budget (raised while the error count falls)
+    iteration_history: List[Dict]   # Per reflector pass: {'iteration', 'errors', 'error_fp', 'files_fp'}
+    stop_reason: str                # Why the loop stopped: passed, no_progress, oscillating, max_iterations ("" = continue)
\ No newline at end of file
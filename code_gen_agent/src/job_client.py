@@ -0,0 +1,110 @@
+"""
+Client for the job service (src/service.py), using only urllib.
+
+    client = JobClient("http://127.0.0.1:8765")
+    job = client.submit("As a user I want ...", auto=True)
+    for mode, chunk in client.stream(job["id"]):
+        ...
+    state = client.thread_state(job["thread_id"])
+"""
+
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+FINISHED = ("done", "failed")
+
+
+class JobServiceError(RuntimeError):
+    """The service answered with an error status."""
+
+
+class JobClient:
+    """Thin JSON client for the job service endpoints."""
+
+    def __init__(self, base_url: str, timeout: float = 30.0):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def _request(self, method: str, path: str, body: Optional[Dict[str, Any]] = None) -> Any:
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        request = urllib.request.Request(
+            self.base_url + path, data=data, method=method, headers={"Content-Type": "application/json"}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read() or b"null")
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read()).get("error", e.reason)
+            except ValueError:
+                message = e.reason
+            raise JobServiceError(f"{method} {path}: {e.code} {message}") from None
+
+    def health(self) -> Dict[str, Any]:
+        return self._request("GET", "/health")
+
+    def submit(self, story: str, auto: bool = False, thread_id: Optional[str] = None) -> Dict[str, Any]:
+        """Queue a new story; returns the job (with its thread_id)."""
+        body: Dict[str, Any] = {"story": story, "auto": auto}
+        if thread_id:
+            body["thread_id"] = thread_id
+        return self._request("POST", "/jobs", body)
+
+    def feedback(self, thread_id: str, feedback: str, auto: bool = False) -> Dict[str, Any]:
+        """Queue the resumption of a paused thread with review feedback."""
+        return self._request("POST", f"/threads/{thread_id}/feedback", {"feedback": feedback, "auto": auto})
+
+    def job(self, job_id: str) -> Dict[str, Any]:
+        return self._request("GET", f"/jobs/{job_id}")
+
+    def events(self, job_id: str, after: int = 0) -> Dict[str, Any]:
+        return self._request("GET", f"/jobs/{job_id}/events?after={after}")
+
+    def thread_state(self, thread_id: str) -> Optional[Dict[str, Any]]:
+        """Latest state of a thread (file contents included), or None if unknown."""
+        try:
+            return self._request("GET", f"/threads/{thread_id}")
+        except JobServiceError as e:
+            if " 404 " in str(e):
+                return None
+            raise
+
+    def stream(self, job_id: str, poll_interval: float = 0.5) -> Iterator[Tuple[str, Any]]:
+        """
+        Poll a job's events until it finishes.
+
+        Yields:
+            (mode, chunk) pairs like graph.stream(stream_mode=["updates", "custom"]);
+            "updates" chunks map node names to the keys they wrote
+        """
+        after = 0
+        while True:
+            page = self.events(job_id, after)
+            for event in page["events"]:
+                after = event["seq"]
+                yield event["mode"], event["chunk"]
+            if page["status"] in FINISHED and not page["events"]:
+                return
+            if not page["events"]:
+                time.sleep(poll_interval)
+
+    def wait(self, job_id: str, timeout: Optional[float] = None, poll_interval: float = 0.5) -> Dict[str, Any]:
+        """Block until the job is done or failed and return it."""
+        deadline = time.monotonic() + timeout if timeout else None
+        while True:
+            job = self.job(job_id)
+            if job["status"] in FINISHED:
+                return job
+            if deadline and time.monotonic() > deadline:
+                raise TimeoutError(f"job {job_id} still {job['status']} after {timeout}s")
+            time.sleep(poll_interval)
+
+
+def client_from_env() -> Optional[JobClient]:
+    """JobClient for AUTODEV_JOB_SERVICE_URL, or None to run graphs in-process."""
+    url = os.getenv("AUTODEV_JOB_SERVICE_URL", "").strip()
+    return JobClient(url) if url else None
@@ -1,7 +1,9 @@
 from dotenv import load_dotenv
+from src.batch import initial_state
 from src.core.graph import create_graph
-from src.core.state import GraphState
+from src.core.sessions import new_thread_id
 from langchain_core.runnables import RunnableConfig
+from src.utils.telemetry import get_tracer
 
 # Load API keys
 load_dotenv()
@@ -9,24 +11,19 @@ load_dotenv()
 if __name__ == "__main__":
     print("🚀 AutoDev Agent Starting...")
     
+    # AUTODEV_AUTO=on loops sandbox -> reflector -> builders without pausing for review
     app = create_graph()
     
     user_input = input("Enter your User Story: ")
     
-    initial_state: GraphState = {
-        "user_story": user_input,
-        "iteration_count": 0,
-        "messages": [],
-        "api_spec": "",
-        "architecture_plan": "",
-        "frontend_files": {},
-        "backend_files": {},
-        "infra_files": {},
-        "human_feedback": "",
-        "structured_errors": []
-    }
-    
-    # Run the graph
-    app.invoke(initial_state)
+    # Each run gets its own thread, so a durable checkpointer never mixes runs
+    # (a span summary table is printed when it finishes)
+    config: RunnableConfig = {"configurable": {"thread_id": new_thread_id()}}
+    with get_tracer().run("graph"):
+        final_state = app.invoke(initial_state(user_input), config=config)
     
+    sandbox = final_state.get("sandbox_logs") or {}
+    print(f"[INFO] Sandbox status: {sandbox.get('status', 'UNKNOWN')} after {final_state.get('iteration_count', 0)} repair iteration(s)")
+    if final_state.get("stop_reason"):
+        print(f"[INFO] Repair loop stopped: {final_state['stop_reason']}")
     print("[OK] Process Finished.")
\ No newline at end of file
@@ -0,0 +1,51 @@
+import json
+
+# --- Full regeneration (fallback) ---
+FULL_REPAIR_TEMPLATE = (
+    "Here is your previous code: {code}\n"
+    "Here are the errors you must fix: {errors}\n"
+    "Return the full corrected code."
+)
+
+# --- Patch mode: only the files the errors touch are sent back and forth ---
+PATCH_REPAIR_TEMPLATE = """Here are the files involved in the errors: {code}
+Other files in the project (unchanged, not shown): {other_files}
+Here are the errors you must fix: {errors}
+
+Return ONLY valid JSON that maps each file you change to one of:
+  {{"diff": "<unified diff against the file shown above, with @@ hunk headers>"}}
+  {{"replace": "<the complete new file content>"}}
+  {{"delete": true}}
+Omit files that need no change. You may add new files with "replace".
+"""
+
+
+# Appended when the token budget replaced files with outlines or left them out.
+# The files the errors name are always sent in full, so elided files are ones
+# the errors do not refer to.
+ELIDED_NOTE = (
+    "\nTo save space, these files are shown only as outlines or not at all: {files}. "
+    "The errors do not refer to them, so they need no changes; leave them out of your answer."
+)
+
+# Same, when the errors name no file and any file may need the fix
+ELIDED_UNKNOWN_NOTE = (
+    "\nTo save space, these files are shown only as outlines or not at all: {files}. "
+    "Files you leave out of your answer are kept as they are."
+)
+
+
+def full_repair_prompt(current_code: dict, errors: list, elided: list = (), unrelated: bool = True) -> str:
+    prompt = FULL_REPAIR_TEMPLATE.format(code=json.dumps(current_code), errors=json.dumps(errors))
+    if elided:
+        note = ELIDED_NOTE if unrelated else ELIDED_UNKNOWN_NOTE
+        prompt += note.format(files=json.dumps(list(elided)))
+    return prompt
+
+
+def patch_repair_prompt(target_code: dict, other_files: list, errors: list) -> str:
+    return PATCH_REPAIR_TEMPLATE.format(
+        code=json.dumps(target_code),
+        other_files=json.dumps(other_files),
+        errors=json.dumps(errors),
+    )
@@ -0,0 +1,399 @@
+"""
+Local job service: an asyncio HTTP API with a worker pool in front of one compiled graph.
+
+    python -m src.service --port 8765 --workers 4
+
+Clients submit user stories; each becomes a job on the queue, and N workers
+run jobs concurrently on the shared graph (each job on its own thread_id).
+Progress (node updates and the agents' token/item/retry events) is kept per
+job so clients can poll it, and paused threads (review mode) are resumed
+with feedback. The Streamlit UI uses this as a thin client when
+AUTODEV_JOB_SERVICE_URL is set (see src/job_client.py).
+
+Threads are tracked by a ThreadRegistry (src/core/sessions.py): threads idle
+longer than AUTODEV_THREAD_TTL, or beyond AUTODEV_MAX_THREADS, are released
+(spilled to disk with the in-memory checkpointer) unless a job of theirs is
+queued or running, and their sandbox directories are deleted. A later job or
+state query on a spilled thread loads it back. Unreferenced file blobs are
+also collected every AUTODEV_BLOB_GC_INTERVAL seconds (default: 300), since
+threads finished long ago may never be released while the service is busy.
+
+Endpoints (JSON in and out):
+    POST /jobs                     {"story", "auto"?, "thread_id"?} -> job
+    POST /threads/<id>/feedback    {"feedback"} -> job resuming the thread
+    GET  /jobs/<id>                job status and result
+    GET  /jobs/<id>/events?after=N progress events after sequence number N
+    GET  /threads/<id>             latest state, with file contents
+    GET  /health                   worker and queue counts
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import shutil
+import sys
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from dotenv import load_dotenv
+
+from src.batch import initial_state
+from src.core.sessions import ThreadRegistry
+from src.utils.telemetry import get_tracer
+from src.utils.usage import track_usage
+
+# Events kept per job; older ones are dropped (clients only need the tail)
+MAX_EVENTS = 5000
+# Finished jobs kept for status queries
+MAX_FINISHED_JOBS = 1000
+MAX_BODY_BYTES = 1 << 20
+# Thread ids name sandbox directories, so only plain names are accepted
+THREAD_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def check_thread_id(thread_id: str) -> str:
+    """Return thread_id, or raise ValueError if it is not a plain name."""
+    if not isinstance(thread_id, str) or not THREAD_ID_PATTERN.match(thread_id):
+        raise ValueError("thread_id must match [A-Za-z0-9_-]{1,64}")
+    return thread_id
+
+
+class Job:
+    """One graph run: a new story or the resumption of a paused thread."""
+
+    def __init__(self, thread_id: str, graph_input: Optional[Dict[str, Any]], auto: bool, feedback: Optional[str] = None):
+        self.id = uuid.uuid4().hex[:12]
+        self.thread_id = thread_id
+        self.graph_input = graph_input
+        self.auto = auto
+        self.feedback = feedback
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self.result: Dict[str, Any] = {}
+        self.usage: Dict[str, int] = {}
+        self.events: Deque[Dict[str, Any]] = deque(maxlen=MAX_EVENTS)
+        self._seq = 0
+
+    def add_event(self, mode: str, chunk: Any) -> None:
+        self._seq += 1
+        self.events.append({"seq": self._seq, "mode": mode, "chunk": chunk})
+
+    def events_after(self, after: int) -> List[Dict[str, Any]]:
+        return [e for e in self.events if e["seq"] > after]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "thread_id": self.thread_id,
+            "status": self.status,
+            "auto": self.auto,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "queue_seconds": round((self.started_at or time.time()) - self.created_at, 3),
+            "run_seconds": round((self.finished_at or time.time()) - self.started_at, 3) if self.started_at else None,
+            "error": self.error,
+            "result": self.result,
+            "usage": self.usage,
+            "last_event": self._seq,
+        }
+
+
+class JobService:
+    """Queue plus worker pool sharing the compiled review and automatic graphs."""
+
+    def __init__(self, workers: int = 4, checkpointer=None, graphs: Optional[Dict[bool, Any]] = None,
+                 sandbox_root: str = "service_sandboxes"):
+        """
+        Args:
+            workers: Jobs run at the same time
+            sandbox_root: Parent directory of the per-thread sandboxes
+            checkpointer: Shared by both graphs (default: create_checkpointer())
+            graphs: {auto: compiled graph}, mainly for tests
+        """
+        if graphs is None:
+            from src.core.checkpointer import create_checkpointer
+            from src.core.graph import create_graph
+
+            checkpointer = checkpointer if checkpointer is not None else create_checkpointer()
+            graphs = {False: create_graph(checkpointer, auto=False), True: create_graph(checkpointer, auto=True)}
+        elif checkpointer is None and graphs:
+            checkpointer = next(iter(graphs.values())).checkpointer
+        self.graphs = graphs
+        self.workers = max(1, workers)
+        self.sandbox_root = sandbox_root
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self.running = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._thread_locks: Dict[str, asyncio.Lock] = {}
+        # Jobs queued or running per thread; the lock is dropped when none are left
+        self._lock_users: Dict[str, int] = {}
+        self._tasks: List[asyncio.Task] = []
+        self.threads: Optional[ThreadRegistry] = None
+        if checkpointer is not None:
+            self.threads = ThreadRegistry(checkpointer, gc_interval=float(os.getenv("AUTODEV_BLOB_GC_INTERVAL", "300")),
+                                          in_use=self._lock_users.__contains__, on_release=self._remove_sandbox)
+
+    # Jobs
+
+    def submit(self, story: str, auto: bool = False, thread_id: Optional[str] = None) -> Job:
+        """Queue a new story; raises ValueError for an invalid thread_id."""
+        job = Job(check_thread_id(thread_id) if thread_id else uuid.uuid4().hex, initial_state(story), auto)
+        return self._enqueue(job)
+
+    def resume(self, thread_id: str, feedback: str, auto: bool = False) -> Job:
+        """Queue feedback for a paused thread; raises ValueError for an invalid thread_id."""
+        return self._enqueue(Job(check_thread_id(thread_id), None, auto, feedback=feedback))
+
+    def sandbox_dir(self, thread_id: str) -> str:
+        """Sandbox directory of a thread, guaranteed to lie inside sandbox_root."""
+        root = os.path.abspath(self.sandbox_root)
+        path = os.path.abspath(os.path.join(root, check_thread_id(thread_id)))
+        if path == root or os.path.commonpath([root, path]) != root:
+            raise ValueError(f"sandbox of thread {thread_id!r} escapes {root}")
+        return path
+
+    def _remove_sandbox(self, thread_id: str) -> None:
+        shutil.rmtree(self.sandbox_dir(thread_id), ignore_errors=True)
+
+    async def _touch(self, thread_id: str) -> None:
+        """Mark a thread used (loading it back if spilled) off the event loop."""
+        if self.threads is not None:
+            await asyncio.to_thread(self.threads.touch, thread_id)
+
+    def _enqueue(self, job: Job) -> Job:
+        self.jobs[job.id] = job
+        self._evict()
+        # Counted from now on, so the registry never releases a thread with a queued job
+        self._thread_locks.setdefault(job.thread_id, asyncio.Lock())
+        self._lock_users[job.thread_id] = self._lock_users.get(job.thread_id, 0) + 1
+        self._queue.put_nowait(job)
+        return job
+
+    def _evict(self) -> None:
+        finished = [j for j in self.jobs.values() if j.status in ("done", "failed")]
+        for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job.id]
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            # Jobs of one thread run in order; others proceed in parallel
+            thread_id = job.thread_id
+            try:
+                async with self._thread_locks[thread_id]:
+                    self.running += 1
+                    try:
+                        await self._touch(thread_id)
+                        await self._run(job)
+                        # Record the last use, and release other threads over the limits
+                        await self._touch(thread_id)
+                    finally:
+                        self.running -= 1
+                        self._queue.task_done()
+            finally:
+                # Drop the lock once no job of the thread holds or waits for it
+                self._lock_users[thread_id] -= 1
+                if not self._lock_users[thread_id]:
+                    del self._lock_users[thread_id]
+                    del self._thread_locks[thread_id]
+
+    async def _collect_garbage_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.threads.gc_interval)
+            await asyncio.to_thread(self.threads.collect_garbage)
+
+    async def _run(self, job: Job) -> None:
+        graph = self.graphs[job.auto]
+        job.status, job.started_at = "running", time.time()
+        try:
+            config = {"configurable": {"thread_id": job.thread_id, "sandbox_dir": self.sandbox_dir(job.thread_id)}}
+            with track_usage() as usage, get_tracer().span(job.id, kind="job", thread_id=job.thread_id):
+                if job.feedback is not None:
+                    await graph.aupdate_state(config, {"human_feedback": job.feedback})
+                async for mode, chunk in graph.astream(job.graph_input, config=config, stream_mode=["updates", "custom"]):
+                    if mode == "updates" and isinstance(chunk, dict):
+                        # Node outputs hold message objects; clients only need which nodes finished
+                        job.add_event(mode, {node: sorted(update or {}) for node, update in chunk.items()})
+                    else:
+                        job.add_event(mode, chunk)
+            job.usage = dict(usage)
+            job.result = await self._summary(graph, config)
+            job.status = "done"
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.status = "failed"
+            print(f"[ERROR] Job {job.id} failed: {job.error}", file=sys.stderr)
+        finally:
+            job.finished_at = time.time()
+            self._evict()
+
+    @staticmethod
+    async def _summary(graph, config) -> Dict[str, Any]:
+        snapshot = await graph.aget_state(config)
+        values = snapshot.values or {}
+        return {
+            "sandbox_status": (values.get("sandbox_logs") or {}).get("status", "UNKNOWN"),
+            "iteration_count": values.get("iteration_count", 0),
+            "stop_reason": values.get("stop_reason", ""),
+            "paused_before": list(snapshot.next),
+            "files": {section: len(values.get(f"{section}_files") or {}) for section in ("frontend", "backend", "infra")},
+        }
+
+    async def thread_state(self, thread_id: str) -> Optional[Dict[str, Any]]:
+        """Latest values of a thread with file manifests resolved to text."""
+        from src.utils.blob_store import get_blob_store
+
+        config = {"configurable": {"thread_id": thread_id}}
+        snapshot = await self.graphs[False].aget_state(config)
+        if not snapshot.values and self.threads is not None and await asyncio.to_thread(self.threads.spilled, thread_id):
+            await self._touch(thread_id)
+            snapshot = await self.graphs[False].aget_state(config)
+        if not snapshot.values:
+            return None
+        values = snapshot.values
+        store = get_blob_store()
+        state = {key: value for key, value in values.items() if key != "messages"}
+        for section in ("frontend", "backend", "infra"):
+            state[f"{section}_files"] = store.materialize(values.get(f"{section}_files"))
+        state["messages"] = [getattr(m, "content", str(m)) for m in values.get("messages", [])]
+        state["next"] = list(snapshot.next)
+        return state
+
+    def health(self) -> Dict[str, Any]:
+        return {"workers": self.workers, "running": self.running, "queued": self._queue.qsize() if self._queue else 0, "jobs": len(self.jobs)}
+
+    # HTTP
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765) -> asyncio.AbstractServer:
+        """Start the workers and the HTTP server on the running loop."""
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        if self.threads is not None:
+            self._tasks.append(asyncio.create_task(self._collect_garbage_periodically()))
+        return await asyncio.start_server(self._handle, host, port)
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            status, body = await self._respond(reader)
+        except Exception as e:
+            status, body = 500, {"error": f"{type(e).__name__}: {e}"}
+        payload = json.dumps(body, default=str).encode("utf-8")
+        reason = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+        writer.write(
+            f"HTTP/1.1 {status} {reason.get(status, 'OK')}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode("ascii") + payload
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _respond(self, reader: asyncio.StreamReader) -> Tuple[int, Any]:
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        if not request_line:
+            return 400, {"error": "empty request"}
+        method, target, _ = (request_line.split(" ") + ["", ""])[:3]
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1")
+            if line in ("\r\n", "\n", ""):
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            return 400, {"error": "Content-Length must be an integer"}
+        if length < 0:
+            return 400, {"error": "Content-Length must not be negative"}
+        if length > MAX_BODY_BYTES:
+            return 413, {"error": "request body too large"}
+        body: Dict[str, Any] = {}
+        if length:
+            try:
+                body = json.loads(await reader.readexactly(length))
+            except ValueError:
+                return 400, {"error": "body must be JSON"}
+
+        url = urlsplit(target)
+        parts = [p for p in url.path.split("/") if p]
+        query = parse_qs(url.query)
+
+        if parts == ["health"] and method == "GET":
+            return 200, self.health()
+        if parts == ["jobs"] and method == "POST":
+            story = str(body.get("story") or body.get("user_story") or "").strip()
+            if not story:
+                return 400, {"error": "'story' is required"}
+            try:
+                return 202, self.submit(story, auto=bool(body.get("auto")), thread_id=body.get("thread_id")).to_dict()
+            except ValueError as e:
+                return 400, {"error": str(e)}
+        if len(parts) >= 2 and parts[0] == "jobs":
+            job = self.jobs.get(parts[1])
+            if job is None:
+                return 404, {"error": f"unknown job {parts[1]}"}
+            if len(parts) == 2 and method == "GET":
+                return 200, job.to_dict()
+            if parts[2:] == ["events"] and method == "GET":
+                try:
+                    after = int((query.get("after") or ["0"])[0])
+                except ValueError:
+                    return 400, {"error": "'after' must be an integer"}
+                return 200, {"status": job.status, "events": job.events_after(after)}
+        if len(parts) >= 2 and parts[0] == "threads":
+            try:
+                check_thread_id(parts[1])
+            except ValueError as e:
+                return 400, {"error": str(e)}
+            if len(parts) == 2 and method == "GET":
+                state = await self.thread_state(parts[1])
+                return (200, state) if state is not None else (404, {"error": f"unknown thread {parts[1]}"})
+            if parts[2:] == ["feedback"] and method == "POST":
+                feedback = str(body.get("feedback") or "")
+                if not feedback:
+                    return 400, {"error": "'feedback' is required"}
+                return 202, self.resume(parts[1], feedback, auto=bool(body.get("auto"))).to_dict()
+        return 404, {"error": f"no route for {method} {url.path}"}
+
+
+async def serve(host: str, port: int, workers: int) -> None:
+    service = JobService(workers=workers)
+    server = await service.start(host, port)
+    print(f"[OK] AutoDev job service on http://{host}:{port} with {workers} worker(s)")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the AutoDev job service.")
+    parser.add_argument("--host", default=os.getenv("AUTODEV_SERVICE_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("AUTODEV_SERVICE_PORT", "8765")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("AUTODEV_SERVICE_WORKERS", "4")),
+                        help="Jobs run at the same time (default: AUTODEV_SERVICE_WORKERS or 4)")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
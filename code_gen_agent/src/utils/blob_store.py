@@ -0,0 +1,222 @@
+"""
+Content-addressed storage for generated file contents.
+
+Graph state keeps generated files as {path: digest} manifests instead of
+{path: source}. The source text lives once on disk under its SHA-256 digest,
+so checkpoints only grow by the digests of files that actually changed.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, Optional
+
+DIGEST_PREFIX = "sha256:"
+
+
+def compute_digest(text: str) -> str:
+    """Return the digest used as the blob key for a piece of text."""
+    return DIGEST_PREFIX + hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def is_digest(value) -> bool:
+    """True if value looks like a blob digest rather than inline file text."""
+    return (
+        isinstance(value, str)
+        and len(value) == len(DIGEST_PREFIX) + 64
+        and value.startswith(DIGEST_PREFIX)
+    )
+
+
+class BlobStore:
+    """Deduplicating on-disk store of zlib-compressed text blobs."""
+
+    def __init__(self, root: str = "blob_store", cache_size: int = 512):
+        """
+        Initialize the store.
+
+        Args:
+            root: Directory holding the blobs (default: blob_store/)
+            cache_size: Number of decoded blobs kept in memory
+        """
+        self.root = root
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, digest: str) -> str:
+        hex_digest = digest[len(DIGEST_PREFIX):]
+        return os.path.join(self.root, hex_digest[:2], hex_digest)
+
+    def _remember(self, digest: str, text: str) -> None:
+        with self._lock:
+            self._cache[digest] = text
+            self._cache.move_to_end(digest)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def put(self, text: str) -> str:
+        """Store text (if not already present) and return its digest."""
+        digest = compute_digest(text)
+        path = self._path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(zlib.compress(text.encode("utf-8")))
+            os.replace(tmp_path, path)
+        else:
+            # Reused blobs count as new for gc's grace period
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        self._remember(digest, text)
+        return digest
+
+    def get(self, digest: str) -> str:
+        """Return the text for a digest. Raises KeyError if it is unknown."""
+        with self._lock:
+            if digest in self._cache:
+                self._cache.move_to_end(digest)
+                return self._cache[digest]
+        try:
+            with open(self._path(digest), "rb") as f:
+                text = zlib.decompress(f.read()).decode("utf-8")
+        except FileNotFoundError:
+            raise KeyError(digest) from None
+        self._remember(digest, text)
+        return text
+
+    def contains(self, digest: str) -> bool:
+        with self._lock:
+            if digest in self._cache:
+                return True
+        return os.path.exists(self._path(digest))
+
+    def resolve(self, value) -> str:
+        """
+        Return file text for a manifest value.
+
+        Values that are not digests are returned unchanged, so states written
+        before the blob store existed (inline source) keep working.
+        """
+        if is_digest(value):
+            return self.get(value)
+        return value
+
+    def put_files(self, files: Optional[Dict[str, str]]) -> Dict[str, str]:
+        """
+        Store every file of a {path: text} dict and return {path: digest}.
+
+        Non-string contents (the LLM sometimes returns package.json as an
+        object) are stored as pretty-printed JSON.
+        """
+        if not files:
+            return {}
+        manifest = {}
+        for path, content in files.items():
+            if is_digest(content):
+                manifest[path] = content
+            elif isinstance(content, str):
+                manifest[path] = self.put(content)
+            else:
+                manifest[path] = self.put(json.dumps(content, indent=2))
+        return manifest
+
+    def replace_files(self, previous: Optional[Dict[str, str]], files: Optional[Dict[str, str]]) -> Dict[str, Optional[str]]:
+        """
+        Store a complete new file set as an update for the merge_files reducer.
+
+        Returns:
+            {path: digest} for every file, plus {path: None} for paths of
+            `previous` that are gone, so the merged manifest matches `files`
+        """
+        manifest: Dict[str, Optional[str]] = dict(self.put_files(files))
+        for path in previous or {}:
+            manifest.setdefault(path, None)
+        return manifest
+
+    def materialize(self, manifest: Optional[Dict[str, str]]) -> Dict[str, str]:
+        """Eagerly load a {path: digest} manifest into {path: text}."""
+        if not manifest:
+            return {}
+        return {path: self.resolve(value) for path, value in manifest.items()}
+
+    def open_files(self, manifest: Optional[Dict[str, str]]) -> "LazyFiles":
+        """Wrap a manifest in a read-only mapping that loads text on access."""
+        return LazyFiles(self, manifest or {})
+
+    def gc(self, live_manifests: Iterable[Dict[str, str]], min_age: float = 0.0) -> int:
+        """
+        Delete blobs not referenced by any of the given manifests.
+
+        Args:
+            live_manifests: Manifests whose digests must be kept
+            min_age: Keep blobs stored or reused within this many seconds, so
+                files of a running node that are not checkpointed yet survive
+
+        Returns:
+            Number of blobs removed
+        """
+        live = {value for manifest in live_manifests for value in manifest.values() if is_digest(value)}
+        cutoff = time.time() - min_age
+        removed = 0
+        for root, _, names in os.walk(self.root):
+            for name in names:
+                if name.endswith(".tmp"):
+                    continue
+                digest = DIGEST_PREFIX + name
+                if digest not in live:
+                    try:
+                        if min_age and os.path.getmtime(os.path.join(root, name)) > cutoff:
+                            continue
+                        os.remove(os.path.join(root, name))
+                        removed += 1
+                    except OSError:
+                        pass
+                    with self._lock:
+                        self._cache.pop(digest, None)
+        return removed
+
+
+class LazyFiles(Mapping):
+    """Read-only {path: text} view over a manifest; blobs are read on first access."""
+
+    def __init__(self, store: BlobStore, manifest: Dict[str, str]):
+        self._store = store
+        self._manifest = dict(manifest)
+
+    def __getitem__(self, path: str) -> str:
+        return self._store.resolve(self._manifest[path])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._manifest)
+
+    def __len__(self) -> int:
+        return len(self._manifest)
+
+    def digest(self, path: str) -> str:
+        """Digest of a file without loading its text."""
+        value = self._manifest[path]
+        return value if is_digest(value) else compute_digest(value)
+
+
+_default_store: Optional[BlobStore] = None
+_default_lock = threading.Lock()
+
+
+def get_blob_store() -> BlobStore:
+    """Return the process-wide store rooted at AUTODEV_BLOB_DIR (default: blob_store/)."""
+    global _default_store
+    root = os.path.abspath(os.getenv("AUTODEV_BLOB_DIR", "blob_store"))
+    with _default_lock:
+        if _default_store is None or _default_store.root != root:
+            _default_store = BlobStore(root)
+        return _default_store
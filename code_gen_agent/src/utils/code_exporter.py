@@ -1,26 +1,49 @@
 """
 JSON code export utility for storing generated code from agents.
 
-Saves frontend, backend, and infra code to JSON format with metadata.
+Agent output is appended to one run log per graph thread,
+output/runs/<thread_id>.jsonl[.zst|.gz]: each record holds only the files
+that changed since that agent's previous record. A small side index
+(<name>.index.jsonl) keeps each record's byte offset and the agent's full
+{path: digest} manifest, so any iteration can be rebuilt by reading just the
+records that hold its files. Compressed logs store every record as its own
+zstd frame or gzip member, which keeps them appendable and seekable.
+
+    python -m src.utils.code_exporter show output/runs/<thread>.jsonl.zst --iteration 1 --out restored/
+    python -m src.utils.code_exporter compact output/runs/<thread>.jsonl.zst --keep-last 3
+
+export_to_json still writes one standalone JSON file with all three agents.
 """
 
+import argparse
+import gzip
+import hashlib
 import json
 import os
+import sys
+import threading
+import zlib
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 
 
 class CodeExporter:
     """Export generated code to JSON format."""
 
-    def __init__(self, output_dir: str = "output"):
+    def __init__(self, output_dir: str = "output", run_id: str = "default", compression: Optional[str] = None):
         """
         Initialize the exporter.
 
         Args:
             output_dir: Directory to save JSON exports (default: output/)
+            run_id: Run log name, normally the graph's thread_id
+            compression: Run log codec: "zstd", "gzip" or "none"
+                (default: AUTODEV_RUN_LOG_COMPRESSION, else zstd when installed)
         """
         self.output_dir = output_dir
+        self.run_id = run_id
+        self.compression = compression
         os.makedirs(output_dir, exist_ok=True)
 
     def export_to_json(
@@ -84,23 +107,38 @@ class CodeExporter:
         files: Dict[str, str],
         metadata: Optional[Dict[str, Any]] = None,
         filename: Optional[str] = None,
+        complete: bool = True,
     ) -> str:
         """
-        Export code generated by a specific agent to JSON.
+        Record code generated by a specific agent in the run log.
+
+        Only files that changed since the agent's previous record are stored.
 
         Args:
             agent_name: Name of the agent (e.g., 'frontend', 'backend', 'architect')
             files: Dict of filenames -> code content
-            metadata: Additional metadata
-            filename: Custom filename
+            metadata: Additional metadata ("iteration" selects the iteration)
+            filename: Write a standalone JSON snapshot with this name instead
+                of appending to the run log
+            complete: False when `files` is a partial update (e.g. one
+                repaired file) rather than the agent's whole output
 
         Returns:
-            Path to the created JSON file
+            Path to the run log (or to the JSON snapshot)
         """
-        if filename is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{agent_name}_code_{timestamp}.json"
+        if filename is not None:
+            return self._export_snapshot(agent_name, files, metadata, filename)
+
+        log = self.run_log()
+        iteration = int((metadata or {}).get("iteration", 0))
+        stored = log.append(agent_name, iteration, files, metadata=metadata, complete=complete)
+        if stored is None:
+            print(f"[OK] {agent_name.upper()} code unchanged, nothing logged")
+        else:
+            print(f"[OK] {agent_name.upper()} logged {stored} file change(s) to {log.path}")
+        return log.path
 
+    def _export_snapshot(self, agent_name: str, files: Dict[str, str], metadata: Optional[Dict[str, Any]], filename: str) -> str:
         export_data = {
             "agent": agent_name,
             "timestamp": datetime.now().isoformat(),
@@ -116,16 +154,24 @@ class CodeExporter:
         print(f"[OK] {agent_name.upper()} code exported to JSON: {filepath}")
         return filepath
 
-    def load_from_json(self, filepath: str) -> Dict[str, Any]:
+    def run_log(self) -> "RunLog":
+        """The run log of this exporter's run_id."""
+        return get_run_log(self.output_dir, self.run_id, self.compression)
+
+    def load_from_json(self, filepath: str, iteration: Optional[int] = None) -> Dict[str, Any]:
         """
-        Load previously exported code from a JSON file.
+        Load previously exported code.
 
         Args:
-            filepath: Path to the JSON file
+            filepath: A JSON export, or a run log (.jsonl, .jsonl.gz, .jsonl.zst)
+            iteration: For run logs, the iteration to reconstruct (default: latest)
 
         Returns:
-            Dictionary containing the exported code and metadata
+            Dictionary containing the exported code and metadata; run logs
+            are returned in the export_to_json layout
         """
+        if RunLog.is_run_log(filepath):
+            return RunLog(filepath).snapshot(iteration)
         with open(filepath, "r", encoding="utf-8") as f:
             data = json.load(f)
         return data
@@ -148,3 +194,468 @@ class CodeExporter:
             f"   Total Files: {len(frontend_files) + len(backend_files)}\n"
         )
         return summary_text
+
+
+# --- Run log ---
+
+SECTIONS = {"frontend": "frontend", "backend": "backend", "infra": "infrastructure"}
+
+
+class _Codec:
+    """Plain JSONL: one record per line."""
+
+    name = "none"
+    suffix = ""
+
+    def encode(self, data: bytes) -> bytes:
+        return data + b"\n"
+
+    def decode(self, chunk: bytes) -> bytes:
+        return chunk
+
+    def split(self, data: bytes) -> Iterator[Tuple[int, int]]:
+        """Yield (offset, length) of each complete record in a log's bytes."""
+        offset = 0
+        while True:
+            end = data.find(b"\n", offset)
+            if end == -1:
+                return
+            yield offset, end + 1 - offset
+            offset = end + 1
+
+
+class _GzipCodec(_Codec):
+    """One gzip member per record; concatenated members are still a valid .gz file."""
+
+    name = "gzip"
+    suffix = ".gz"
+
+    def encode(self, data):
+        return gzip.compress(data, mtime=0)
+
+    def decode(self, chunk):
+        return gzip.decompress(chunk)
+
+    def split(self, data):
+        offset = 0
+        while offset < len(data):
+            d = zlib.decompressobj(wbits=31)
+            try:
+                d.decompress(data[offset:])
+            except zlib.error:
+                return
+            if not d.eof:
+                return  # torn last member
+            length = len(data) - offset - len(d.unused_data)
+            yield offset, length
+            offset += length
+
+
+class _ZstdCodec(_Codec):
+    """One zstd frame per record (needs the optional zstandard package)."""
+
+    name = "zstd"
+    suffix = ".zst"
+
+    def __init__(self):
+        import zstandard
+        self._zstd = zstandard
+
+    def encode(self, data):
+        return self._zstd.ZstdCompressor(level=10).compress(data)
+
+    def decode(self, chunk):
+        return self._zstd.ZstdDecompressor().decompress(chunk)
+
+    def split(self, data):
+        offset = 0
+        while offset < len(data):
+            d = self._zstd.ZstdDecompressor().decompressobj()
+            try:
+                d.decompress(data[offset:])
+            except self._zstd.ZstdError:
+                return
+            if not d.eof:
+                return
+            length = len(data) - offset - len(d.unused_data)
+            yield offset, length
+            offset += length
+
+
+def _codec(name: Optional[str] = None) -> _Codec:
+    name = (name or os.getenv("AUTODEV_RUN_LOG_COMPRESSION", "auto")).strip().lower()
+    if name in ("auto", "zstd"):
+        try:
+            return _ZstdCodec()
+        except ImportError:
+            if name == "zstd":
+                print("[WARN] zstandard is not installed, compressing the run log with gzip")
+            return _GzipCodec()
+    if name == "gzip":
+        return _GzipCodec()
+    return _Codec()
+
+
+def _codec_for_path(path: str) -> _Codec:
+    if path.endswith(".zst"):
+        return _ZstdCodec()
+    if path.endswith(".gz"):
+        return _GzipCodec()
+    return _Codec()
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+class RunLog:
+    """Append-only per-thread log of agent outputs, with an offset index."""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Log file; the codec follows the suffix (.jsonl, .jsonl.gz, .jsonl.zst)
+        """
+        self.path = path
+        self.index_path = self.index_path_for(path)
+        self.codec = _codec_for_path(path)
+        self._lock = threading.Lock()
+        self._entries: Optional[List[Dict[str, Any]]] = None
+
+    @staticmethod
+    def is_run_log(path: str) -> bool:
+        return path.endswith((".jsonl", ".jsonl.gz", ".jsonl.zst"))
+
+    @staticmethod
+    def index_path_for(path: str) -> str:
+        base = path
+        for suffix in (".zst", ".gz", ".jsonl"):
+            if base.endswith(suffix):
+                base = base[:-len(suffix)]
+        return base + ".index.jsonl"
+
+    # Index
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Index entries in log order, rebuilt from the log if the index is stale."""
+        if self._entries is None:
+            entries = self._read_index()
+            size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+            end = entries[-1]["offset"] + entries[-1]["length"] if entries else 0
+            if end != size:
+                entries = self._rebuild_index()
+            self._entries = entries
+        return self._entries
+
+    def _read_index(self) -> List[Dict[str, Any]]:
+        entries = []
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        break  # torn last line
+        except OSError:
+            pass
+        return entries
+
+    def _rebuild_index(self) -> List[Dict[str, Any]]:
+        """Recreate the index by scanning the log (after a crash between the two writes)."""
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, "rb") as f:
+            data = f.read()
+        entries: List[Dict[str, Any]] = []
+        manifests: Dict[str, Dict[str, str]] = {}
+        for offset, length in self.codec.split(data):
+            try:
+                record = json.loads(self.codec.decode(data[offset:offset + length]))
+            except ValueError:
+                break
+            entries.append(self._entry(record, offset, length, manifests))
+        valid_end = entries[-1]["offset"] + entries[-1]["length"] if entries else 0
+        with open(self.path, "r+b") as f:
+            f.truncate(valid_end)  # drop a torn trailing record
+        with open(self.index_path, "w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+        print(f"[INFO] Rebuilt run log index {self.index_path} ({len(entries)} records)")
+        return entries
+
+    @staticmethod
+    def _entry(record: Dict[str, Any], offset: int, length: int, manifests: Dict[str, Dict[str, str]]) -> Dict[str, Any]:
+        """Index entry for a record; updates `manifests` (agent -> {path: digest})."""
+        agent = record["agent"]
+        stored = {path: _digest(text) for path, text in record["files"].items()}
+        manifest = dict(manifests.get(agent, {}))
+        manifest.update(stored)
+        for path in record.get("deleted", []):
+            manifest.pop(path, None)
+        manifests[agent] = manifest
+        return {
+            "seq": record["seq"], "agent": agent, "iteration": record["iteration"],
+            "offset": offset, "length": length, "stored": stored, "manifest": manifest,
+        }
+
+    # Writing
+
+    def append(self, agent: str, iteration: int, files: Dict[str, str], metadata: Optional[Dict[str, Any]] = None,
+               complete: bool = True, timestamp: Optional[str] = None) -> Optional[int]:
+        """
+        Append the files of one agent call, storing only what changed.
+
+        Args:
+            agent: Agent name
+            iteration: Repair iteration the output belongs to
+            files: {path: text}; the agent's whole output when `complete`,
+                otherwise only the paths it updated
+            metadata: Stored with the record
+            complete: Whether paths missing from `files` were deleted
+            timestamp: Record time (default: now)
+
+        Returns:
+            Number of files stored or deleted, or None when nothing changed
+        """
+        files = {path: text if isinstance(text, str) else json.dumps(text, indent=2) for path, text in (files or {}).items()}
+        with self._lock:
+            entries = self.entries()
+            previous = next((e["manifest"] for e in reversed(entries) if e["agent"] == agent), {})
+            digests = {path: _digest(text) for path, text in files.items()}
+            changed = {path: text for path, text in files.items() if previous.get(path) != digests[path]}
+            deleted = sorted(set(previous) - set(files)) if complete else []
+            if not changed and not deleted:
+                return None
+
+            record = {
+                "seq": entries[-1]["seq"] + 1 if entries else 0,
+                "agent": agent,
+                "iteration": iteration,
+                "timestamp": timestamp or datetime.now().isoformat(),
+                "metadata": metadata or {},
+                "files": changed,
+                "deleted": deleted,
+            }
+            chunk = self.codec.encode(json.dumps(record, ensure_ascii=False).encode("utf-8"))
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            offset = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+            with open(self.path, "ab") as f:
+                f.write(chunk)
+            entry = self._entry(record, offset, len(chunk), {agent: previous})
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+            entries.append(entry)
+            return len(changed) + len(deleted)
+
+    # Reading
+
+    def _read_records(self, seqs: List[int]) -> Dict[int, Dict[str, Any]]:
+        by_seq = {e["seq"]: e for e in self.entries()}
+        records = {}
+        with open(self.path, "rb") as f:
+            for seq in sorted(set(seqs)):
+                entry = by_seq[seq]
+                f.seek(entry["offset"])
+                records[seq] = json.loads(self.codec.decode(f.read(entry["length"])))
+        return records
+
+    def iterations(self) -> List[int]:
+        return sorted({e["iteration"] for e in self.entries()})
+
+    def reconstruct(self, iteration: Optional[int] = None) -> Dict[str, Dict[str, str]]:
+        """
+        Every agent's files as of the end of `iteration` (default: latest).
+
+        Only the records that hold the needed file versions are read.
+        """
+        entries = [e for e in self.entries() if iteration is None or e["iteration"] <= iteration]
+        latest: Dict[str, Dict[str, Any]] = {}
+        holder: Dict[Tuple[str, str], int] = {}  # (path, digest) -> seq of the record storing it
+        for e in entries:
+            latest[e["agent"]] = e
+            for path, digest in e["stored"].items():
+                holder.setdefault((path, digest), e["seq"])
+
+        needed = {holder[(p, d)] for e in latest.values() for p, d in e["manifest"].items()}
+        records = self._read_records(list(needed))
+        return {
+            agent: {path: records[holder[(path, digest)]]["files"][path] for path, digest in e["manifest"].items()}
+            for agent, e in latest.items()
+        }
+
+    def snapshot(self, iteration: Optional[int] = None) -> Dict[str, Any]:
+        """reconstruct() in the export_to_json layout."""
+        files = self.reconstruct(iteration)
+        selected = [e for e in self.entries() if iteration is None or e["iteration"] <= iteration]
+        data: Dict[str, Any] = {
+            "run_log": self.path,
+            "iteration": selected[-1]["iteration"] if selected else None,
+            "metadata": {},
+        }
+        if selected:
+            data["metadata"] = self._read_records([selected[-1]["seq"]])[selected[-1]["seq"]].get("metadata", {})
+        for agent in sorted(set(files) | set(SECTIONS)):
+            agent_files = files.get(agent, {})
+            data[SECTIONS.get(agent, agent)] = {"files": agent_files, "count": len(agent_files)}
+        return data
+
+    # Compaction
+
+    def compact(self, keep_last: Optional[int] = None, compression: Optional[str] = None) -> Dict[str, int]:
+        """
+        Rewrite the log with one record per (iteration, agent).
+
+        Args:
+            keep_last: Also fold all but the last N iterations into a single
+                base snapshot (earlier iterations then read as that snapshot)
+            compression: Re-encode with this codec (default: keep the current one)
+
+        Returns:
+            Record and byte counts before and after
+        """
+        with self._lock:
+            entries = self.entries()
+            iterations = sorted({e["iteration"] for e in entries})
+            cutoff = iterations[-keep_last] if keep_last and len(iterations) > keep_last else None
+
+            groups: Dict[Tuple[int, str], Dict[str, Any]] = {}
+            for e in entries:
+                iteration = e["iteration"] if cutoff is None or e["iteration"] >= cutoff else cutoff - 1
+                groups[(iteration, e["agent"])] = e  # last entry of each group wins
+
+            holder: Dict[Tuple[str, str], int] = {}
+            for e in entries:
+                for path, digest in e["stored"].items():
+                    holder.setdefault((path, digest), e["seq"])
+            needed = {holder[(p, d)] for e in groups.values() for p, d in e["manifest"].items()}
+            records = self._read_records(list(needed | {e["seq"] for e in groups.values()}))
+
+            codec = _codec(compression) if compression else self.codec
+            base = self.path
+            for suffix in (".zst", ".gz"):
+                if base.endswith(suffix):
+                    base = base[:-len(suffix)]
+            new_path = base + codec.suffix
+            tmp = RunLog(new_path + ".compact")
+            tmp.codec = codec
+            tmp.index_path = new_path + ".compact.index"
+            for path in (tmp.path, tmp.index_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            tmp._entries = []
+
+            for (iteration, agent), e in sorted(groups.items(), key=lambda item: item[1]["seq"]):
+                last = records[e["seq"]]
+                files = {path: records[holder[(path, digest)]]["files"][path] for path, digest in e["manifest"].items()}
+                tmp.append(agent, iteration, files, metadata=last.get("metadata"), timestamp=last.get("timestamp"))
+
+            before = {"records": len(entries), "bytes": os.path.getsize(self.path)}
+            if not os.path.exists(tmp.path):
+                open(tmp.path, "wb").close()
+            after = {"records": len(tmp._entries), "bytes": os.path.getsize(tmp.path)}
+            os.replace(tmp.path, new_path)
+            if new_path != self.path:
+                os.remove(self.path)
+            if os.path.exists(tmp.index_path):
+                os.replace(tmp.index_path, self.index_path)
+            else:
+                open(self.index_path, "w").close()
+            self.path, self.codec, self._entries = new_path, codec, tmp._entries
+        return {"records_before": before["records"], "records_after": after["records"],
+                "bytes_before": before["bytes"], "bytes_after": after["bytes"]}
+
+
+def run_id_from_config(config: Optional[Dict[str, Any]]) -> str:
+    """The graph thread_id of a node's RunnableConfig, used as the run log name."""
+    return str(((config or {}).get("configurable") or {}).get("thread_id") or "default")
+
+
+# Open run logs, least recently used first. Each caches its index entries, so
+# only the most recent MAX_OPEN_RUN_LOGS stay in memory; an evicted log is
+# reopened (and its index re-read) on the next export to it.
+MAX_OPEN_RUN_LOGS = 64
+_run_logs: "OrderedDict[str, RunLog]" = OrderedDict()
+_run_logs_lock = threading.Lock()
+
+
+def _run_log_base(output_dir: str, run_id: str) -> str:
+    return os.path.join(output_dir, "runs", "".join(c if c.isalnum() or c in "-_." else "_" for c in run_id))
+
+
+def get_run_log(output_dir: str, run_id: str, compression: Optional[str] = None) -> RunLog:
+    """
+    Shared RunLog for a run, so parallel agents append under one lock.
+
+    An existing log is reused whatever its codec; new logs use `compression`.
+    """
+    base = _run_log_base(output_dir, run_id)
+    with _run_logs_lock:
+        for suffix in (".jsonl.zst", ".jsonl.gz", ".jsonl"):
+            path = base + suffix
+            if path in _run_logs or os.path.exists(path):
+                break
+        else:
+            path = base + ".jsonl" + _codec(compression).suffix
+        if path not in _run_logs:
+            _run_logs[path] = RunLog(path)
+            while len(_run_logs) > MAX_OPEN_RUN_LOGS:
+                _run_logs.popitem(last=False)
+        _run_logs.move_to_end(path)
+        return _run_logs[path]
+
+
+def release_run_log(run_id: str, output_dir: str = "output") -> bool:
+    """
+    Drop the cached RunLog of a finished or released run (the file stays).
+
+    Returns:
+        True if a log was cached
+    """
+    base = _run_log_base(output_dir, run_id)
+    with _run_logs_lock:
+        paths = [base + suffix for suffix in (".jsonl.zst", ".jsonl.gz", ".jsonl") if base + suffix in _run_logs]
+        for path in paths:
+            del _run_logs[path]
+    return bool(paths)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect, restore or compact AutoDev run logs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    show = commands.add_parser("show", help="List iterations, or restore one with --out")
+    show.add_argument("log")
+    show.add_argument("--iteration", type=int, help="Iteration to reconstruct (default: latest)")
+    show.add_argument("--out", help="Write the reconstructed files under this directory")
+    compact = commands.add_parser("compact", help="Merge records per iteration and agent")
+    compact.add_argument("log")
+    compact.add_argument("--keep-last", type=int, help="Fold older iterations into one base snapshot")
+    compact.add_argument("--compression", choices=["zstd", "gzip", "none"], help="Re-encode the log")
+    args = parser.parse_args(argv)
+
+    log = RunLog(args.log)
+    if args.command == "compact":
+        stats = log.compact(keep_last=args.keep_last, compression=args.compression)
+        print(f"[OK] Compacted {log.path}: {stats['records_before']} -> {stats['records_after']} records, "
+              f"{stats['bytes_before']:,} -> {stats['bytes_after']:,} bytes")
+        return 0
+
+    if args.out is None:
+        for iteration in log.iterations():
+            entries = [e for e in log.entries() if e["iteration"] == iteration]
+            stored = sum(len(e["stored"]) for e in entries)
+            agents = ", ".join(sorted({e["agent"] for e in entries}))
+            print(f"iteration {iteration}: {len(entries)} record(s), {stored} changed file(s) [{agents}]")
+        return 0
+
+    for agent, files in log.reconstruct(args.iteration).items():
+        for path, text in files.items():
+            target = os.path.join(args.out, agent, path)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, "w", encoding="utf-8") as f:
+                f.write(text)
+    print(f"[OK] Restored iteration {args.iteration if args.iteration is not None else 'latest'} to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,492 @@
+"""
+Static API contract check between api_spec, backend routes and frontend calls.
+
+The architect's OpenAPI spec is the contract, but nothing else enforces it:
+a backend that forgets a route, or a frontend that calls /api/todo instead
+of /todos, only shows up when someone clicks through the app. This module
+compares three indexes without running anything or calling the LLM:
+
+- the spec's operations (method + path, with servers/basePath prefixes),
+- backend routes: FastAPI/Flask decorators read with ast (APIRouter and
+  Blueprint prefixes, include_router/register_blueprint), and Express
+  app.get/router.post calls read with a small tokenizer (app.use prefixes),
+- frontend calls: fetch(), axios.get/post/..., axios({...}) and clients made
+  with axios.create({baseURL}), with template literals and string
+  concatenation reduced to path templates.
+
+Mismatches become structured errors for the reflector ({"agent",
+"instruction", "file", "line", "source": "contract"}). A typical project is
+checked in a few milliseconds.
+"""
+
+import ast
+import difflib
+import json
+import os
+import re
+import time
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+HTTP_METHODS = ("get", "post", "put", "patch", "delete")
+_ASSET_EXTENSIONS = (".css", ".js", ".png", ".jpg", ".jpeg", ".svg", ".ico", ".gif", ".json", ".html", ".map", ".woff", ".woff2")
+_LOCAL_HOSTS = re.compile(r"^(?:localhost|127\.0\.0\.1|0\.0\.0\.0|\[::1\]|[\w-]+)(?::\d+)?$")
+_PARAM = "{}"
+_DYNAMIC = "\x00"  # placeholder for an expression inside a URL
+
+# Express
+_JS_ROUTE = re.compile(r"\b(\w+)\s*\.\s*(get|post|put|patch|delete|all)\s*\(\s*(['\"`])([^'\"`]*)\3")
+_JS_USE = re.compile(r"\b(\w+)\s*\.\s*use\s*\(\s*(['\"`])([^'\"`]*)\2\s*,\s*(\w+)")
+_JS_REQUIRE = re.compile(r"\b(?:const|let|var)\s+(\w+)\s*=\s*require\(\s*['\"]([^'\"]+)['\"]\s*\)")
+_JS_IMPORT = re.compile(r"\bimport\s+(\w+)\s+from\s+['\"]([^'\"]+)['\"]")
+
+# Frontend calls
+_FETCH = re.compile(r"\bfetch\s*\(")
+_AXIOS_METHOD = re.compile(r"\b(\w+)\s*\.\s*(get|post|put|patch|delete)\s*\(")
+_AXIOS_CONFIG = re.compile(r"\baxios\s*\(")
+_AXIOS_CREATE = re.compile(r"\b(\w+)\s*=\s*axios\s*\.\s*create\s*\(")
+_METHOD_OPTION = re.compile(r"\bmethod\s*:\s*['\"`](\w+)['\"`]", re.IGNORECASE)
+_URL_OPTION = re.compile(r"\b(?:url|baseURL)\s*:\s*")
+
+
+# --- Paths ---
+
+def normalize_path(path: str) -> str:
+    """Path template with every parameter as {} and no trailing slash."""
+    path = re.sub(r"\{[^}]*\}|<[^>]*>|(?<=/):\w+|" + _DYNAMIC + r"+", _PARAM, path.split("?")[0].split("#")[0])
+    segments = [s if _PARAM not in s or s == _PARAM else _PARAM for s in path.split("/")]
+    path = "/".join(segments)
+    if len(path) > 1:
+        path = path.rstrip("/")
+    return path if path.startswith("/") else "/" + path
+
+
+def _join(*parts: str) -> str:
+    return normalize_path("/".join(p.strip("/") for p in parts if p and p.strip("/")))
+
+
+def paths_match(called: str, template: str) -> bool:
+    """Segment-wise match; {} on either side matches any segment."""
+    a, b = called.split("/"), template.split("/")
+    return len(a) == len(b) and all(x == y or _PARAM in (x, y) for x, y in zip(a, b))
+
+
+# --- Spec ---
+
+def spec_index(api_spec: Any) -> Dict[Tuple[str, str], str]:
+    """
+    Operations of an OpenAPI / Swagger spec.
+
+    Returns:
+        {(METHOD, normalized path): path as written in the spec}; the
+        servers[0].url path or basePath is prepended
+    """
+    if isinstance(api_spec, str):
+        try:
+            api_spec = json.loads(api_spec) if api_spec.strip() else {}
+        except ValueError:
+            return {}
+    if not isinstance(api_spec, dict):
+        return {}
+    base = api_spec.get("basePath") or ""
+    servers = api_spec.get("servers") or []
+    if not base and servers and isinstance(servers[0], dict):
+        base = re.sub(r"^\w+://[^/]+", "", str(servers[0].get("url", "")))
+    index = {}
+    for path, operations in (api_spec.get("paths") or {}).items():
+        if not isinstance(operations, dict):
+            continue
+        for method in operations:
+            if method.lower() in HTTP_METHODS:
+                index[(method.upper(), _join(base, path))] = path
+    return index
+
+
+# --- Backend: Python ---
+
+def _const_str(node: Optional[ast.AST]) -> Optional[str]:
+    return node.value if isinstance(node, ast.Constant) and isinstance(node.value, str) else None
+
+
+def _keyword(call: ast.Call, *names: str) -> Optional[ast.AST]:
+    return next((k.value for k in call.keywords if k.arg in names), None)
+
+
+def _python_routes(path: str, source: str) -> Dict[str, Any]:
+    """Routes, router prefixes, include calls and imports of one module."""
+    info: Dict[str, Any] = {"routes": [], "prefixes": {}, "includes": [], "imports": {}}
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return info
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign) and isinstance(node.value, ast.Call):
+            func = node.value.func
+            name = func.attr if isinstance(func, ast.Attribute) else getattr(func, "id", "")
+            if name in ("APIRouter", "Blueprint"):
+                prefix = _const_str(_keyword(node.value, "prefix", "url_prefix")) or ""
+                for target in node.targets:
+                    if isinstance(target, ast.Name):
+                        info["prefixes"][target.id] = prefix
+        elif isinstance(node, ast.ImportFrom):
+            for alias in node.names:
+                info["imports"][alias.asname or alias.name] = (node.module or "", alias.name)
+        elif isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.args:
+            if node.func.attr in ("include_router", "register_blueprint"):
+                prefix = _const_str(_keyword(node, "prefix", "url_prefix")) or ""
+                info["includes"].append((ast.unparse(node.args[0]), prefix))
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            for decorator in node.decorator_list:
+                if not (isinstance(decorator, ast.Call) and isinstance(decorator.func, ast.Attribute)):
+                    continue
+                owner = decorator.func.value
+                var = owner.id if isinstance(owner, ast.Name) else ast.unparse(owner)
+                route = _const_str(decorator.args[0]) if decorator.args else _const_str(_keyword(decorator, "path", "rule"))
+                if route is None:
+                    continue
+                attr = decorator.func.attr.lower()
+                if attr in HTTP_METHODS:
+                    methods = [attr.upper()]
+                elif attr in ("route", "api_route"):
+                    listed = _keyword(decorator, "methods")
+                    methods = [m.upper() for m in (_const_str(e) for e in getattr(listed, "elts", [])) if m] or ["GET"]
+                else:
+                    continue
+                for method in methods:
+                    info["routes"].append({"var": var, "method": method, "path": route, "line": decorator.lineno})
+    return info
+
+
+def _stem(module: str) -> str:
+    return module.replace("\\", "/").rsplit("/", 1)[-1].rsplit(".", 1)[-1] if module else ""
+
+
+def _file_stem(path: str) -> str:
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def backend_routes(files: Mapping[str, str]) -> List[Dict[str, Any]]:
+    """
+    Routes the backend defines.
+
+    Returns:
+        [{"method", "path" (normalized, prefixes applied), "file", "line"}]
+    """
+    modules = {p: _python_routes(p, files[p]) for p in files if p.endswith(".py")}
+
+    # (module stem, router variable) -> prefix added by include_router/register_blueprint
+    included: Dict[Tuple[str, str], str] = {}
+    for path, info in modules.items():
+        for target, prefix in info["includes"]:
+            if "." in target:
+                owner, var = target.rsplit(".", 1)
+                module, name = info["imports"].get(owner, ("", owner))
+                included[(_stem(name) or _stem(module), var)] = prefix
+            else:
+                module, name = info["imports"].get(target, ("", target))
+                included[(_stem(module) or _file_stem(path), name)] = prefix
+
+    routes = []
+    for path, info in modules.items():
+        stem = _file_stem(path)
+        for route in info["routes"]:
+            prefix = included.get((stem, route["var"]), "")
+            full = _join(prefix, info["prefixes"].get(route["var"], ""), route["path"])
+            routes.append({"method": route["method"], "path": full, "file": path, "line": route["line"]})
+
+    for path in files:
+        if path.endswith((".js", ".mjs", ".cjs", ".ts")):
+            routes.extend(_express_routes(path, files[path], files))
+    return routes
+
+
+# --- JavaScript ---
+
+def _strip_comments(source: str) -> str:
+    """Blank out comments, keeping strings and every offset and newline."""
+    out = list(source)
+    i, n = 0, len(source)
+    quote = None
+    while i < n:
+        ch = source[i]
+        if quote:
+            if ch == "\\":
+                i += 2
+                continue
+            if ch == quote:
+                quote = None
+            elif ch == "\n" and quote != "`":
+                quote = None
+            i += 1
+            continue
+        if ch in "'\"`":
+            quote = ch
+        elif source.startswith("//", i):
+            end = source.find("\n", i)
+            end = n if end == -1 else end
+            out[i:end] = " " * (end - i)
+            i = end
+            continue
+        elif source.startswith("/*", i):
+            end = source.find("*/", i + 2)
+            end = n if end == -1 else end + 2
+            out[i:end] = [c if c == "\n" else " " for c in source[i:end]]
+            i = end
+            continue
+        i += 1
+    return "".join(out)
+
+
+def _call_arguments(text: str, open_paren: int) -> List[str]:
+    """Top-level arguments of the call whose "(" is at open_paren."""
+    args, depth, start = [], 0, open_paren + 1
+    i, n = open_paren, len(text)
+    quote = None
+    while i < n:
+        ch = text[i]
+        if quote:
+            if ch == "\\":
+                i += 2
+                continue
+            if ch == quote:
+                quote = None
+        elif ch in "'\"`":
+            quote = ch
+        elif ch in "([{":
+            depth += 1
+        elif ch in ")]}":
+            depth -= 1
+            if depth == 0:
+                args.append(text[start:i])
+                break
+        elif ch == "," and depth == 1:
+            args.append(text[start:i])
+            start = i + 1
+        i += 1
+    return [a.strip() for a in args if a.strip()]
+
+
+def _line(text: str, offset: int) -> int:
+    return text.count("\n", 0, offset) + 1
+
+
+def _express_routes(path: str, source: str, files: Mapping[str, str]) -> List[Dict[str, Any]]:
+    text = _strip_comments(source)
+    # Prefix mounted for this file by another file's app.use('/prefix', imported)
+    prefix = ""
+    stem = _file_stem(path)
+    for other, other_source in files.items():
+        if not other.endswith((".js", ".mjs", ".cjs", ".ts")):
+            continue
+        other_text = _strip_comments(other_source)
+        imported = {m.group(1): m.group(2) for m in _JS_REQUIRE.finditer(other_text)}
+        imported.update({m.group(1): m.group(2) for m in _JS_IMPORT.finditer(other_text)})
+        for use in _JS_USE.finditer(other_text):
+            module = imported.get(use.group(4))
+            if module and _file_stem(module) == stem:
+                prefix = use.group(3)
+    routes = []
+    for match in _JS_ROUTE.finditer(text):
+        if match.group(1) in ("axios", "fetch", "http", "client", "api", "req", "res"):
+            continue
+        methods = HTTP_METHODS if match.group(2) == "all" else (match.group(2),)
+        for method in methods:
+            routes.append({"method": method.upper(), "path": _join(prefix, match.group(4)), "file": path, "line": _line(text, match.start())})
+    return routes
+
+
+def _literal(expr: str) -> Optional[str]:
+    expr = expr.strip()
+    if len(expr) >= 2 and expr[0] == expr[-1] and expr[0] in "'\"":
+        return expr[1:-1]
+    if len(expr) >= 2 and expr[0] == expr[-1] == "`":
+        return re.sub(r"\$\{[^}]*\}", _DYNAMIC, expr[1:-1])
+    return None
+
+
+def _split_concat(expr: str) -> List[str]:
+    parts, depth, start, quote = [], 0, 0, None
+    for i, ch in enumerate(expr):
+        if quote:
+            if ch == quote and expr[i - 1] != "\\":
+                quote = None
+        elif ch in "'\"`":
+            quote = ch
+        elif ch in "([{":
+            depth += 1
+        elif ch in ")]}":
+            depth -= 1
+        elif ch == "+" and depth == 0:
+            parts.append(expr[start:i])
+            start = i + 1
+    parts.append(expr[start:])
+    return [p.strip() for p in parts]
+
+
+def url_template(expr: str, bases: Optional[Mapping[str, str]] = None) -> Optional[str]:
+    """
+    Path template of a URL expression, or None if it is not a backend path.
+
+    `${API}/items/${id}` and API_URL + '/items/' + id both give
+    /items/{}; a client's baseURL is prepended via `bases`.
+    """
+    pieces = []
+    for part in _split_concat(expr):
+        literal = _literal(part)
+        pieces.append(literal if literal is not None else _DYNAMIC)
+    text = "".join(pieces)
+    if not text.strip(_DYNAMIC):
+        return None
+    host = re.match(r"^(?:https?:)?//([^/]*)", text)
+    if host:
+        if not _LOCAL_HOSTS.match(host.group(1).replace(_DYNAMIC, "x")):
+            return None  # third-party API
+        text = text[host.end():]
+    # A leading base URL expression (API_URL, process.env.X, ${BASE})
+    text = re.sub("^" + _DYNAMIC + "+(?=/)", "", text)
+    if not text.startswith("/"):
+        return None
+    path = text.split("?")[0].split("#")[0]
+    if os.path.splitext(path)[1].lower() in _ASSET_EXTENSIONS:
+        return None
+    return normalize_path(path)
+
+
+def frontend_calls(files: Mapping[str, str]) -> List[Dict[str, Any]]:
+    """
+    HTTP calls the frontend makes.
+
+    Returns:
+        [{"method", "path" (template), "file", "line"}]
+    """
+    calls = []
+    for path, source in files.items():
+        if not path.endswith((".js", ".jsx", ".ts", ".tsx", ".mjs", ".vue")):
+            continue
+        text = _strip_comments(source)
+        clients = {"axios": ""}
+        for match in _AXIOS_CREATE.finditer(text):
+            config = " ".join(_call_arguments(text, match.end() - 1))
+            base = _URL_OPTION.search(config)
+            clients[match.group(1)] = ""
+            if base:
+                value = _call_arguments("(" + config[base.end():] + ")", 0)
+                template = url_template(value[0]) if value else None
+                clients[match.group(1)] = template or ""
+
+        def add(method: str, url_expr: str, offset: int, base: str = "") -> None:
+            template = url_template(url_expr)
+            if template is None and base:
+                # Relative to the client's baseURL: api.get('items')
+                template = url_template(f"'/' + {url_expr}")
+            if template is not None:
+                calls.append({"method": method.upper(), "path": _join(base, template), "file": path, "line": _line(text, offset)})
+
+        for match in _FETCH.finditer(text):
+            args = _call_arguments(text, match.end() - 1)
+            if args:
+                method = _METHOD_OPTION.search(args[1]) if len(args) > 1 else None
+                add(method.group(1) if method else "GET", args[0], match.start())
+        for match in _AXIOS_METHOD.finditer(text):
+            if match.group(1) not in clients:
+                continue
+            args = _call_arguments(text, match.end() - 1)
+            if args:
+                add(match.group(2), args[0], match.start(), clients[match.group(1)])
+        for match in _AXIOS_CONFIG.finditer(text):
+            args = _call_arguments(text, match.end() - 1)
+            config = args[0] if args else ""
+            url = re.search(r"\burl\s*:\s*", config)
+            if url:
+                value = _call_arguments("(" + config[url.end():] + ")", 0)
+                method = _METHOD_OPTION.search(config)
+                if value:
+                    add(method.group(1) if method else "GET", value[0], match.start())
+    return calls
+
+
+# --- Report ---
+
+def _suggest(path: str, method: str, spec: Iterable[Tuple[str, str]]) -> str:
+    same_method = [p for m, p in spec if m == method]
+    close = difflib.get_close_matches(path, same_method or [p for _, p in spec], n=2, cutoff=0.5)
+    return f" Did you mean {' or '.join(f'{method} {c}' for c in close)}?" if close else ""
+
+
+def check_contract(api_spec: Any, frontend_files: Mapping[str, str], backend_files: Mapping[str, str]) -> Dict[str, Any]:
+    """
+    Compare the spec with the backend's routes and the frontend's calls.
+
+    Args:
+        api_spec: OpenAPI spec (dict or JSON string)
+        frontend_files / backend_files: {path: text} of the generated code
+
+    Returns:
+        {"errors": [structured errors], "warnings": [str], "operations",
+        "backend_routes", "frontend_calls", "ms"}. Backend errors are only
+        reported when at least one route was found, so an unsupported
+        framework does not flag every operation.
+    """
+    started = time.perf_counter()
+    spec = spec_index(api_spec)
+    routes = backend_routes(backend_files)
+    calls = frontend_calls(frontend_files)
+    errors: List[Dict[str, Any]] = []
+    warnings: List[str] = []
+
+    def in_spec(method: str, path: str) -> bool:
+        return any(m == method and paths_match(path, p) for m, p in spec)
+
+    if spec and routes:
+        files_by_count: Dict[str, int] = {}
+        for route in routes:
+            files_by_count[route["file"]] = files_by_count.get(route["file"], 0) + 1
+        busiest = max(files_by_count, key=files_by_count.get)
+        for (method, path), written in spec.items():
+            if any(r["method"] == method and paths_match(r["path"], path) for r in routes):
+                continue
+            sibling = next((r for r in routes if paths_match(r["path"], path)), None)
+            errors.append({
+                "agent": "backend",
+                "instruction": f"Implement {method} {written} from the API spec; no backend route handles it"
+                               + (f" (only {sibling['method']} is defined for this path)." if sibling else "."),
+                "file": sibling["file"] if sibling else busiest,
+                "source": "contract",
+            })
+        for route in routes:
+            if not in_spec(route["method"], route["path"]):
+                warnings.append(f"{route['file']}:{route['line']} {route['method']} {route['path']} is not in the API spec")
+
+    if spec:
+        for call in calls:
+            if in_spec(call["method"], call["path"]):
+                continue
+            other = sorted({m for m, p in spec if paths_match(call["path"], p)})
+            hint = (f" The spec defines {', '.join(other)} for this path." if other
+                    else _suggest(call["path"], call["method"], spec))
+            errors.append({
+                "agent": "frontend",
+                "instruction": f"{call['file']} line {call['line']} calls {call['method']} {call['path']}, "
+                               f"which is not in the API spec.{hint} Call the endpoints exactly as the spec defines them.",
+                "file": call["file"],
+                "line": call["line"],
+                "source": "contract",
+            })
+        called = [(c["method"], c["path"]) for c in calls]
+        for method, path in spec:
+            if calls and not any(m == method and paths_match(p, path) for m, p in called):
+                warnings.append(f"{method} {path} is never called by the frontend")
+
+    return {
+        "errors": errors,
+        "warnings": warnings,
+        "operations": len(spec),
+        "backend_routes": len(routes),
+        "frontend_calls": len(calls),
+        "ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+def contract_mode() -> str:
+    """AUTODEV_CONTRACT_CHECK: "on" (mismatches fail the sandbox), "warn" or "off"."""
+    mode = os.getenv("AUTODEV_CONTRACT_CHECK", "on").strip().lower()
+    return mode if mode in ("on", "warn", "off") else "on"
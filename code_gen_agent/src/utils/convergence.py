@@ -0,0 +1,103 @@
+"""
+Convergence tracking for the repair loop.
+
+A fixed iteration limit treats every run alike: a loop that fixes two of
+three errors per round is cut off one round short, while a loop that keeps
+producing the same errors (or flips a file between two versions) burns its
+whole budget on LLM calls that cannot help. The reflector records one
+fingerprint per iteration (a hash of the error set and of the file
+manifests) and decides here whether to continue:
+
+- "passed": no errors left and the sandbox reported SUCCESS
+- "sandbox_error": no errors to route, but the sandbox did not succeed (it
+  crashed, or failed in a way the classifier cannot map to a file)
+- "no_progress": the same errors as the previous iteration
+- "oscillating": the code is back to a version from an earlier iteration
+- "max_iterations": the budget is used up
+- "" (continue), with the budget raised by one while the error count has
+  fallen on each of the last rounds (up to AUTODEV_MAX_ITERATIONS_CAP)
+
+Configuration:
+    AUTODEV_MAX_ITERATIONS       base repair budget (default: 3)
+    AUTODEV_MAX_ITERATIONS_CAP   budget ceiling when the loop is improving (default: 2x the base)
+    AUTODEV_CONVERGENCE          on (default) / off (fixed budget only)
+"""
+
+import hashlib
+import os
+import re
+from typing import Any, Dict, Iterable, List, Mapping, Tuple
+
+# Consecutive drops in the error count before the budget is extended
+IMPROVING_ROUNDS = 2
+_NUMBERS = re.compile(r"\d+")
+
+
+def max_iterations() -> int:
+    """Repair budget: reflector passes allowed before stopping (AUTODEV_MAX_ITERATIONS, default 3)."""
+    return int(os.getenv("AUTODEV_MAX_ITERATIONS", "3"))
+
+
+def max_iterations_cap() -> int:
+    """Largest budget an improving loop can reach (AUTODEV_MAX_ITERATIONS_CAP, default 2x the base)."""
+    value = os.getenv("AUTODEV_MAX_ITERATIONS_CAP")
+    return max(int(value), max_iterations()) if value else 2 * max_iterations()
+
+
+def convergence_enabled() -> bool:
+    return os.getenv("AUTODEV_CONVERGENCE", "on").strip().lower() not in ("0", "off", "false", "no")
+
+
+def error_fingerprint(errors: Iterable[Dict]) -> str:
+    """
+    Hash of an error set, independent of order and of line numbers.
+
+    Line numbers move whenever a file is edited; an error that only moved is
+    still the same error.
+    """
+    keys = sorted(
+        f"{e.get('agent', '')}|{e.get('file', '')}|{_NUMBERS.sub('#', str(e.get('instruction', '')))}"
+        for e in errors
+    )
+    return hashlib.sha256("\n".join(keys).encode("utf-8")).hexdigest()[:16]
+
+
+def files_fingerprint(*manifests: Mapping[str, str]) -> str:
+    """Hash of the {path: digest} manifests (the digests already hash the content)."""
+    entries = sorted(f"{i}/{path}:{digest}" for i, manifest in enumerate(manifests) for path, digest in (manifest or {}).items())
+    return hashlib.sha256("\n".join(entries).encode("utf-8")).hexdigest()[:16]
+
+
+def _improving(history: List[Dict[str, Any]]) -> bool:
+    counts = [entry["errors"] for entry in history[-(IMPROVING_ROUNDS + 1):]]
+    return len(counts) == IMPROVING_ROUNDS + 1 and all(b < a for a, b in zip(counts, counts[1:]))
+
+
+def assess(history: List[Dict[str, Any]], iteration: int, budget: int, sandbox_status: str = "SUCCESS") -> Tuple[str, int]:
+    """
+    Decide whether the repair loop continues after the latest iteration.
+
+    Args:
+        history: One {"iteration", "errors" (count), "error_fp", "files_fp"}
+            entry per reflector pass, the latest last
+        iteration: iteration_count after the latest pass
+        budget: Current budget (the loop stops once iteration exceeds it)
+        sandbox_status: Status of the sandbox run the errors came from
+
+    Returns:
+        (stop reason, or "" to continue; budget for the next pass)
+    """
+    latest = history[-1]
+    if latest["errors"] == 0:
+        return ("passed" if sandbox_status == "SUCCESS" else "sandbox_error"), budget
+    if convergence_enabled() and len(history) > 1:
+        previous = history[-2]
+        if latest["error_fp"] == previous["error_fp"]:
+            return "no_progress", budget
+        if latest["files_fp"] != previous["files_fp"] and any(e["files_fp"] == latest["files_fp"] for e in history[:-2]):
+            return "oscillating", budget
+    if iteration > budget:
+        if convergence_enabled() and _improving(history) and budget < max_iterations_cap():
+            return "", budget + 1
+        return "max_iterations", budget
+    return "", budget
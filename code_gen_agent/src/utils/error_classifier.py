@@ -0,0 +1,264 @@
+"""
+Deterministic error classification for the reflector.
+
+Most failed iterations are mechanical: a SyntaxError found by the sandbox,
+a JSON file that does not parse, a missing package.json, a pasted Python
+traceback. These map straight to the reflector's structured errors
+({"agent", "instruction", "file", "line"}) without asking the LLM. Only
+feedback that the rules cannot fully explain (free-form requests such as
+"make it dark mode") still goes to the model.
+"""
+
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+AGENTS = ("frontend", "backend", "infra")
+INFRA_FILES = ("docker-compose.yml", "docker-compose.yaml", "Dockerfile", ".dockerignore")
+
+# Lines of a pasted log that carry no instruction of their own
+_NOISE = re.compile(
+    r"^\s*(?:$|Traceback \(most recent call last\)|File \"|at\s|\^+$|~+\^*~*$|\.\.\.|During handling|"
+    r"The above exception|npm (?:ERR!|error)|>|\$|#|\[\w+\]|-{3,}|={3,}|\d+\s*\|)"
+)
+
+_PY_FRAME = re.compile(r'File "([^"]+)", line (\d+)')
+_PY_ERROR = re.compile(r"^\s*(?:[\w.]+\.)?(\w*(?:Error|Exception)|KeyboardInterrupt|SystemExit):\s*(.*)$")
+_PY_COMPILE_LOCATION = re.compile(r"\(([^()]+\.py), line (\d+)\)")
+_JS_LOCATION = re.compile(r"((?:[\w.-]+/)*[\w.-]+\.(?:jsx?|tsx?|mjs|cjs))[:(\s]+\(?(\d+)[:,](\d+)\)?")
+_JSON_ERROR = re.compile(r"(JSONDecodeError|Unexpected token .* in JSON|is not valid JSON|JSON\.parse)", re.IGNORECASE)
+_MISSING_FILE = re.compile(r"(?:ENOENT|no such file or directory|Could not read|not found)[^'\"]*['\"]?([\w./-]*package\.json)", re.IGNORECASE)
+_MODULE_NOT_FOUND_PY = re.compile(r"ModuleNotFoundError: No module named '([\w.]+)'")
+_MODULE_NOT_FOUND_JS = re.compile(r"(?:Module not found: (?:Error: )?Can't resolve|Cannot find module) '([^']+)'")
+_COMPOSE_ERROR = re.compile(r"(docker-compose\.ya?ml|services\.[\w-]+|yaml: line \d+)", re.IGNORECASE)
+
+
+def agent_for_path(path: str, default: Optional[str] = None) -> Optional[str]:
+    """Guess the owning agent of a file path."""
+    normalized = path.replace("\\", "/").lstrip("./")
+    parts = normalized.split("/")
+    for part in parts:
+        if part in AGENTS:
+            return part
+    name = parts[-1]
+    if name in INFRA_FILES or name.startswith("docker-compose"):
+        return "infra"
+    if name.endswith(".py") or name == "requirements.txt":
+        return "backend"
+    if name.endswith((".jsx", ".tsx", ".css", ".html")):
+        return "frontend"
+    return default
+
+
+def _error(agent: str, instruction: str, file: Optional[str] = None, line: Optional[int] = None, source: str = "rules") -> Dict:
+    error = {"agent": agent, "instruction": instruction, "source": source}
+    if file:
+        error["file"] = file
+    if line:
+        error["line"] = int(line)
+    return error
+
+
+def classify_sandbox(summary: Dict, frontend_paths: Optional[Iterable[str]] = None) -> List[Dict]:
+    """
+    Turn a sandbox summary (the JSON sandbox_node produces) into structured errors.
+
+    Args:
+        summary: Sandbox log summary with file_checks / backend_syntax_errors
+        frontend_paths: Paths of the generated frontend files, used to detect
+            a missing package.json
+
+    Returns:
+        One error per error-severity checker issue, plus runtime smoke test
+        failures, API contract mismatches and structural problems
+    """
+    errors = []
+    file_checks = summary.get("file_checks") or {}
+    for rel_path, issues in file_checks.items():
+        section, _, path = rel_path.partition("/")
+        agent = section if section in AGENTS else agent_for_path(rel_path, "backend")
+        for issue in issues:
+            if issue.get("severity") != "error":
+                continue
+            where = f" at line {issue['line']}" if issue.get("line") else ""
+            errors.append(_error(
+                agent,
+                f"Fix the {issue.get('checker', 'static check')} error in {path or rel_path}{where}: {issue.get('message', '')}",
+                file=path or rel_path,
+                line=issue.get("line"),
+            ))
+
+    if not file_checks:
+        # Older summaries only carry the backend syntax check
+        for path, message in (summary.get("backend_syntax_errors") or {}).items():
+            line = re.search(r"line (\d+)", message)
+            errors.append(_error("backend", f"Fix {message} in {path}", file=path, line=line.group(1) if line else None))
+
+    errors.extend(_runtime_errors(summary.get("runtime") or {}))
+    contract = summary.get("contract") or {}
+    if contract.get("mode", "on") == "on":
+        errors.extend(contract.get("errors") or [])
+
+    if frontend_paths is not None:
+        paths = list(frontend_paths)
+        if paths and not any(os.path.basename(p) == "package.json" for p in paths):
+            errors.append(_error(
+                "frontend",
+                "The frontend has no package.json. Add frontend/package.json with the React dependencies and start/build scripts.",
+                file="frontend/package.json",
+            ))
+    return errors
+
+
+def _project_frame(traceback_text: str) -> Tuple[Optional[str], Optional[str]]:
+    """Innermost frame in the generated code (the smoke test relativizes those paths)."""
+    frames = [m.groups() for m in _PY_FRAME.finditer(traceback_text or "")]
+    project = [f for f in frames if not os.path.isabs(f[0]) and not f[0].startswith("<")]
+    return project[-1] if project else (None, None)
+
+
+def _runtime_errors(runtime: Dict) -> List[Dict]:
+    """Errors for a failed runtime smoke test (see runtime_smoke.py)."""
+    if runtime.get("status") != "failed":
+        return []
+    module_path = (runtime.get("module") or "main").replace(".", "/") + ".py"
+    if not runtime.get("import_ok"):
+        path, line = _project_frame(runtime.get("traceback", ""))
+        return [_error(
+            "backend",
+            f"The backend app ({module_path}) fails to start: {runtime.get('import_error', '')}. Fix it so the module imports cleanly.",
+            file=path or module_path,
+            line=line,
+        )]
+    errors = []
+    for endpoint in runtime.get("endpoints", []):
+        if endpoint.get("ok"):
+            continue
+        route = f"{endpoint.get('method')} {endpoint.get('path')}"
+        if "not implemented" in str(endpoint.get("error", "")):
+            errors.append(_error("backend", f"{route} is in the API spec but has no handler. Implement it.", file=module_path))
+            continue
+        path, line = _project_frame(endpoint.get("traceback", ""))
+        status = f" with HTTP {endpoint['status']}" if endpoint.get("status") else ""
+        errors.append(_error(
+            "backend",
+            f"{route} fails at runtime{status}: {str(endpoint.get('error', ''))[:300]}",
+            file=path or module_path,
+            line=line,
+        ))
+    return errors
+
+
+def classify_log(text: str) -> Tuple[List[Dict], bool]:
+    """
+    Match common error patterns in pasted logs.
+
+    Returns:
+        (errors, fully_explained). fully_explained is False when the text also
+        contains lines the rules do not understand (usually prose from a
+        person), in which case the LLM should still read it.
+    """
+    errors: List[Dict] = []
+    explained = set()
+    lines = text.splitlines()
+    last_frame: Optional[Tuple[str, str]] = None
+
+    for i, line in enumerate(lines):
+        frame = _PY_FRAME.search(line)
+        if frame:
+            last_frame = (frame.group(1), frame.group(2))
+            explained.add(i)
+            # The quoted source line that follows a frame
+            if i + 1 < len(lines) and lines[i + 1].startswith((" ", "\t")) and not _PY_FRAME.search(lines[i + 1]):
+                explained.add(i + 1)
+            continue
+        if i in explained:
+            continue
+
+        module = _MODULE_NOT_FOUND_PY.search(line)
+        if module:
+            errors.append(_error(
+                "backend",
+                f"ModuleNotFoundError: '{module.group(1)}' is imported but not installed. Add it to requirements.txt or remove the import.",
+                file=last_frame[0] if last_frame else "requirements.txt",
+                line=last_frame[1] if last_frame else None,
+            ))
+            explained.add(i)
+            last_frame = None
+            continue
+
+        module = _MODULE_NOT_FOUND_JS.search(line)
+        if module:
+            errors.append(_error(
+                "frontend",
+                f"Cannot resolve module '{module.group(1)}'. Create the file or fix the import path, or add the package to package.json.",
+            ))
+            explained.add(i)
+            continue
+
+        missing = _MISSING_FILE.search(line)
+        if missing:
+            path = missing.group(1)
+            errors.append(_error(agent_for_path(path, "frontend"), f"{path} is missing. Generate it with dependencies and scripts.", file=path))
+            explained.add(i)
+            continue
+
+        if _JSON_ERROR.search(line):
+            location = re.search(r"([\w./-]+\.json)", line)
+            path = location.group(1) if location else (last_frame[0] if last_frame and last_frame[0].endswith(".json") else None)
+            errors.append(_error(
+                agent_for_path(path or "", "frontend"),
+                f"Invalid JSON{' in ' + path if path else ''}: {line.strip()}. Return strictly valid JSON.",
+                file=path,
+            ))
+            explained.add(i)
+            continue
+
+        py_error = _PY_ERROR.match(line)
+        if py_error:
+            name, message = py_error.group(1), py_error.group(2)
+            location = _PY_COMPILE_LOCATION.search(message)
+            path, lineno = (location.group(1), location.group(2)) if location else (last_frame or (None, None))
+            js_location = None if path else _JS_LOCATION.search(line)
+            if js_location:
+                path, lineno = js_location.group(1), js_location.group(2)
+            agent = agent_for_path(path or "", "frontend" if js_location else "backend")
+            where = f" in {path}" + (f" at line {lineno}" if lineno else "") if path else ""
+            errors.append(_error(agent, f"Fix {name}{where}: {message}", file=path, line=lineno))
+            explained.add(i)
+            last_frame = None
+            continue
+
+        js_location = _JS_LOCATION.search(line)
+        if js_location and re.search(r"error|unexpected|failed", line, re.IGNORECASE):
+            path, lineno = js_location.group(1), js_location.group(2)
+            errors.append(_error(agent_for_path(path, "frontend"), f"Fix the error in {path} at line {lineno}: {line.strip()}", file=path, line=lineno))
+            explained.add(i)
+            continue
+
+        if _COMPOSE_ERROR.search(line) and re.search(r"error|invalid|unsupported|not allowed|additional propert", line, re.IGNORECASE):
+            errors.append(_error("infra", f"Fix docker-compose.yml: {line.strip()}", file="docker-compose.yml"))
+            explained.add(i)
+            continue
+
+    residual = [
+        line for i, line in enumerate(lines)
+        if i not in explained and not _NOISE.match(line) and len(line.split()) >= 3
+    ]
+    return _dedupe(errors), bool(errors) and not residual
+
+
+def _dedupe(errors: List[Dict]) -> List[Dict]:
+    seen = set()
+    unique = []
+    for error in errors:
+        key = (error.get("agent"), error.get("file"), error.get("line"), error.get("instruction"))
+        if key not in seen:
+            seen.add(key)
+            unique.append(error)
+    return unique
+
+
+def merge_errors(*groups: Iterable[Dict]) -> List[Dict]:
+    """Concatenate error lists, dropping exact duplicates."""
+    return _dedupe([error for group in groups for error in group])
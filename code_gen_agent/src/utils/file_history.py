@@ -0,0 +1,95 @@
+"""
+File browsing and cross-checkpoint diffs of generated code.
+
+Each checkpoint of a thread holds the {path: digest} manifests of the
+generated files, so comparing two versions of a project only compares
+digests; file text is read from the blob store only for the one file being
+displayed or diffed. Used by the Streamlit file browser (streamlit_app.py).
+"""
+
+import difflib
+import os
+from typing import Any, Dict, Iterable, List, Mapping
+
+from src.utils.convergence import files_fingerprint
+
+SECTIONS = ("frontend", "backend", "infra")
+
+LANGUAGES = {
+    ".py": "python", ".js": "javascript", ".jsx": "javascript", ".ts": "typescript", ".tsx": "typescript",
+    ".json": "json", ".css": "css", ".html": "html", ".md": "markdown", ".yml": "yaml", ".yaml": "yaml",
+    ".sh": "bash", ".sql": "sql", ".toml": "toml", ".txt": "text",
+}
+
+
+def language_for(path: str) -> str:
+    """Syntax highlighting language of a file path."""
+    name = os.path.basename(path)
+    if name == "Dockerfile" or name.startswith("Dockerfile."):
+        return "docker"
+    return LANGUAGES.get(os.path.splitext(name)[1].lower(), "text")
+
+
+def group_by_directory(paths: Iterable[str]) -> Dict[str, List[str]]:
+    """
+    {directory: [paths]} with directories and files sorted ("" is the root).
+
+    A file tree one level at a time: pick a directory, then one of its files.
+    """
+    groups: Dict[str, List[str]] = {}
+    for path in sorted(paths):
+        groups.setdefault(os.path.dirname(path.replace("\\", "/")), []).append(path)
+    return dict(sorted(groups.items()))
+
+
+def diff_manifests(old: Mapping[str, str], new: Mapping[str, str]) -> Dict[str, List[str]]:
+    """Paths added, removed and changed between two manifests (by digest only)."""
+    old, new = old or {}, new or {}
+    return {
+        "added": sorted(p for p in new if p not in old),
+        "removed": sorted(p for p in old if p not in new),
+        "changed": sorted(p for p in new if p in old and new[p] != old[p]),
+    }
+
+
+def unified_diff(old_text: str, new_text: str, path: str, context: int = 3) -> str:
+    """Unified diff of one file between two versions."""
+    return "".join(difflib.unified_diff(
+        old_text.splitlines(keepends=True), new_text.splitlines(keepends=True),
+        fromfile=f"a/{path}", tofile=f"b/{path}", n=context,
+    ))
+
+
+def checkpoints_with_files(history: Iterable[Any]) -> List[Dict[str, Any]]:
+    """
+    Checkpoints of a thread at which the generated files changed.
+
+    Args:
+        history: StateSnapshots, newest first (graph.get_state_history)
+
+    Returns:
+        Oldest first: [{"checkpoint_id", "step", "iteration", "label",
+        "files": {section: manifest}}]
+    """
+    checkpoints: List[Dict[str, Any]] = []
+    last_fp = None
+    for snapshot in reversed(list(history)):
+        values = snapshot.values or {}
+        files = {section: dict(values.get(f"{section}_files") or {}) for section in SECTIONS}
+        if not any(files.values()):
+            continue
+        fp = files_fingerprint(*files.values())
+        if fp == last_fp:
+            continue
+        last_fp = fp
+        step = (snapshot.metadata or {}).get("step")
+        iteration = values.get("iteration_count", 0)
+        count = sum(len(manifest) for manifest in files.values())
+        checkpoints.append({
+            "checkpoint_id": snapshot.config["configurable"].get("checkpoint_id"),
+            "step": step,
+            "iteration": iteration,
+            "label": f"step {step} · iteration {iteration} · {count} files",
+            "files": files,
+        })
+    return checkpoints
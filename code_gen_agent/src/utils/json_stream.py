@@ -0,0 +1,100 @@
+"""
+Incremental parser for streamed JSON responses.
+
+The agents answer with one JSON object ({path: code}) or list. While tokens
+arrive, IncrementalJSONParser reports each top-level member as soon as it
+is complete, so the UI can show a file before the whole response is done.
+"""
+
+import json
+from typing import Any, List, Optional, Tuple
+
+
+class IncrementalJSONParser:
+    """
+    Feed text chunks; get back completed top-level members.
+
+    For an object, members are (key, value) pairs; for a list, (index, value).
+    Anything before the first '{' or '[' (Markdown fences, chatty preambles)
+    is ignored, as is anything after the top-level value closes.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self._pos = 0              # next character of buffer to scan
+        self._root: Optional[str] = None  # "{" or "[" once the top-level value starts
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member_start = 0     # buffer index where the current member begins
+        self._index = 0            # next list index
+        self.done = False
+
+    def feed(self, text: str) -> List[Tuple[Any, Any]]:
+        """
+        Add a chunk of text.
+
+        Returns:
+            Members completed by this chunk, in order
+        """
+        self.buffer += text
+        completed = []
+        buffer = self.buffer
+        i = self._pos
+
+        while i < len(buffer) and not self.done:
+            ch = buffer[i]
+
+            if self._root is None:
+                if ch in "{[":
+                    self._root = ch
+                    self._depth = 1
+                    self._member_start = i + 1
+                i += 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                i += 1
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    member = self._parse_member(buffer[self._member_start:i])
+                    if member is not None:
+                        completed.append(member)
+                    self.done = True
+            elif ch == "," and self._depth == 1:
+                member = self._parse_member(buffer[self._member_start:i])
+                if member is not None:
+                    completed.append(member)
+                self._member_start = i + 1
+            i += 1
+
+        self._pos = i
+        return completed
+
+    def _parse_member(self, text: str) -> Optional[Tuple[Any, Any]]:
+        if not text.strip():
+            return None
+        try:
+            if self._root == "{":
+                key, value = next(iter(json.loads("{" + text + "}").items()))
+                return key, value
+            value = json.loads(text)
+        except (json.JSONDecodeError, StopIteration):
+            # Malformed member: leave it to the final full parse to report
+            return None
+        index = self._index
+        self._index += 1
+        return index, value
@@ -0,0 +1,242 @@
+"""
+Persistent on-disk cache for LLM responses.
+
+Responses are content-addressed: the key is a SHA-256 hash of the model name,
+temperature, system prompt and user prompt. With temperature=0 the same
+prompt always maps to the same answer, so replaying a stored response is safe.
+
+Entries age from their last use (the file's mtime, refreshed on every hit):
+lookups treat entries idle longer than max_age_seconds as misses, and
+eviction removes them and then the least recently used ones over the entry
+and size limits. Writes keep a running entry count and size, so the
+directory is only scanned when a limit is crossed or every
+`sweep_interval` seconds, not on every put.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+
+class LLMResponseCache:
+    """Store raw LLM responses on disk, one JSON file per prompt hash."""
+
+    def __init__(
+        self,
+        cache_dir: str = "llm_cache",
+        max_entries: int = 2000,
+        max_bytes: int = 256 * 1024 * 1024,
+        max_age_seconds: Optional[float] = 7 * 24 * 3600,
+        readonly: bool = False,
+        sweep_interval: float = 3600.0,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding the cached responses (default: llm_cache/)
+            max_entries: Maximum number of responses kept on disk
+            max_bytes: Maximum total size of the cache directory in bytes
+            max_age_seconds: Entries unused for longer than this are treated as misses (None disables)
+            readonly: Replay mode. Lookups are served but nothing is written or evicted.
+            sweep_interval: Seconds between scans that drop expired entries
+        """
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.readonly = readonly
+        self.sweep_interval = sweep_interval
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Entry count and bytes on disk, as of the last scan plus our own writes.
+        # Other processes sharing the directory are only seen by the next scan.
+        self._entries: Optional[int] = None
+        self._bytes = 0
+        self._last_sweep = 0.0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(model: str, temperature: float, system_prompt: str, user_prompt: str) -> str:
+        """Hash the inputs that fully determine a deterministic response."""
+        payload = json.dumps(
+            [model, float(temperature), system_prompt, user_prompt],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Return the cached response text for a key, or None on a miss.
+
+        Expired entries count as misses (and are removed unless read-only).
+        """
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                last_used = os.fstat(f.fileno()).st_mtime
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        if self.max_age_seconds is not None:
+            # Same clock as evict(): time since the entry was written or last hit
+            if time.time() - last_used > self.max_age_seconds:
+                if not self.readonly:
+                    self._remove(path)
+                with self._lock:
+                    self.misses += 1
+                return None
+
+        if not self.readonly:
+            # Touch the file so eviction is least-recently-used
+            try:
+                os.utime(path, None)
+            except OSError:
+                pass
+
+        with self._lock:
+            self.hits += 1
+        return entry.get("content")
+
+    def put(self, key: str, content: str, model: str = "") -> None:
+        """Store a response. No-op in read-only mode."""
+        if self.readonly:
+            return
+
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {"key": key, "model": model, "created": time.time(), "content": content}
+
+        # Write to a temp file and rename so concurrent readers never see a partial entry
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        size = os.path.getsize(tmp_path)
+        try:
+            replaced = os.path.getsize(path)
+        except OSError:
+            replaced = None
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._entries is not None:
+                self._entries += 1 if replaced is None else 0
+                self._bytes += size - (replaced or 0)
+            due = (
+                self._entries is None
+                or self._entries > self.max_entries
+                or self._bytes > self.max_bytes
+                or time.time() - self._last_sweep > self.sweep_interval
+            )
+        if due:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Enforce the age, entry-count and size limits.
+
+        Returns:
+            Number of entries removed
+        """
+        if self.readonly:
+            return 0
+
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+
+        removed = 0
+        now = time.time()
+        if self.max_age_seconds is not None:
+            fresh = []
+            for mtime, size, path in entries:
+                if now - mtime > self.max_age_seconds:
+                    removed += self._remove(path)
+                else:
+                    fresh.append((mtime, size, path))
+            entries = fresh
+
+        # Oldest access first. Over a limit, go down to 90% of it so the
+        # next few puts do not trigger another scan.
+        entries.sort()
+        total_bytes = sum(size for _, size, _ in entries)
+        if len(entries) > self.max_entries or total_bytes > self.max_bytes:
+            max_entries, max_bytes = self.max_entries - self.max_entries // 10, self.max_bytes - self.max_bytes // 10
+            while entries and (len(entries) > max_entries or total_bytes > max_bytes):
+                _, size, path = entries.pop(0)
+                total_bytes -= size
+                removed += self._remove(path)
+
+        with self._lock:
+            self._entries, self._bytes, self._last_sweep = len(entries), total_bytes, now
+        return removed
+
+    def _remove(self, path: str) -> int:
+        try:
+            os.remove(path)
+            return 1
+        except OSError:
+            return 0
+
+    def clear(self) -> None:
+        """Remove every cached response."""
+        if self.readonly:
+            return
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".json"):
+                    self._remove(os.path.join(root, name))
+        with self._lock:
+            self._entries, self._bytes = 0, 0
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+def cache_from_env() -> Optional[LLMResponseCache]:
+    """
+    Build the response cache from environment variables.
+
+    AUTODEV_LLM_CACHE: "off" disables the cache, "readonly" enables replay mode,
+        anything else (default "on") enables read/write caching.
+    AUTODEV_LLM_CACHE_DIR: Cache directory (default: llm_cache/)
+    AUTODEV_LLM_CACHE_MAX_ENTRIES / AUTODEV_LLM_CACHE_MAX_MB / AUTODEV_LLM_CACHE_MAX_AGE_HOURS:
+        Eviction limits.
+    """
+    mode = os.getenv("AUTODEV_LLM_CACHE", "on").strip().lower()
+    if mode in ("off", "0", "false", "no"):
+        return None
+
+    max_age_hours = float(os.getenv("AUTODEV_LLM_CACHE_MAX_AGE_HOURS", "168"))
+    return LLMResponseCache(
+        cache_dir=os.getenv("AUTODEV_LLM_CACHE_DIR", "llm_cache"),
+        max_entries=int(os.getenv("AUTODEV_LLM_CACHE_MAX_ENTRIES", "2000")),
+        max_bytes=int(float(os.getenv("AUTODEV_LLM_CACHE_MAX_MB", "256")) * 1024 * 1024),
+        max_age_seconds=max_age_hours * 3600 if max_age_hours > 0 else None,
+        readonly=mode in ("readonly", "replay", "ro"),
+    )
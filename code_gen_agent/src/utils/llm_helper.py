@@ -1,33 +1,98 @@
+"""
+JSON-returning LLM calls shared by every agent.
+
+Importing this module is cheap: the provider client, response cache, rate
+limiter and prefix cache are built on first use (or first attribute access,
+e.g. `llm_helper.llm`), after .env has been loaded. Assigning an attribute
+(tests, benchmarks, use_llm) replaces it without building the default.
+"""
+
 import os
 import json
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
+import threading
+from typing import Any, Optional
+from src.utils.llm_cache import cache_from_env
+from src.utils.json_stream import IncrementalJSONParser
+from src.utils.usage import estimate_tokens, record_usage, record_cache_hit, record_retry
+from src.utils.telemetry import annotate, get_tracer, increment, mark_error
+from src.utils.prefix_cache import prefix_cache_from_env
+from src.utils.rate_limiter import acall_with_retry, call_with_retry, limiter_from_env, retry_policy_from_env
 
 # --- Configuration ---
-api_key = os.getenv("GOOGLE_API_KEY")
+TEMPERATURE = 0
 
-# --- Imports & Initialization ---
-llm = None
-ChatPromptTemplate = None
+# Built on first use by _load(): api_key, MODEL_NAME, llm, llm_cache
+# (AUTODEV_LLM_CACHE*), rate_limiter / retry_policy (rate_limiter.py) and
+# prefix_cache (prefix_cache.py)
+_LAZY_ATTRIBUTES = ("api_key", "MODEL_NAME", "llm", "llm_cache", "rate_limiter", "retry_policy", "prefix_cache")
+_load_lock = threading.RLock()
+_env_loaded = False
+
+
+def _load_env() -> None:
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
+
+def _load(name: str) -> Any:
+    """Build a lazy module attribute unless it has been set already."""
+    with _load_lock:
+        namespace = globals()
+        if name in namespace:
+            return namespace[name]
+        _load_env()
+        if name in ("MODEL_NAME", "llm"):
+            from src.utils.llm_providers import create_llm
+            # Provider is chosen by AUTODEV_LLM_PROVIDER ("gemini" by default, "stub" offline)
+            model_name, model = create_llm()
+            namespace.setdefault("MODEL_NAME", model_name)
+            namespace.setdefault("llm", model)
+        elif name == "api_key":
+            namespace[name] = os.getenv("GOOGLE_API_KEY")
+        elif name == "llm_cache":
+            namespace[name] = cache_from_env()
+        elif name == "rate_limiter":
+            namespace[name] = limiter_from_env()
+        elif name == "retry_policy":
+            namespace[name] = retry_policy_from_env()
+        elif name == "prefix_cache":
+            namespace[name] = prefix_cache_from_env()
+        return namespace[name]
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_ATTRIBUTES:
+        return _load(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _get(name: str) -> Any:
+    """Current value of a lazy attribute (module globals are not seen by __getattr__)."""
+    value = globals().get(name, _load)
+    return _load(name) if value is _load else value
 
-try:
-    # UPDATED: Use the correct modern package for Google Gemini
-    # pip install langchain-google-genai langchain-core
-    from langchain_google_genai import ChatGoogleGenerativeAI
-    from langchain_core.prompts import ChatPromptTemplate
-    
-    if api_key:
-        # Initialize the model with a standard version tag
-        llm = ChatGoogleGenerativeAI(
-            model="gemini-2.5-flash",
-            google_api_key=api_key,
-            temperature=0
-        )
-except ImportError:
-    print("⚠️ Warning: 'langchain_google_genai' or 'langchain_core' not found.")
-    print("   Please run: pip install langchain-google-genai langchain-core")
+
+def use_llm(provider: Optional[str] = None, **kwargs):
+    """
+    Swap the chat model used by every agent.
+
+    Args:
+        provider: "gemini" or "stub" (see llm_providers.create_llm)
+        **kwargs: Provider specific options, e.g. fixture=..., latency=0.2
+
+    Returns:
+        The new llm instance
+    """
+    from src.utils.llm_providers import create_llm
+
+    global MODEL_NAME, llm, prefix_cache
+    _load_env()
+    MODEL_NAME, llm = create_llm(provider, **kwargs)
+    prefix_cache = prefix_cache_from_env(provider)
+    return llm
 
 
 def print_message_event(role: str, content, label: str = ""):
@@ -64,79 +129,315 @@ def print_message_event(role: str, content, label: str = ""):
     print(f"   {content_preview}\n")
 
 
-def invoke_llm_json(system_prompt: str, user_prompt: str) -> dict:
+def _clean_json_text(content: str) -> str:
+    """Strip Markdown fences and chatty preambles around a JSON payload."""
+    # Remove Markdown fences if present
+    if "```json" in content:
+        content = content.split("```json")[1].split("```")[0].strip()
+    elif "```" in content:
+        content = content.split("```")[1].split("```")[0].strip()
+
+    # Fallback: finding the first '{' or '[' if the LLM was chatty
+    if not (content.startswith("{") or content.startswith("[")):
+        start = content.find("{")
+        end = content.rfind("}") + 1
+        if start != -1 and end != -1:
+            content = content[start:end]
+        else:
+            # Try list format
+            start = content.find("[")
+            end = content.rfind("]") + 1
+            if start != -1 and end != -1:
+                content = content[start:end]
+    return content
+
+
+def _lookup_cache(system_prompt: str, user_prompt: str):
     """
-    Helper to invoke Gemini and parse JSON output.
-    Logs all messages for debugging.
+    Check the response cache.
+
+    Returns:
+        (cache_key, parsed_result) where parsed_result is None on a miss
+    """
+    llm_cache = _get("llm_cache")
+    if llm_cache is None:
+        return None, None
+
+    cache_key = llm_cache.make_key(_get("MODEL_NAME"), TEMPERATURE, system_prompt, user_prompt)
+    cached = llm_cache.get(cache_key)
+    if cached is not None:
+        print(f"[CACHE] LLM cache hit ({cache_key[:12]})")
+        try:
+            return cache_key, json.loads(_clean_json_text(cached))
+        except json.JSONDecodeError:
+            # Corrupt entry: fall through and ask the model again
+            pass
+    return cache_key, None
+
+
+def _build_chain(system_prompt: str, user_prompt: str):
     """
+    Build the prompt | llm chain, raising if Gemini is not configured.
+
+    `system_prompt` is the full stable prefix. The prefix cache may bind a
+    provider-side cache to the model, in which case only the user message
+    is sent.
+
+    Returns:
+        (chain, inputs)
+    """
+    llm = _get("llm")
+    try:
+        from langchain_core.prompts import ChatPromptTemplate
+    except ImportError:
+        ChatPromptTemplate = None
     if llm is None or ChatPromptTemplate is None:
         raise RuntimeError(
-            "Gemini LLM is not configured.\n"
+            "LLM is not configured.\n"
             "1. Install packages: pip install langchain-google-genai langchain-core\n"
-            "2. Set GOOGLE_API_KEY in your .env file."
+            "2. Set GOOGLE_API_KEY in your .env file.\n"
+            "   (or set AUTODEV_LLM_PROVIDER=stub to run offline)"
         )
 
+    model, send_prefix, info = _get("prefix_cache").prepare(llm, _get("MODEL_NAME"), system_prompt)
+    if info:
+        annotate(**info)
+
     # Print the messages being sent to the LLM
-    print_message_event("system", system_prompt, "system_prompt")
+    print_message_event("system", system_prompt if send_prefix else "(cached prefix)", "system_prompt")
     print_message_event("user", user_prompt, "user_prompt")
 
     # 1. Define the Template with variables
     # We use {sys} and {usr} placeholders to prevent LangChain from crashing 
     # if your actual prompt text contains curly braces (common in code).
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", "{sys}"),
-        ("user", "{usr}")
-    ])
+    if send_prefix:
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", "{sys}"),
+            ("user", "{usr}")
+        ])
+        inputs = {"sys": system_prompt, "usr": user_prompt}
+    else:
+        prompt = ChatPromptTemplate.from_messages([("user", "{usr}")])
+        inputs = {"usr": user_prompt}
 
     # 2. Create Chain
-    chain = prompt | llm
+    return prompt | model, inputs
+
+
+def _content_text(content) -> str:
+    """Handle message content which may be a string or list"""
+    if isinstance(content, list):
+        # If it's a list, join the items (common in some LLM responses)
+        return "".join(
+            item.get("text", "") if isinstance(item, dict) else str(item) for item in content
+        )
+    # Otherwise treat it as a string
+    return str(content)
+
+
+# --- Streaming ---
+# Inside a LangGraph run, tokens and completed top-level JSON members are
+# pushed to the "custom" stream as {"agent", "event": "token"|"item", ...}.
+
+def _stream_writer():
+    """Return the LangGraph custom stream writer, or None outside a graph run."""
+    if os.getenv("AUTODEV_LLM_STREAM", "on").strip().lower() in ("off", "0", "false", "no"):
+        return None
+    try:
+        from langgraph.config import get_stream_writer
+        return get_stream_writer()
+    except Exception:
+        return None
+
+
+class _StreamCollector:
+    """Accumulate streamed chunks and forward tokens/members to the writer."""
+
+    def __init__(self, writer, agent: str):
+        self.writer = writer
+        self.agent = agent
+        self.parser = IncrementalJSONParser()
+        self.response = None
+
+    def add(self, chunk) -> None:
+        self.response = chunk if self.response is None else self.response + chunk
+        text = _content_text(chunk.content)
+        if not text:
+            return
+        self.writer({"agent": self.agent, "event": "token", "text": text})
+        for key, value in self.parser.feed(text):
+            self.writer({"agent": self.agent, "event": "item", "key": key, "value": value})
+
+
+def _emit_result(agent: str, result) -> None:
+    """Push a complete (e.g. cached) result to the stream as items."""
+    writer = _stream_writer()
+    if writer is None:
+        return
+    items = result.items() if isinstance(result, dict) else enumerate(result if isinstance(result, list) else [])
+    for key, value in items:
+        writer({"agent": agent, "event": "item", "key": key, "value": value})
 
+
+def _with_context(system_prompt: str, context: str) -> str:
+    return f"{system_prompt}\n\n{context}" if context else system_prompt
+
+
+def _retry_notifier(writer, agent: str):
+    """on_retry callback: log, count, and tell the UI to discard partial output."""
+    def notify(attempt: int, error: BaseException, delay: float) -> None:
+        print(f"[WARN] LLM call failed ({type(error).__name__}: {str(error)[:120]}), "
+              f"retry {attempt + 1}/{_get('retry_policy').max_retries} in {delay:.1f}s")
+        record_retry()
+        increment("retries")
+        if writer is not None:
+            writer({"agent": agent, "event": "retry", "attempt": attempt + 1, "delay": delay})
+    return notify
+
+
+def _finish_response(response, prompt_text: str, cache_key) -> dict:
+    """Account for a completed call, then parse it."""
+    if response is None:
+        print("[ERROR] LLM Error: empty response stream")
+        return {}
+    usage = record_usage(response, prompt_text, _content_text(response.content))
+    annotate(
+        input_tokens=usage["input_tokens"],
+        cached_input_tokens=usage.get("cached_input_tokens", 0),
+        output_tokens=usage["output_tokens"],
+        estimated_tokens=bool(usage.get("estimated_calls")),
+    )
+    rate_limiter = _get("rate_limiter")
+    if rate_limiter is not None:
+        rate_limiter.charge(usage["output_tokens"])
+    return _parse_response(response, cache_key)
+
+
+def _parse_response(response, cache_key) -> dict:
+    """Extract text from an LLM response, parse it as JSON and cache it."""
     content = ""  # Initialize here to avoid unbound reference in exception handler
-    
+
     try:
-        # 3. Invoke with specific inputs
-        response = chain.invoke({
-            "sys": system_prompt, 
-            "usr": user_prompt
-        })
-
-        # Handle response.content which may be a string or list
-        if isinstance(response.content, list):
-            # If it's a list, join the items (common in some LLM responses)
-            content = "".join(str(item) for item in response.content).strip()
-        else:
-            # Otherwise treat it as a string
-            content = str(response.content).strip()
+        content = _content_text(response.content).strip()
 
         # Print AI response
         print_message_event("ai", content, "ai_response")
 
-        # 4. robust JSON Cleanup
-        # Remove Markdown fences if present
-        if "```json" in content:
-            content = content.split("```json")[1].split("```")[0].strip()
-        elif "```" in content:
-            content = content.split("```")[1].split("```")[0].strip()
-            
-        # Fallback: finding the first '{' or '[' if the LLM was chatty
-        if not (content.startswith("{") or content.startswith("[")):
-            start = content.find("{")
-            end = content.rfind("}") + 1
-            if start != -1 and end != -1:
-                content = content[start:end]
-            else:
-                # Try list format
-                start = content.find("[")
-                end = content.rfind("]") + 1
-                if start != -1 and end != -1:
-                    content = content[start:end]
+        # robust JSON Cleanup
+        raw_content = content
+        content = _clean_json_text(content)
 
-        return json.loads(content)
+        result = json.loads(content)
+
+        # Only cache responses that parsed, so a bad answer is retried next time
+        llm_cache = _get("llm_cache")
+        if llm_cache is not None and cache_key is not None:
+            llm_cache.put(cache_key, raw_content, model=_get("MODEL_NAME"))
+
+        return result
 
     except json.JSONDecodeError as e:
         print(f"[ERROR] JSON Parse Error: {e}")
+        annotate(parse_error=True)
         print(f"   Raw Content: {content[:200] if content else 'Unknown'}...")  # Print first 200 chars for debug
         return {}
     except Exception as e:
         print(f"[ERROR] LLM Error: {e}")
-        return {}
\ No newline at end of file
+        return {}
+
+
+def invoke_llm_json(system_prompt: str, user_prompt: str, agent: str = "", context: str = "") -> dict:
+    """
+    Helper to invoke Gemini and parse JSON output.
+    Logs all messages for debugging.
+
+    Responses are served from the on-disk cache when the same model,
+    temperature and prompts were seen before. Inside a graph run the
+    response is streamed token by token to the "custom" stream, labelled
+    with `agent`. Each call is recorded as an "llm" telemetry span.
+
+    `context` is project-level text shared by many calls (API contract,
+    plan). It is appended to the system prompt to form a stable prefix that
+    the prefix cache can reuse; `user_prompt` should hold only the delta.
+    """
+    with get_tracer().span(agent or "llm", kind="llm", model=_get("MODEL_NAME")):
+        return _invoke_llm_json(_with_context(system_prompt, context), user_prompt, agent)
+
+
+def _invoke_llm_json(system_prompt: str, user_prompt: str, agent: str) -> dict:
+    cache_key, cached = _lookup_cache(system_prompt, user_prompt)
+    if cached is not None:
+        record_cache_hit()
+        annotate(cache_hit=True)
+        _emit_result(agent, cached)
+        return cached
+
+    chain, inputs = _build_chain(system_prompt, user_prompt)
+    writer = _stream_writer()
+
+    def request():
+        # Invoke with specific inputs
+        if writer is None:
+            return chain.invoke(inputs)
+        collector = _StreamCollector(writer, agent)
+        for chunk in chain.stream(inputs):
+            collector.add(chunk)
+        return collector.response
+
+    try:
+        response = call_with_retry(
+            request, _get("rate_limiter"), _get("retry_policy"),
+            tokens=estimate_tokens(system_prompt + user_prompt),
+            on_retry=_retry_notifier(writer, agent),
+        )
+    except Exception as e:
+        print(f"[ERROR] LLM Error: {e}")
+        mark_error(e)
+        return {}
+
+    return _finish_response(response, system_prompt + user_prompt, cache_key)
+
+
+async def ainvoke_llm_json(system_prompt: str, user_prompt: str, agent: str = "", context: str = "") -> dict:
+    """
+    Async variant of invoke_llm_json.
+
+    Awaits the network call instead of blocking, so several agents running
+    in the same LangGraph superstep share one event loop and overlap their
+    Gemini round trips.
+    """
+    with get_tracer().span(agent or "llm", kind="llm", model=_get("MODEL_NAME")):
+        return await _ainvoke_llm_json(_with_context(system_prompt, context), user_prompt, agent)
+
+
+async def _ainvoke_llm_json(system_prompt: str, user_prompt: str, agent: str) -> dict:
+    cache_key, cached = _lookup_cache(system_prompt, user_prompt)
+    if cached is not None:
+        record_cache_hit()
+        annotate(cache_hit=True)
+        _emit_result(agent, cached)
+        return cached
+
+    chain, inputs = _build_chain(system_prompt, user_prompt)
+    writer = _stream_writer()
+
+    async def request():
+        if writer is None:
+            return await chain.ainvoke(inputs)
+        collector = _StreamCollector(writer, agent)
+        async for chunk in chain.astream(inputs):
+            collector.add(chunk)
+        return collector.response
+
+    try:
+        response = await acall_with_retry(
+            request, _get("rate_limiter"), _get("retry_policy"),
+            tokens=estimate_tokens(system_prompt + user_prompt),
+            on_retry=_retry_notifier(writer, agent),
+        )
+    except Exception as e:
+        print(f"[ERROR] LLM Error: {e}")
+        mark_error(e)
+        return {}
+
+    return _finish_response(response, system_prompt + user_prompt, cache_key)
@@ -0,0 +1,225 @@
+"""
+LLM provider selection.
+
+The graph talks to a chat model through `prompt | llm`. This module decides
+which model sits behind `llm`:
+
+- "gemini" (default): ChatGoogleGenerativeAI, needs GOOGLE_API_KEY
+- "stub": StubChatModel, a deterministic offline model that replays
+  recorded responses with a configurable latency
+
+Select with AUTODEV_LLM_PROVIDER, or call llm_helper.use_llm(...) at runtime.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.utils.usage import estimate_tokens
+
+DEFAULT_GEMINI_MODEL = "gemini-2.5-flash"
+
+try:
+    from langchain_core.messages import AIMessage, AIMessageChunk
+    from langchain_core.runnables import Runnable
+except ImportError:  # pragma: no cover - langchain_core is a hard dependency of the graph
+    AIMessage = AIMessageChunk = None
+    Runnable = object
+
+
+class StubChatModel(Runnable):
+    """
+    Offline chat model that replays recorded responses.
+
+    Each rule matches a substring of the system prompt (and optionally of the
+    user prompt) and returns the recorded response. Rules are tried in order;
+    the first match wins. Unmatched prompts get `default`.
+
+    `model_name` is "stub:" plus a hash of the rules and default, so the LLM
+    response cache never serves one fixture's answers to another.
+    """
+
+    model_name = "stub"
+
+    def __init__(
+        self,
+        rules: Optional[List[Dict[str, Any]]] = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        default: Any = None,
+        seed: int = 0,
+        chunk_size: int = 64,
+        input_latency_per_1k: float = 0.0,
+    ):
+        """
+        Args:
+            rules: List of {"match": str, "user_match": str (optional), "response": Any}.
+                Non-string responses are serialized with json.dumps.
+            latency: Seconds to wait before answering, simulating network time
+            jitter: Extra uniform random latency in [0, jitter) seconds
+            default: Response for prompts no rule matches (default: {})
+            seed: Seed for the jitter RNG, so runs are reproducible
+            chunk_size: Characters per chunk when streaming
+            input_latency_per_1k: Extra seconds per 1000 uncached prompt tokens,
+                so prefix caching shows up in simulated latency
+        """
+        self.rules = rules or []
+        self.latency = latency
+        self.jitter = jitter
+        self.default = {} if default is None else default
+        recorded = json.dumps([self.rules, self.default], sort_keys=True, default=str)
+        self.model_name = f"stub:{hashlib.sha256(recorded.encode('utf-8')).hexdigest()[:12]}"
+        self.chunk_size = max(1, chunk_size)
+        self.input_latency_per_1k = input_latency_per_1k
+        self.calls = 0
+        self._rng = random.Random(seed)
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "StubChatModel":
+        """
+        Load rules from a JSON fixture file.
+
+        The file is a list of rules. A rule may use "response_file" (relative
+        to the fixture) instead of an inline "response".
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            rules = json.load(f)
+
+        base_dir = os.path.dirname(os.path.abspath(path))
+        for rule in rules:
+            if "response_file" in rule:
+                with open(os.path.join(base_dir, rule["response_file"]), "r", encoding="utf-8") as f:
+                    rule["response"] = json.load(f)
+        return cls(rules=rules, **kwargs)
+
+    def _answer(self, input: Any) -> str:
+        messages = input.to_messages() if hasattr(input, "to_messages") else list(input)
+        system_prompt = next((str(m.content) for m in messages if m.type == "system"), "")
+        user_prompt = next((str(m.content) for m in messages if m.type == "human"), "")
+
+        response = self.default
+        for rule in self.rules:
+            if rule.get("match", "") not in system_prompt:
+                continue
+            if rule.get("user_match", "") not in user_prompt:
+                continue
+            response = rule.get("response", self.default)
+            break
+
+        self.calls += 1
+        return response if isinstance(response, str) else json.dumps(response)
+
+    def _delay(self) -> float:
+        return self.latency + (self._rng.random() * self.jitter if self.jitter else 0.0)
+
+    def _reply(self, input: Any, cached_tokens: int = 0):
+        """
+        Answer a prompt and simulate its cost.
+
+        Returns:
+            (text, usage_metadata, delay_seconds). Prompt tokens beyond
+            `cached_tokens` (prefix-cache reads) add input_latency_per_1k.
+        """
+        text = self._answer(input)
+        messages = input.to_messages() if hasattr(input, "to_messages") else list(input)
+        prompt_tokens = estimate_tokens("".join(str(m.content) for m in messages))
+        cached = min(cached_tokens, prompt_tokens)
+        output_tokens = estimate_tokens(text)
+        usage = {
+            "input_tokens": prompt_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": prompt_tokens + output_tokens,
+            "input_token_details": {"cache_read": cached},
+        }
+        delay = self._delay() + (prompt_tokens - cached) / 1000 * self.input_latency_per_1k
+        return text, usage, delay
+
+    def invoke(self, input: Any, config: Optional[Dict] = None, cached_tokens: int = 0, **kwargs: Any):
+        text, usage, delay = self._reply(input, cached_tokens)
+        if delay:
+            time.sleep(delay)
+        return AIMessage(content=text, usage_metadata=usage)
+
+    async def ainvoke(self, input: Any, config: Optional[Dict] = None, cached_tokens: int = 0, **kwargs: Any):
+        text, usage, delay = self._reply(input, cached_tokens)
+        if delay:
+            await asyncio.sleep(delay)
+        return AIMessage(content=text, usage_metadata=usage)
+
+    def _pieces(self, text: str) -> List[str]:
+        size = self.chunk_size
+        return [text[i:i + size] for i in range(0, len(text), size)] or [""]
+
+    def stream(self, input: Any, config: Optional[Dict] = None, cached_tokens: int = 0, **kwargs: Any):
+        """Yield the answer in chunk_size pieces, spreading the latency across them."""
+        text, usage, delay = self._reply(input, cached_tokens)
+        pieces = self._pieces(text)
+        for i, piece in enumerate(pieces):
+            if delay:
+                time.sleep(delay / len(pieces))
+            # Like Gemini, usage arrives with the final chunk
+            yield AIMessageChunk(content=piece, usage_metadata=usage if i == len(pieces) - 1 else None)
+
+    async def astream(self, input: Any, config: Optional[Dict] = None, cached_tokens: int = 0, **kwargs: Any):
+        text, usage, delay = self._reply(input, cached_tokens)
+        pieces = self._pieces(text)
+        for i, piece in enumerate(pieces):
+            if delay:
+                await asyncio.sleep(delay / len(pieces))
+            yield AIMessageChunk(content=piece, usage_metadata=usage if i == len(pieces) - 1 else None)
+
+
+def create_llm(provider: Optional[str] = None, **kwargs: Any) -> Tuple[str, Any]:
+    """
+    Build the chat model for a provider.
+
+    Args:
+        provider: "gemini" or "stub" (default: AUTODEV_LLM_PROVIDER, else "gemini")
+        **kwargs: Provider specific overrides (e.g. latency=0.5 for the stub)
+
+    Returns:
+        (model_name, llm). llm is None when the provider cannot be configured.
+        model_name is part of the LLM cache key, so providers never share entries.
+    """
+    provider = (provider or os.getenv("AUTODEV_LLM_PROVIDER", "gemini")).strip().lower()
+
+    if provider == "stub":
+        fixture = kwargs.pop("fixture", None) or os.getenv("AUTODEV_STUB_RESPONSES")
+        kwargs.setdefault("latency", float(os.getenv("AUTODEV_STUB_LATENCY", "0")))
+        if fixture:
+            model = StubChatModel.from_file(fixture, **kwargs)
+        else:
+            model = StubChatModel(**kwargs)
+        return model.model_name, model
+
+    if provider != "gemini":
+        raise ValueError(f"Unknown LLM provider: {provider!r} (expected 'gemini' or 'stub')")
+
+    model_name = kwargs.pop("model", None) or os.getenv("AUTODEV_GEMINI_MODEL", DEFAULT_GEMINI_MODEL)
+    try:
+        # UPDATED: Use the correct modern package for Google Gemini
+        # pip install langchain-google-genai langchain-core
+        from langchain_google_genai import ChatGoogleGenerativeAI
+    except ImportError:
+        print("⚠️ Warning: 'langchain_google_genai' or 'langchain_core' not found.")
+        print("   Please run: pip install langchain-google-genai langchain-core")
+        return model_name, None
+
+    api_key = kwargs.pop("google_api_key", None) or os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        return model_name, None
+
+    # Initialize the model with a standard version tag. The client's own retries
+    # are off: call_with_retry and the rate limiter own them (src/utils/rate_limiter.py)
+    llm = ChatGoogleGenerativeAI(
+        model=model_name,
+        google_api_key=api_key,
+        temperature=kwargs.pop("temperature", 0),
+        max_retries=kwargs.pop("max_retries", 0),
+        **kwargs,
+    )
+    return model_name, llm
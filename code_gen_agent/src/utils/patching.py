@@ -0,0 +1,190 @@
+"""
+Apply LLM-produced patches to a {path: text} file dict.
+
+In patch repair mode an agent answers with per-file edits instead of the
+whole codebase:
+
+    {"backend/main.py": {"diff": "@@ -3,1 +3,1 @@\n-x = 1\n+x = 2\n"},
+     "backend/models.py": {"replace": "full new content"},
+     "backend/old.py": {"delete": true}}
+
+A plain string value is treated as a full replacement.
+"""
+
+import os
+import re
+from typing import Dict, Iterable, List
+
+HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+class PatchError(Exception):
+    """Raised when a patch response cannot be applied cleanly."""
+
+
+def apply_unified_diff(original: str, diff: str) -> str:
+    """
+    Apply a unified diff to a string.
+
+    Hunks are located by their context, starting at the line number in the
+    header and searching outwards, so small line-number drift in LLM output
+    is tolerated. Trailing whitespace is ignored when matching.
+
+    Raises:
+        PatchError: if the diff has no hunks or a hunk's context is not found
+    """
+    lines = original.splitlines()
+    trailing_newline = original.endswith("\n") or not original
+
+    hunks = _parse_hunks(diff)
+    if not hunks:
+        raise PatchError("diff contains no hunks")
+
+    offset = 0
+    for start, old_block, new_block in hunks:
+        expected = max(start - 1, 0) + offset
+        position = _find_block(lines, old_block, expected)
+        if position is None:
+            preview = old_block[0] if old_block else ""
+            raise PatchError(f"hunk at line {start} does not match (context: {preview!r})")
+        lines[position:position + len(old_block)] = new_block
+        offset = position - max(start - 1, 0) + len(new_block) - len(old_block)
+
+    text = "\n".join(lines)
+    return text + "\n" if trailing_newline and lines else text
+
+
+def _parse_hunks(diff: str):
+    hunks = []
+    current = None
+    # Lines the current hunk's header still expects on the old and new side
+    old_left = new_left = 0
+    for raw in diff.splitlines():
+        header = HUNK_HEADER.match(raw)
+        if header:
+            current = (int(header.group(1)), [], [])
+            hunks.append(current)
+            old_left = int(header.group(2) or 1)
+            new_left = int(header.group(4) or 1)
+            continue
+        if current is not None and old_left <= 0 and new_left <= 0 and raw.startswith(("--- ", "+++ ")):
+            # The hunk is complete, so this starts the next file's headers
+            current = None
+        if current is None:
+            # File headers (---/+++/diff/index) before the first hunk. Inside a
+            # hunk "--- x" / "+++ x" are a removed "-- x" / an added "++ x"
+            continue
+        if raw.startswith("\\"):
+            # "\ No newline at end of file"
+            continue
+        _, old_block, new_block = current
+        tag, body = (raw[:1], raw[1:]) if raw else (" ", "")
+        if tag == " ":
+            old_block.append(body)
+            new_block.append(body)
+            old_left, new_left = old_left - 1, new_left - 1
+        elif tag == "-":
+            old_block.append(body)
+            old_left -= 1
+        elif tag == "+":
+            new_block.append(body)
+            new_left -= 1
+        else:
+            # LLMs sometimes drop the leading space on context lines
+            old_block.append(raw)
+            new_block.append(raw)
+            old_left, new_left = old_left - 1, new_left - 1
+    return hunks
+
+
+def _find_block(lines: List[str], block: List[str], expected: int):
+    if not block:
+        return min(max(expected, 0), len(lines))
+
+    wanted = [line.rstrip() for line in block]
+    last_start = len(lines) - len(block)
+    if last_start < 0:
+        return None
+
+    def matches(at: int) -> bool:
+        return all(lines[at + i].rstrip() == wanted[i] for i in range(len(wanted)))
+
+    expected = min(max(expected, 0), last_start)
+    for distance in range(0, last_start + 1):
+        for at in (expected - distance, expected + distance):
+            if 0 <= at <= last_start and matches(at):
+                return at
+    return None
+
+
+def apply_file_patches(files: Dict[str, str], patches: Dict) -> Dict[str, str]:
+    """
+    Apply a patch response to a copy of `files`.
+
+    Returns:
+        The updated {path: text} dict
+
+    Raises:
+        PatchError: on malformed entries, unknown paths for diffs, diffs
+            that do not apply, or a bare empty string for a non-empty file.
+            Empty files (e.g. __init__.py) are fine otherwise.
+    """
+    if not isinstance(patches, dict) or not patches:
+        raise PatchError("patch response is empty or not an object")
+
+    updated = dict(files)
+    for path, patch in patches.items():
+        if isinstance(patch, str):
+            # A bare "" is more likely a model placeholder than a request to
+            # clear the file; emptying one takes an explicit replace or diff
+            if not patch.strip() and updated.get(path, "").strip():
+                raise PatchError(f"{path}: empty content for a non-empty file (use {{\"replace\": \"\"}} to clear it)")
+            updated[path] = patch
+            continue
+        if not isinstance(patch, dict):
+            raise PatchError(f"{path}: expected an object with 'diff', 'replace' or 'delete'")
+
+        if patch.get("delete"):
+            updated.pop(path, None)
+        elif isinstance(patch.get("replace"), str):
+            updated[path] = patch["replace"]
+        elif isinstance(patch.get("diff"), str):
+            if path not in updated and not patch["diff"].lstrip().startswith(("@@ -0,0", "--- /dev/null")):
+                raise PatchError(f"{path}: diff for a file that does not exist")
+            try:
+                updated[path] = apply_unified_diff(updated.get(path, ""), patch["diff"])
+            except PatchError as e:
+                raise PatchError(f"{path}: {e}") from None
+        else:
+            raise PatchError(f"{path}: expected 'diff', 'replace' or 'delete'")
+
+    return updated
+
+
+def select_target_files(files: Iterable[str], errors: List[Dict]) -> List[str]:
+    """
+    Pick the files a list of structured errors refers to.
+
+    Uses explicit "file"/"files" fields first, then any path or distinctive
+    basename mentioned in the instruction text.
+
+    Returns:
+        Matching paths in project order (empty if nothing could be matched)
+    """
+    paths = list(files)
+    wanted = set()
+
+    for error in errors:
+        named = error.get("files") or []
+        if error.get("file"):
+            named = [error["file"], *named]
+        for name in named:
+            wanted.update(p for p in paths if p == name or p.endswith("/" + name.lstrip("./")))
+
+        text = str(error.get("instruction", ""))
+        for path in paths:
+            basename = os.path.basename(path)
+            if path in text or (len(basename) > 3 and re.search(rf"(?<![\w/.-]){re.escape(basename)}\b", text)):
+                wanted.add(path)
+
+    return [p for p in paths if p in wanted]
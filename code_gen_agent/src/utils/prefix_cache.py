@@ -0,0 +1,189 @@
+"""
+Prompt-prefix caching for the builder agents.
+
+The frontend, backend and infra calls of one project share a large, stable
+prefix: their system prompt followed by the API contract and architecture
+plan. llm_helper sends that prefix first and the per-call delta (the task,
+or the code and errors of a repair) last, and asks a PrefixCache to avoid
+paying for the prefix more than once:
+
+- GeminiPrefixCache stores the prefix as a Gemini cached content resource
+  (one per distinct prefix, kept for AUTODEV_PREFIX_CACHE_TTL seconds) and
+  binds `cached_content` to the model, so each call only sends the delta.
+- SimulatedPrefixCache is the offline stand-in: it tracks which prefixes
+  are warm and tells the stub model how many prompt tokens were cache
+  reads, so cached pricing and latency can be benchmarked without a key.
+
+Select with AUTODEV_PREFIX_CACHE: auto (default; Gemini for the gemini
+provider, simulated for the stub), gemini, simulate or off.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from src.utils.usage import estimate_tokens
+
+# Gemini rejects cached contents smaller than this many tokens (2.5 Flash)
+GEMINI_MIN_CACHE_TOKENS = 1024
+
+
+def shared_context(state: Dict[str, Any]) -> str:
+    """The per-project block every builder call starts with."""
+    return (
+        f"API Contract:\n{state.get('api_spec', '')}\n\n"
+        f"Architecture Plan:\n{state.get('architecture_plan', '')}"
+    )
+
+
+def prefix_digest(model_name: str, prefix: str) -> str:
+    return hashlib.sha256(f"{model_name}\0{prefix}".encode("utf-8")).hexdigest()
+
+
+class PrefixCache:
+    """No-op base: the full prefix is sent as the system message every time."""
+
+    name = "off"
+
+    def prepare(self, llm: Any, model_name: str, prefix: str) -> Tuple[Any, bool, Dict[str, Any]]:
+        """
+        Decide how to send a prompt whose stable part is `prefix`.
+
+        Returns:
+            (llm_to_use, send_prefix, info) where send_prefix says whether the
+            prefix must still be included as the system message, and info is
+            recorded on the call's telemetry span
+        """
+        return llm, True, {}
+
+    def clear(self) -> None:
+        """Release any cached prefixes."""
+
+
+class GeminiPrefixCache(PrefixCache):
+    """Explicit Gemini context caching of the shared prefix."""
+
+    name = "gemini"
+
+    def __init__(self, ttl_seconds: int = 3600, min_tokens: int = GEMINI_MIN_CACHE_TOKENS):
+        """
+        Args:
+            ttl_seconds: Lifetime of each cached content resource
+            min_tokens: Prefixes estimated below this size are sent inline
+        """
+        self.ttl_seconds = ttl_seconds
+        self.min_tokens = min_tokens
+        self._entries: Dict[str, Tuple[str, float]] = {}  # digest -> (cache name, expires at)
+        self._failed: set = set()
+        self._lock = threading.Lock()
+
+    def _create(self, llm: Any, model_name: str, prefix: str) -> str:
+        from google.genai import types
+
+        cache = llm.client.caches.create(
+            model=model_name,
+            config=types.CreateCachedContentConfig(
+                display_name="autodev-prefix",
+                system_instruction=prefix,
+                ttl=f"{self.ttl_seconds}s",
+            ),
+        )
+        return cache.name
+
+    def prepare(self, llm, model_name, prefix):
+        if estimate_tokens(prefix) < self.min_tokens or getattr(llm, "client", None) is None:
+            return llm, True, {}
+
+        digest = prefix_digest(model_name, prefix)
+        now = time.time()
+        with self._lock:
+            if digest in self._failed:
+                return llm, True, {}
+            entry = self._entries.get(digest)
+            if entry is not None and entry[1] - 60 > now:
+                return llm.bind(cached_content=entry[0]), False, {"prefix_cache": "hit"}
+
+        try:
+            name = self._create(llm, model_name, prefix)
+        except Exception as e:
+            # Unsupported model, quota, or SDK error: keep sending the prefix inline
+            print(f"[WARN] Could not create Gemini context cache ({type(e).__name__}: {e}), sending prefix inline")
+            with self._lock:
+                self._failed.add(digest)
+            return llm, True, {}
+
+        with self._lock:
+            self._entries[digest] = (name, now + self.ttl_seconds)
+        print(f"[CACHE] Created Gemini context cache {name}")
+        return llm.bind(cached_content=name), False, {"prefix_cache": "write"}
+
+    def clear(self) -> None:
+        with self._lock:
+            entries, self._entries = self._entries, {}
+        if not entries:
+            return
+        from src.utils import llm_helper
+
+        client = getattr(llm_helper.llm, "client", None)
+        for name, _ in entries.values():
+            try:
+                client.caches.delete(name=name)
+            except Exception:
+                pass
+
+
+class SimulatedPrefixCache(PrefixCache):
+    """
+    Offline stand-in with Gemini-like semantics.
+
+    The first call with a prefix is a cache write (full price); later calls
+    within the TTL report the prefix's tokens as cache reads. Models that
+    accept a `cached_tokens` keyword (StubChatModel) use it to shorten
+    their simulated latency.
+    """
+
+    name = "simulate"
+
+    def __init__(self, ttl_seconds: int = 3600, min_tokens: int = 0):
+        self.ttl_seconds = ttl_seconds
+        self.min_tokens = min_tokens
+        self._expires: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def prepare(self, llm, model_name, prefix):
+        tokens = estimate_tokens(prefix)
+        if tokens < self.min_tokens:
+            return llm, True, {}
+        digest = prefix_digest(model_name, prefix)
+        now = time.time()
+        with self._lock:
+            warm = self._expires.get(digest, 0) > now
+            self._expires[digest] = now + self.ttl_seconds
+        if not warm:
+            return llm, True, {"prefix_cache": "write"}
+        return llm.bind(cached_tokens=tokens), True, {"prefix_cache": "hit", "simulated_cached_tokens": tokens}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._expires.clear()
+
+
+def prefix_cache_from_env(provider: Optional[str] = None) -> PrefixCache:
+    """
+    Build the prefix cache selected by AUTODEV_PREFIX_CACHE.
+
+    Args:
+        provider: Active LLM provider, used by "auto" (default: AUTODEV_LLM_PROVIDER)
+    """
+    mode = os.getenv("AUTODEV_PREFIX_CACHE", "auto").strip().lower()
+    ttl = int(os.getenv("AUTODEV_PREFIX_CACHE_TTL", "3600"))
+    if mode == "auto":
+        provider = (provider or os.getenv("AUTODEV_LLM_PROVIDER", "gemini")).strip().lower()
+        mode = "simulate" if provider == "stub" else "gemini"
+    if mode == "gemini":
+        return GeminiPrefixCache(ttl_seconds=ttl)
+    if mode == "simulate":
+        return SimulatedPrefixCache(ttl_seconds=ttl)
+    return PrefixCache()
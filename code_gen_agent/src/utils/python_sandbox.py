@@ -3,6 +3,7 @@ Python-based sandbox for testing generated code.
 No Node.js dependencies required.
 """
 
+import hashlib
 import json
 import subprocess
 import os
@@ -10,54 +11,110 @@ import shutil
 from pathlib import Path
 from datetime import datetime
 
+from src.utils.validators import get_engine
+from src.utils.runtime_smoke import get_smoke_pool, smoke_cache_key, smoke_enabled
+
 
 class PythonSandbox:
     """Execute generated code in an isolated environment."""
 
+    # Sub-directories the sandbox owns, one per agent output
+    SECTIONS = ("frontend", "backend", "infra")
+
     def __init__(self, output_dir: str = "sandbox_env"):
         """Initialize sandbox directory."""
         self.output_dir = output_dir
         self.log_file = os.path.join(output_dir, "sandbox_logs.json")
+        self.manifest_file = os.path.join(output_dir, ".manifest.json")
+        self.changed_files = set()
+        self.removed_files = set()
         self._init_sandbox()
+        self.manifest = self._load_manifest()
 
     def _init_sandbox(self):
         """Create sandbox directories."""
         os.makedirs(self.output_dir, exist_ok=True)
 
+    def _load_manifest(self) -> dict:
+        """Load {relative_path: {"hash": ..., "checks": {...}}} from the last run."""
+        try:
+            with open(self.manifest_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _save_manifest(self):
+        tmp_path = self.manifest_file + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=1)
+        os.replace(tmp_path, self.manifest_file)
+
+    @staticmethod
+    def _hash(content: str) -> str:
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
     def save_generated_files(self, frontend_files: dict, backend_files: dict, infra_files: dict):
-        """Save generated code files to sandbox."""
-        # Frontend
-        fe_dir = os.path.join(self.output_dir, "frontend")
-        os.makedirs(fe_dir, exist_ok=True)
-        for filename, content in frontend_files.items():
-            filepath = os.path.join(fe_dir, filename)
-            os.makedirs(os.path.dirname(filepath), exist_ok=True)
-            with open(filepath, "w", encoding="utf-8") as f:
-                f.write(content)
+        """
+        Save generated code files to sandbox.
+
+        Only files whose content hash differs from the manifest are written.
+        Files that were written by a previous run but are no longer part of
+        the generated code are deleted.
+        """
+        wanted = {}
+        for section, files in (("frontend", frontend_files), ("backend", backend_files), ("infra", infra_files)):
+            for filename, content in (files or {}).items():
+                wanted[f"{section}/{filename}"] = content
+
+        if not self.manifest:
+            # First run with a manifest: drop whatever an older run left behind
+            for section in self.SECTIONS:
+                shutil.rmtree(os.path.join(self.output_dir, section), ignore_errors=True)
+
+        self.changed_files = set()
+        self.removed_files = set()
 
-        # Backend
-        be_dir = os.path.join(self.output_dir, "backend")
-        os.makedirs(be_dir, exist_ok=True)
-        for filename, content in backend_files.items():
-            filepath = os.path.join(be_dir, filename)
+        for rel_path, content in wanted.items():
+            digest = self._hash(content)
+            filepath = os.path.join(self.output_dir, rel_path)
+            entry = self.manifest.get(rel_path)
+            if entry and entry.get("hash") == digest and os.path.exists(filepath):
+                continue
             os.makedirs(os.path.dirname(filepath), exist_ok=True)
             with open(filepath, "w", encoding="utf-8") as f:
                 f.write(content)
+            self.manifest[rel_path] = {"hash": digest, "checks": {}}
+            self.changed_files.add(rel_path)
 
-        # Infrastructure
-        if infra_files:
-            infra_dir = os.path.join(self.output_dir, "infra")
-            os.makedirs(infra_dir, exist_ok=True)
-            for filename, content in infra_files.items():
-                filepath = os.path.join(infra_dir, filename)
-                os.makedirs(os.path.dirname(filepath), exist_ok=True)
-                with open(filepath, "w", encoding="utf-8") as f:
-                    f.write(content)
+        for rel_path in [p for p in self.manifest if p not in wanted]:
+            filepath = os.path.join(self.output_dir, rel_path)
+            if os.path.exists(filepath):
+                os.remove(filepath)
+                self._remove_empty_dirs(os.path.dirname(filepath))
+            del self.manifest[rel_path]
+            self.removed_files.add(rel_path)
+
+        self._save_manifest()
 
         print(f"[OK] Saved {len(frontend_files)} frontend files")
         print(f"[OK] Saved {len(backend_files)} backend files")
         if infra_files:
             print(f"[OK] Saved {len(infra_files)} infra files")
+        print(
+            f"[OK] {len(self.changed_files)} file(s) changed, {len(self.removed_files)} removed, "
+            f"{len(wanted) - len(self.changed_files)} unchanged"
+        )
+
+    def _remove_empty_dirs(self, path: str):
+        """Remove empty parent directories up to the sandbox root."""
+        root = os.path.abspath(self.output_dir)
+        path = os.path.abspath(path)
+        while path.startswith(root) and path != root:
+            try:
+                os.rmdir(path)
+            except OSError:
+                break
+            path = os.path.dirname(path)
 
     def validate_python_syntax(self, python_files: dict) -> dict:
         """Validate Python file syntax."""
@@ -79,33 +136,52 @@ class PythonSandbox:
                 errors[filename] = f"JSONDecodeError: {str(e)}"
         return errors
 
-    def run_tests(self) -> dict:
-        """Run basic validation tests on generated code."""
+    def run_tests(self, api_spec=None) -> dict:
+        """
+        Run basic validation tests on generated code.
+
+        Args:
+            api_spec: OpenAPI spec of the project; when given and the backend
+                compiles, every route is smoke-tested at runtime (see
+                runtime_smoke.py) and reported under "runtime"
+        """
         results = {
             "timestamp": datetime.now().isoformat(),
             "backend_syntax_errors": {},
             "frontend_structure_check": {},
             "docker_compose_valid": False,
+            "file_checks": {},
+            "incremental": {"revalidated": 0, "cached": 0},
         }
+        self._stats = results["incremental"]
 
-        # Check backend Python files
-        be_dir = os.path.join(self.output_dir, "backend")
-        if os.path.exists(be_dir):
-            python_files = {}
-            for root, dirs, files in os.walk(be_dir):
-                for file in files:
-                    if file.endswith(".py"):
-                        filepath = os.path.join(root, file)
-                        with open(filepath, "r", encoding="utf-8") as f:
-                            python_files[file] = f.read()
-
-            if python_files:
-                syntax_errors = self.validate_python_syntax(python_files)
-                results["backend_syntax_errors"] = syntax_errors
-                if not syntax_errors:
-                    print("[OK] All Python files have valid syntax")
-                else:
-                    print(f"[WARN] Found {len(syntax_errors)} syntax error(s)")
+        # Run the per-file checkers (Python, JSON, YAML, JS/TS, Dockerfile) in parallel
+        managed = [
+            rel_path
+            for section in self.SECTIONS
+            for rel_path in self._section_files(section, os.path.join(self.output_dir, section), "")
+        ]
+        file_checks = self._validate_incrementally(managed, "engine", self._run_engine, strip_section=False)
+        results["file_checks"] = file_checks
+        issue_count = sum(len(issues) for issues in file_checks.values())
+        if issue_count:
+            print(f"[WARN] Checkers reported {issue_count} issue(s) in {len(file_checks)} file(s)")
+        else:
+            print(f"[OK] {len(managed)} file(s) passed the static checkers")
+
+        # Backend Python syntax errors, keyed by path inside backend/
+        syntax_errors = {}
+        for rel_path, issues in file_checks.items():
+            section, _, path = rel_path.partition("/")
+            for issue in issues:
+                if section == "backend" and issue["checker"] == "python":
+                    syntax_errors[path] = f"{issue['message']} (line {issue['line']})"
+        results["backend_syntax_errors"] = syntax_errors
+        if any(p.endswith(".py") for p in managed if p.startswith("backend/")):
+            if not syntax_errors:
+                print("[OK] All Python files have valid syntax")
+            else:
+                print(f"[WARN] Found {len(syntax_errors)} syntax error(s)")
 
         # Check frontend structure
         fe_dir = os.path.join(self.output_dir, "frontend")
@@ -139,8 +215,86 @@ class PythonSandbox:
                 except Exception as e:
                     print(f"[WARN] docker-compose.yml validation failed: {e}")
 
+        # Import the backend and call its routes (only worth it once it compiles)
+        backend_dir = os.path.join(self.output_dir, "backend")
+        if api_spec is not None and smoke_enabled() and os.path.isdir(backend_dir) and not syntax_errors:
+            # Unchanged backend files and spec: reuse the previous iteration's result
+            cache_key = None
+            if self.manifest:
+                hashes = {p: e.get("hash") for p, e in self.manifest.items() if p.startswith("backend/")}
+                cache_key = smoke_cache_key(hashes, api_spec)
+            runtime = get_smoke_pool().run(backend_dir, api_spec, cache_key=cache_key)
+            results["runtime"] = runtime
+            endpoints = runtime.get("endpoints", [])
+            if runtime["status"] == "skipped":
+                print(f"[INFO] Runtime smoke test skipped: {runtime.get('reason')}")
+            elif not runtime.get("import_ok"):
+                print(f"[WARN] Backend failed to import: {runtime.get('import_error')}")
+            else:
+                passed = sum(1 for e in endpoints if e.get("ok"))
+                print(f"[{'OK' if passed == len(endpoints) else 'WARN'}] Runtime smoke test: "
+                      f"{passed}/{len(endpoints)} endpoint(s) passed ({runtime['seconds']:.1f}s)")
+
+        if self.manifest:
+            self._save_manifest()
         return results
 
+    def _section_files(self, section: str, section_dir: str, suffix: str) -> list:
+        """
+        Return the sandbox-relative paths of a section's files to validate.
+
+        Uses the manifest when there is one, so only files this sandbox wrote
+        are checked; otherwise walks the directory like older versions did.
+        """
+        prefix = section + "/"
+        if self.manifest:
+            return [p for p in self.manifest if p.startswith(prefix) and p.endswith(suffix)]
+
+        found = []
+        for root, dirs, files in os.walk(section_dir):
+            for file in files:
+                if file.endswith(suffix):
+                    rel_path = os.path.relpath(os.path.join(root, file), self.output_dir)
+                    found.append(rel_path.replace(os.sep, "/"))
+        return found
+
+    def _validate_incrementally(self, paths: list, check: str, validator, strip_section: bool = True) -> dict:
+        """
+        Run `validator` only on files whose content changed since the last run.
+
+        Results for unchanged files are taken from the manifest. Returned
+        error keys are paths relative to the section directory, or to the
+        sandbox root when strip_section is False.
+        """
+        key = (lambda rel_path: rel_path.split("/", 1)[1]) if strip_section else (lambda rel_path: rel_path)
+        errors = {}
+        to_check = {}
+        for rel_path in paths:
+            entry = self.manifest.get(rel_path)
+            if entry is not None and check in entry.get("checks", {}):
+                self._stats["cached"] += 1
+                if entry["checks"][check]:
+                    errors[key(rel_path)] = entry["checks"][check]
+                continue
+            with open(os.path.join(self.output_dir, rel_path), "r", encoding="utf-8") as f:
+                to_check[rel_path] = f.read()
+
+        if to_check:
+            self._stats["revalidated"] += len(to_check)
+            new_errors = validator(to_check)
+            for rel_path in to_check:
+                message = new_errors.get(rel_path)
+                if rel_path in self.manifest:
+                    self.manifest[rel_path].setdefault("checks", {})[check] = message
+                if message:
+                    errors[key(rel_path)] = message
+
+        return errors
+
+    def _run_engine(self, files: dict) -> dict:
+        """Validator adapter: {rel_path: content} -> {rel_path: [issues]}."""
+        return get_engine().validate(files)
+
     def save_logs(self, logs: dict):
         """Save test results to JSON."""
         with open(self.log_file, "w", encoding="utf-8") as f:
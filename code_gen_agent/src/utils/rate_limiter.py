@@ -0,0 +1,278 @@
+"""
+Client-side rate limiting and retries for LLM calls.
+
+A RateLimiter holds two token buckets, requests/min and tokens/min, shared
+by every thread and event loop in the process. A call reserves one request
+and its estimated prompt tokens before it is sent; output tokens are charged
+once the response arrives. Reservations may drive a bucket negative, in
+which case later callers wait until it refills, so bursts from the parallel
+fan-out or a batch run are smoothed to the quota instead of tripping it.
+
+Transient failures (429, 5xx, timeouts) are retried with jittered
+exponential backoff, waiting at least as long as the server's retry-after.
+
+Configure with AUTODEV_LLM_RPM / AUTODEV_LLM_TPM (0 disables a bucket) and
+AUTODEV_LLM_MAX_RETRIES.
+"""
+
+import asyncio
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from src.utils.telemetry import increment
+from src.utils.usage import record_wait
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+RETRYABLE_NAMES = (
+    "ResourceExhausted", "TooManyRequests", "RateLimit", "ServiceUnavailable",
+    "DeadlineExceeded", "InternalServerError", "Timeout", "ConnectionError",
+)
+_RETRY_DELAY = re.compile(r"retry(?:[_ ]?delay|[_ -]after| in)['\"]?\s*[:=]?\s*['\"]?(\d+(?:\.\d+)?)\s*s", re.IGNORECASE)
+
+
+class TokenBucket:
+    """Continuously refilling bucket; balance may go negative to queue callers."""
+
+    def __init__(self, rate_per_min: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate_per_min: Units added per minute
+            capacity: Maximum balance, i.e. the allowed burst (default: one minute's worth)
+        """
+        self.rate = rate_per_min / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_min
+        self.balance = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.balance = min(self.capacity, self.balance + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Take `amount` and return how many seconds the caller must wait first."""
+        self._refill(now)
+        # Never ask for more than a full bucket, or one huge prompt could never run
+        amount = min(amount, self.capacity)
+        self.balance -= amount
+        return 0.0 if self.balance >= 0 else -self.balance / self.rate
+
+    def charge(self, amount: float, now: float) -> None:
+        """Deduct usage discovered after the fact (e.g. output tokens)."""
+        self._refill(now)
+        self.balance -= amount
+
+
+class RateLimiter:
+    """Requests/min and tokens/min limits shared by every LLM call."""
+
+    def __init__(self, requests_per_min: float = 0, tokens_per_min: float = 0, history: int = 1000):
+        """
+        Args:
+            requests_per_min: Request quota (0 = unlimited)
+            tokens_per_min: Token quota (0 = unlimited)
+            history: Number of recent queue waits kept for percentiles
+        """
+        self.requests = TokenBucket(requests_per_min) if requests_per_min > 0 else None
+        self.tokens = TokenBucket(tokens_per_min) if tokens_per_min > 0 else None
+        self._lock = threading.Lock()
+        self._waits: deque = deque(maxlen=history)
+        self.acquired = 0
+        self.total_wait = 0.0
+
+    def _reserve(self, tokens: int) -> float:
+        with self._lock:
+            now = time.monotonic()
+            wait = 0.0
+            if self.requests is not None:
+                wait = max(wait, self.requests.reserve(1, now))
+            if self.tokens is not None:
+                wait = max(wait, self.tokens.reserve(tokens, now))
+            self.acquired += 1
+            self.total_wait += wait
+            self._waits.append(wait)
+        record_wait(wait)
+        if wait:
+            increment("queue_wait_ms", round(wait * 1000, 1))
+        return wait
+
+    def acquire(self, tokens: int = 0) -> float:
+        """
+        Block until a request with `tokens` prompt tokens may be sent.
+
+        Returns:
+            Seconds spent waiting in the queue
+        """
+        wait = self._reserve(tokens)
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    async def aacquire(self, tokens: int = 0) -> float:
+        """Async variant of acquire; waits without blocking the event loop."""
+        wait = self._reserve(tokens)
+        if wait:
+            await asyncio.sleep(wait)
+        return wait
+
+    def charge(self, tokens: int) -> None:
+        """Charge tokens that were only known after the response (output tokens)."""
+        if self.tokens is not None and tokens > 0:
+            with self._lock:
+                self.tokens.charge(tokens, time.monotonic())
+
+    def stats(self) -> Dict[str, float]:
+        """Queue-wait metrics: count, total, mean, p95 and max seconds."""
+        with self._lock:
+            waits = sorted(self._waits)
+            acquired, total = self.acquired, self.total_wait
+        p95 = waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0
+        return {
+            "acquired": acquired,
+            "wait_total_s": round(total, 3),
+            "wait_mean_s": round(total / acquired, 3) if acquired else 0.0,
+            "wait_p95_s": round(p95, 3),
+            "wait_max_s": round(waits[-1], 3) if waits else 0.0,
+        }
+
+
+class RetryPolicy:
+    """Jittered exponential backoff for transient LLM errors."""
+
+    def __init__(self, max_retries: int = 5, base_delay: float = 1.0, max_delay: float = 60.0, seed: Optional[int] = None):
+        """
+        Args:
+            max_retries: Retries after the first attempt (0 disables retrying)
+            base_delay: Backoff ceiling for the first retry, doubled each time
+            max_delay: Upper bound of the backoff ceiling
+            seed: Seed for the jitter RNG (tests)
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._rng = random.Random(seed)
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to wait before retry number `attempt` (0-based), "full jitter" style."""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        delay = self._rng.uniform(0, ceiling)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    for candidate in (exc, getattr(exc, "response", None)):
+        for attr in ("status_code", "code", "status"):
+            value = getattr(candidate, attr, None)
+            if callable(value):
+                # grpc errors expose code() instead of an attribute
+                try:
+                    value = value()
+                except TypeError:
+                    continue
+            if isinstance(value, int):
+                return value
+            if hasattr(value, "value") and isinstance(value.value, int):
+                return value.value
+    return None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """True for rate-limit, server-side and network errors."""
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    if _status_code(exc) in RETRYABLE_STATUS:
+        return True
+    names = " ".join(cls.__name__ for cls in type(exc).__mro__)
+    if any(name in names for name in RETRYABLE_NAMES):
+        return True
+    message = str(exc)
+    return "429" in message or "RESOURCE_EXHAUSTED" in message or "UNAVAILABLE" in message
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """Server-requested delay in seconds, from a Retry-After header or a retryDelay in the message."""
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        value = headers.get("retry-after") or headers.get("Retry-After")
+        if value is not None:
+            return float(value)
+    except (TypeError, ValueError, AttributeError):
+        pass
+    match = _RETRY_DELAY.search(str(exc))
+    return float(match.group(1)) if match else None
+
+
+def call_with_retry(fn: Callable[[], Any], limiter: Optional[RateLimiter], policy: RetryPolicy,
+                    tokens: int = 0, on_retry: Optional[Callable[[int, BaseException, float], None]] = None) -> Any:
+    """
+    Call fn() under the limiter, retrying transient errors.
+
+    Args:
+        fn: Zero-argument callable making one LLM request
+        limiter: Shared limiter, or None for no client-side limiting
+        policy: Backoff settings
+        tokens: Estimated prompt tokens, reserved before every attempt
+        on_retry: Called as on_retry(attempt, exc, delay) before sleeping
+
+    Raises:
+        The last exception once retries are exhausted or it is not retryable
+    """
+    attempt = 0
+    while True:
+        if limiter is not None:
+            limiter.acquire(tokens)
+        try:
+            return fn()
+        except Exception as e:
+            if attempt >= policy.max_retries or not is_retryable(e):
+                raise
+            delay = policy.delay(attempt, retry_after(e))
+            if on_retry is not None:
+                on_retry(attempt, e, delay)
+            time.sleep(delay)
+            attempt += 1
+
+
+async def acall_with_retry(fn: Callable[[], Awaitable[Any]], limiter: Optional[RateLimiter], policy: RetryPolicy,
+                           tokens: int = 0, on_retry: Optional[Callable[[int, BaseException, float], None]] = None) -> Any:
+    """Async variant of call_with_retry; fn returns an awaitable."""
+    attempt = 0
+    while True:
+        if limiter is not None:
+            await limiter.aacquire(tokens)
+        try:
+            return await fn()
+        except Exception as e:
+            if attempt >= policy.max_retries or not is_retryable(e):
+                raise
+            delay = policy.delay(attempt, retry_after(e))
+            if on_retry is not None:
+                on_retry(attempt, e, delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+def limiter_from_env() -> Optional[RateLimiter]:
+    """
+    Build the shared limiter from AUTODEV_LLM_RPM and AUTODEV_LLM_TPM.
+
+    Returns:
+        None when both are 0 (no client-side limiting)
+    """
+    rpm = float(os.getenv("AUTODEV_LLM_RPM", "1000"))
+    tpm = float(os.getenv("AUTODEV_LLM_TPM", "1000000"))
+    if rpm <= 0 and tpm <= 0:
+        return None
+    return RateLimiter(rpm, tpm)
+
+
+def retry_policy_from_env() -> RetryPolicy:
+    """Retry settings from AUTODEV_LLM_MAX_RETRIES (default 5)."""
+    return RetryPolicy(max_retries=int(os.getenv("AUTODEV_LLM_MAX_RETRIES", "5")))
@@ -0,0 +1,315 @@
+"""
+Runtime smoke test for generated backends.
+
+Compiling the backend catches syntax errors only. Import errors, broken
+models and handlers that crash surface much later and cost more repair
+iterations. This stage copies the backend to a temporary directory, imports
+its ASGI `app` in a child process (smoke_runner.py) under rlimits and a
+timeout, and sends one request per route of the API spec through an
+in-process ASGI client. Each endpoint gets pass/fail (a response below 500)
+and its latency. A third-party package missing where the sandbox runs skips
+the stage instead of failing it.
+
+Runs are spread over a shared worker pool, so concurrent sandboxes (batch
+mode, the job service) use the available cores without oversubscribing.
+Results are cached by a digest of the backend's files and the spec
+(smoke_cache_key), so an iteration that did not touch the backend reuses the
+previous result. Timeouts are not cached.
+
+Configuration:
+    AUTODEV_RUNTIME_SMOKE        on (default) / off
+    AUTODEV_SMOKE_TIMEOUT        seconds per project (default: 30)
+    AUTODEV_SMOKE_MEMORY_MB      address-space limit of the child (default: 2048)
+    AUTODEV_SMOKE_WORKERS        projects tested at once (default: CPU count)
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+RUNNER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "smoke_runner.py")
+METHOD_ORDER = ("post", "get", "put", "patch", "delete")
+REQUEST_TIMEOUT = 5.0
+# Modules usually holding the app, tried before the other files
+APP_MODULES = ("main.py", "app.py", "server.py", "app/main.py", "src/main.py")
+# A module-level "app = ..." (FastAPI(), Starlette()) or "async def app(...)"
+_APP_PATTERN = re.compile(r"^(?:app\s*(?::[^=\n]+)?=(?!=)|(?:async\s+)?def\s+app\s*\()", re.MULTILINE)
+# Variables the child must not see
+_SECRET_ENV = re.compile(r"(API_KEY|SECRET|TOKEN|PASSWORD)", re.IGNORECASE)
+
+# Recent results by smoke_cache_key, least recently used first
+MAX_CACHED_RESULTS = 256
+_results: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_results_lock = threading.Lock()
+
+
+def smoke_enabled() -> bool:
+    return os.getenv("AUTODEV_RUNTIME_SMOKE", "on").strip().lower() not in ("0", "off", "false", "no")
+
+
+def _sample(schema: Any, spec: Dict, depth: int = 0) -> Any:
+    """A value that satisfies a JSON schema well enough for a smoke request."""
+    if not isinstance(schema, dict) or depth > 6:
+        return None
+    if "$ref" in schema:
+        target: Any = spec
+        for part in schema["$ref"].lstrip("#/").split("/"):
+            target = target.get(part, {}) if isinstance(target, dict) else {}
+        return _sample(target, spec, depth + 1)
+    for key in ("example", "default"):
+        if key in schema:
+            return schema[key]
+    if schema.get("enum"):
+        return schema["enum"][0]
+    for key in ("allOf", "anyOf", "oneOf"):
+        if schema.get(key):
+            if key != "allOf":
+                return _sample(schema[key][0], spec, depth + 1)
+            merged: Dict[str, Any] = {}
+            for part in schema[key]:
+                value = _sample(part, spec, depth + 1)
+                if isinstance(value, dict):
+                    merged.update(value)
+            return merged
+    kind = schema.get("type")
+    if kind == "object" or "properties" in schema:
+        return {name: _sample(prop, spec, depth + 1) for name, prop in (schema.get("properties") or {}).items()}
+    if kind == "array":
+        return [_sample(schema.get("items", {}), spec, depth + 1)]
+    if kind == "integer":
+        return 1
+    if kind == "number":
+        return 1.0
+    if kind == "boolean":
+        return True
+    formats = {"date-time": "2024-01-01T00:00:00", "date": "2024-01-01", "email": "user@example.com", "uuid": "00000000-0000-0000-0000-000000000001"}
+    return formats.get(schema.get("format"), "string")
+
+
+def routes_from_spec(api_spec: Any) -> List[Dict[str, Any]]:
+    """
+    One smoke request per operation of an OpenAPI spec.
+
+    Path parameters and required query parameters get sample values, request
+    bodies a sample of their schema. Creating requests go first and routes
+    with path parameters last, so a GET /items/1 can find what POST /items
+    made.
+
+    Returns:
+        [{"method", "template", "path", "query", "body"}]
+    """
+    if isinstance(api_spec, str):
+        try:
+            api_spec = json.loads(api_spec) if api_spec.strip() else {}
+        except ValueError:
+            return []
+    if not isinstance(api_spec, dict):
+        return []
+    routes = []
+    for template, operations in (api_spec.get("paths") or {}).items():
+        if not isinstance(operations, dict):
+            continue
+        shared = operations.get("parameters") or []
+        for method, operation in operations.items():
+            if method.lower() not in METHOD_ORDER:
+                continue
+            operation = operation if isinstance(operation, dict) else {}
+            values = {"path": {}, "query": {}}
+            for param in shared + (operation.get("parameters") or []):
+                if not isinstance(param, dict):
+                    continue
+                where = param.get("in")
+                if where == "path" or (where == "query" and param.get("required")):
+                    value = _sample(param.get("schema") or {"type": param.get("type", "integer")}, api_spec)
+                    values[where][param.get("name", "")] = 1 if value in (None, "string") and where == "path" else value
+            path = re.sub(r"\{(\w+)\}", lambda m: str(values["path"].get(m.group(1), 1)), template)
+            body = None
+            content = ((operation.get("requestBody") or {}).get("content") or {})
+            schema = (content.get("application/json") or next(iter(content.values()), {})).get("schema") if content else None
+            if schema is None:
+                # Swagger 2.0 body parameter
+                schema = next((p.get("schema") for p in operation.get("parameters") or [] if isinstance(p, dict) and p.get("in") == "body"), None)
+            if schema is not None:
+                body = _sample(schema, api_spec)
+            query = "&".join(f"{k}={v}" for k, v in values["query"].items())
+            routes.append({"method": method.upper(), "template": template, "path": path, "query": query, "body": body})
+    routes.sort(key=lambda r: ("{" in r["template"], METHOD_ORDER.index(r["method"].lower())))
+    return routes
+
+
+def find_app_module(backend_dir: str) -> Optional[str]:
+    """Dotted module (relative to backend_dir) that defines the ASGI app."""
+    sources = {}
+    for root, dirs, files in os.walk(backend_dir):
+        dirs[:] = [d for d in dirs if not d.startswith(".") and d not in ("__pycache__", "node_modules", "venv", ".venv")]
+        for name in files:
+            if name.endswith(".py"):
+                rel_path = os.path.relpath(os.path.join(root, name), backend_dir).replace(os.sep, "/")
+                sources[rel_path] = os.path.join(root, name)
+
+    def defines_app(rel_path: str) -> bool:
+        with open(sources[rel_path], "r", encoding="utf-8", errors="replace") as f:
+            return bool(_APP_PATTERN.search(f.read()))
+
+    candidates = [p for p in sources if any(p == c or p.endswith("/" + c) for c in APP_MODULES)]
+    candidates.sort(key=lambda p: (p.count("/"), APP_MODULES.index(next(c for c in APP_MODULES if p == c or p.endswith("/" + c)))))
+    for rel_path in candidates + sorted(p for p in sources if p not in candidates):
+        if defines_app(rel_path):
+            return rel_path[:-3].replace("/", ".")
+    return None
+
+
+def smoke_cache_key(file_hashes: Dict[str, str], api_spec: Any = None) -> str:
+    """
+    Digest of what a smoke test depends on.
+
+    Args:
+        file_hashes: {path: content hash} of every backend file
+        api_spec: OpenAPI spec (dict or JSON string)
+    """
+    spec = api_spec if isinstance(api_spec, str) else json.dumps(api_spec, sort_keys=True, default=str)
+    payload = json.dumps([sorted(file_hashes.items()), spec])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def run_smoke_test(backend_dir: str, api_spec: Any = None, timeout: Optional[float] = None,
+                   memory_mb: Optional[int] = None, cache_key: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Import a backend's app in a limited child process and call every route.
+
+    Args:
+        backend_dir: Directory of the generated backend (copied, not modified)
+        api_spec: OpenAPI spec (dict or JSON string) listing the routes
+        timeout: Seconds for the whole run (default: AUTODEV_SMOKE_TIMEOUT or 30)
+        memory_mb: Address-space limit (default: AUTODEV_SMOKE_MEMORY_MB or 2048)
+        cache_key: smoke_cache_key() of the backend; a cached result for it
+            is returned (with "cached": True) instead of running again
+
+    Returns:
+        {"status": "passed" | "failed" | "skipped", "module", "import_ok",
+        "import_error", "traceback", "endpoints": [{"method", "path", "ok",
+        "status", "ms", "error"}], "seconds", "reason"}
+    """
+    timeout = timeout or float(os.getenv("AUTODEV_SMOKE_TIMEOUT", "30"))
+    memory_mb = memory_mb or int(os.getenv("AUTODEV_SMOKE_MEMORY_MB", "2048"))
+    if cache_key is not None:
+        cache_key = f"{cache_key}:{timeout}:{memory_mb}"
+        with _results_lock:
+            if cache_key in _results:
+                _results.move_to_end(cache_key)
+                return {**json.loads(json.dumps(_results[cache_key])), "cached": True}
+    result = _run(backend_dir, api_spec, timeout, memory_mb)
+    if cache_key is not None and not result.get("timed_out"):
+        with _results_lock:
+            _results[cache_key] = result
+            while len(_results) > MAX_CACHED_RESULTS:
+                _results.popitem(last=False)
+    return result
+
+
+def _run(backend_dir: str, api_spec: Any, timeout: float, memory_mb: int) -> Dict[str, Any]:
+    started = time.perf_counter()
+    module = find_app_module(backend_dir) if os.path.isdir(backend_dir) else None
+    if module is None:
+        return {"status": "skipped", "reason": "no module defines an ASGI app", "endpoints": [], "seconds": 0.0}
+
+    workdir = tempfile.mkdtemp(prefix="autodev_smoke_")
+    root = os.path.join(workdir, "backend")
+    try:
+        shutil.copytree(backend_dir, root, ignore=shutil.ignore_patterns("__pycache__", "*.db", "node_modules"))
+        request = {
+            "root": root,
+            "module": module,
+            "routes": routes_from_spec(api_spec),
+            "request_timeout": min(REQUEST_TIMEOUT, timeout),
+            # Applied by the child itself (preexec_fn is unsafe in a threaded parent)
+            "limits": {"memory_mb": memory_mb, "cpu_seconds": int(timeout) + 1},
+        }
+        env = {k: v for k, v in os.environ.items() if not _SECRET_ENV.search(k)}
+        # Generated backends usually read DATABASE_URL; keep their data inside the copy
+        env.update(DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'smoke.db')}", PYTHONDONTWRITEBYTECODE="1")
+        proc = subprocess.Popen(
+            [sys.executable, RUNNER], stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            text=True, cwd=root, env=env, start_new_session=True,
+        )
+        try:
+            stdout, stderr = proc.communicate(json.dumps(request), timeout=timeout)
+        except subprocess.TimeoutExpired:
+            # The child leads its own session; kill it with anything it spawned
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except (AttributeError, OSError):
+                proc.kill()
+            proc.communicate()
+            return {"status": "failed", "module": module, "import_ok": False, "endpoints": [], "timed_out": True,
+                    "import_error": f"TimeoutError: the backend did not finish within {timeout:.0f}s",
+                    "seconds": round(time.perf_counter() - started, 3)}
+        try:
+            result = json.loads(stdout)
+        except ValueError:
+            # Killed (rlimit) or crashed before reporting
+            tail = (stderr or "").strip().splitlines()[-20:]
+            result = {"import_ok": False, "endpoints": [],
+                      "import_error": f"the smoke test process exited with code {proc.returncode}",
+                      "traceback": "\n".join(tail)}
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    result["module"] = module
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    if result.get("missing_dependency"):
+        result["status"] = "skipped"
+        result["reason"] = f"package '{result['missing_dependency']}' is not installed where the sandbox runs"
+    elif not result.get("import_ok") or not all(e.get("ok") for e in result.get("endpoints", [])):
+        result["status"] = "failed"
+    else:
+        result["status"] = "passed"
+    return result
+
+
+class SmokeTestPool:
+    """Bounded pool running smoke tests of many projects at once."""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        Args:
+            max_workers: Concurrent child processes (default: AUTODEV_SMOKE_WORKERS or CPU count)
+        """
+        env_workers = os.getenv("AUTODEV_SMOKE_WORKERS")
+        self.max_workers = max_workers or (int(env_workers) if env_workers else os.cpu_count() or 1)
+        # Each task only waits on its child process, so threads are enough
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="smoke")
+
+    def submit(self, backend_dir: str, api_spec: Any = None, **kwargs: Any):
+        return self._executor.submit(run_smoke_test, backend_dir, api_spec, **kwargs)
+
+    def run(self, backend_dir: str, api_spec: Any = None, **kwargs: Any) -> Dict[str, Any]:
+        """Run one smoke test on the pool and wait for it."""
+        return self.submit(backend_dir, api_spec, **kwargs).result()
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+_pool: Optional[SmokeTestPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_smoke_pool() -> SmokeTestPool:
+    """Process-wide pool shared by every sandbox."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SmokeTestPool()
+        return _pool
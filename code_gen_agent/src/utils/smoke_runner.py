@@ -0,0 +1,248 @@
+"""
+Child process of the runtime smoke test (see runtime_smoke.py).
+
+    python smoke_runner.py < request.json
+
+Imports the generated backend's ASGI `app` and sends one request per route
+through a minimal in-process ASGI client (no server, no network). Uses only
+the standard library, so it runs wherever the generated code's own
+dependencies are installed. The request on stdin is
+{"root", "module", "routes": [{"method", "path", "query", "body"}],
+"request_timeout", "limits": {"memory_mb", "cpu_seconds"}};
+one JSON result is written to stdout. Anything the generated code prints
+goes to stderr.
+"""
+
+import asyncio
+import importlib
+import json
+import os
+import sys
+import time
+import traceback
+
+
+def _relative_traceback(root: str) -> str:
+    """Current exception's traceback with the project root stripped from paths."""
+    return traceback.format_exc().replace(root.rstrip(os.sep) + os.sep, "")
+
+
+def apply_limits(memory_mb: int, cpu_seconds: int) -> None:
+    """Cap memory, CPU time, written file size and open files (POSIX only)."""
+    try:
+        import resource
+    except ImportError:
+        return
+    limits = (
+        (resource.RLIMIT_AS, memory_mb * 1024 * 1024),
+        (resource.RLIMIT_CPU, cpu_seconds),
+        (resource.RLIMIT_FSIZE, 64 * 1024 * 1024),
+        (resource.RLIMIT_NOFILE, 256),
+    )
+    for kind, value in limits:
+        try:
+            soft, hard = resource.getrlimit(kind)
+            resource.setrlimit(kind, (value if hard == resource.RLIM_INFINITY else min(value, hard), hard))
+        except (ValueError, OSError):
+            pass
+
+
+def _is_local(root: str, module_name: str) -> bool:
+    top = module_name.split(".")[0]
+    for dirpath, dirnames, filenames in os.walk(root):
+        if top in dirnames or f"{top}.py" in filenames:
+            return True
+    return False
+
+
+def load_app(root: str, module: str):
+    """Import `module` with every directory between it and `root` importable."""
+    directory = os.path.dirname(os.path.join(root, module.replace(".", os.sep)))
+    paths = []
+    while True:
+        paths.append(directory)
+        if os.path.abspath(directory) == os.path.abspath(root):
+            break
+        directory = os.path.dirname(directory)
+    sys.path[:0] = paths
+    os.chdir(root)
+    imported = importlib.import_module(module)
+    app = getattr(imported, "app", None)
+    if app is None or not callable(app):
+        raise AttributeError(f"{module} defines no ASGI 'app'")
+    return app
+
+
+class ASGIClient:
+    """Just enough of an ASGI server to drive one app in-process."""
+
+    def __init__(self, app, timeout: float = 5.0):
+        self.app = app
+        self.timeout = timeout
+        self.state = {}
+        self._lifespan = None
+
+    async def startup(self) -> None:
+        """Run the lifespan startup, if the app supports it."""
+        inbox, outbox = asyncio.Queue(), asyncio.Queue()
+        scope = {"type": "lifespan", "asgi": {"version": "3.0", "spec_version": "2.0"}, "state": self.state}
+
+        async def run():
+            try:
+                await self.app(scope, inbox.get, outbox.put)
+            finally:
+                await outbox.put({"type": "lifespan.ended"})
+
+        task = asyncio.ensure_future(run())
+        await inbox.put({"type": "lifespan.startup"})
+        message = await asyncio.wait_for(outbox.get(), self.timeout)
+        if message["type"] == "lifespan.startup.failed":
+            raise RuntimeError(f"lifespan startup failed: {message.get('message', '')}")
+        if message["type"] == "lifespan.ended":
+            # Lifespan not supported: the app raised or returned at once
+            if task.done() and not task.cancelled():
+                task.exception()  # retrieved so asyncio does not log it
+            return
+        self._lifespan = (task, inbox, outbox)
+
+    async def shutdown(self) -> None:
+        if self._lifespan is None:
+            return
+        task, inbox, outbox = self._lifespan
+        await inbox.put({"type": "lifespan.shutdown"})
+        try:
+            await asyncio.wait_for(outbox.get(), self.timeout)
+        except asyncio.TimeoutError:
+            task.cancel()
+
+    async def request(self, method: str, path: str, query: str = "", body=None):
+        """Returns (status, response body bytes); raises what the app raised."""
+        payload = b"" if body is None else json.dumps(body).encode("utf-8")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode("utf-8"),
+            "query_string": query.encode("utf-8"),
+            "root_path": "",
+            "headers": [
+                (b"host", b"testserver"),
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(payload)).encode("ascii")),
+            ],
+            "client": ("127.0.0.1", 50000),
+            "server": ("testserver", 80),
+            "state": dict(self.state),
+        }
+        pending = [{"type": "http.request", "body": payload, "more_body": False}]
+        done = asyncio.Event()
+        response = {"status": None, "body": b""}
+
+        async def receive():
+            if pending:
+                return pending.pop(0)
+            await done.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["body"] += message.get("body", b"")
+                if not message.get("more_body"):
+                    done.set()
+
+        try:
+            await asyncio.wait_for(self.app(scope, receive, send), self.timeout)
+        finally:
+            done.set()
+        return response["status"], response["body"]
+
+
+def route_exists(app, method: str, path: str):
+    """True/False for Starlette-style apps (FastAPI), None when unknown."""
+    routes = getattr(app, "routes", None)
+    if routes is None:
+        return None
+    scope = {"type": "http", "method": method, "path": path, "root_path": ""}
+    for route in routes:
+        matches = getattr(route, "matches", None)
+        if matches is None:
+            continue
+        try:
+            match, _ = matches(scope)
+        except Exception:
+            continue
+        if getattr(match, "value", 0):
+            return True
+    return False
+
+
+async def exercise(app, root: str, routes, timeout: float):
+    client = ASGIClient(app, timeout)
+    results = []
+    try:
+        await client.startup()
+    except Exception as e:
+        return [{"method": "LIFESPAN", "path": "startup", "ok": False, "status": None, "ms": 0.0,
+                 "error": f"{type(e).__name__}: {e}", "traceback": _relative_traceback(root)}]
+    for route in routes:
+        method, path = route["method"].upper(), route["path"]
+        entry = {"method": method, "path": route.get("template", path), "ok": False, "status": None}
+        if route_exists(app, method, path) is False:
+            entry.update(ms=0.0, error="route not implemented (no handler matches this path)")
+            results.append(entry)
+            continue
+        started = time.perf_counter()
+        try:
+            status, body = await client.request(method, path, route.get("query", ""), route.get("body"))
+            entry["status"] = status
+            entry["ok"] = status is not None and status < 500
+            if not entry["ok"]:
+                entry["error"] = body.decode("utf-8", "replace")[:500] or f"HTTP {status}"
+        except asyncio.TimeoutError:
+            entry["error"] = f"no response within {timeout:.0f}s"
+        except Exception as e:
+            entry["error"] = f"{type(e).__name__}: {e}"
+            entry["traceback"] = _relative_traceback(root)
+        entry["ms"] = round((time.perf_counter() - started) * 1000, 2)
+        results.append(entry)
+    try:
+        await client.shutdown()
+    except Exception:
+        pass
+    return results
+
+
+def main() -> int:
+    request = json.load(sys.stdin)
+    root, module = request["root"], request["module"]
+    limits = request.get("limits") or {}
+    apply_limits(limits.get("memory_mb", 2048), limits.get("cpu_seconds", 60))
+    real_stdout, sys.stdout = sys.stdout, sys.stderr
+    result = {"import_ok": False, "endpoints": []}
+    started = time.perf_counter()
+    try:
+        app = load_app(root, module)
+        result["import_ok"] = True
+    except ModuleNotFoundError as e:
+        result["import_error"] = f"ModuleNotFoundError: {e}"
+        result["traceback"] = _relative_traceback(root)
+        result["missing_dependency"] = None if _is_local(root, e.name or "") else e.name
+    except BaseException as e:
+        result["import_error"] = f"{type(e).__name__}: {e}"
+        result["traceback"] = _relative_traceback(root)
+    result["import_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+    if result["import_ok"]:
+        result["endpoints"] = asyncio.run(exercise(app, root, request.get("routes", []), request.get("request_timeout", 5.0)))
+    real_stdout.write(json.dumps(result, default=str))
+    real_stdout.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,352 @@
+"""
+Structured tracing for graph runs.
+
+Every graph node and every LLM call becomes a span with its wall time and
+attributes (tokens, cache hits, retries, parse failures, queue wait). Spans
+nest through a ContextVar, so LLM spans hang under the node that made them
+and nodes under the run started with `get_tracer().run()`, even when LangGraph runs
+nodes on worker threads or an event loop.
+
+Spans are collected in memory for the per-run summary table. Writing them
+to disk is opt-in: as JSONL (AUTODEV_TRACE_FILE, e.g. traces/spans.jsonl)
+and/or as OpenTelemetry OTLP/JSON lines (AUTODEV_TRACE_OTLP_FILE) that an
+OTel collector's file receiver can ingest. Set AUTODEV_TRACE=off to disable
+tracing entirely.
+"""
+
+import contextlib
+import functools
+import inspect
+import json
+import os
+import secrets
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# USD per million tokens (default: gemini-2.5-flash list prices)
+PRICE_INPUT_PER_M = float(os.getenv("AUTODEV_PRICE_INPUT_PER_M", "0.30"))
+PRICE_OUTPUT_PER_M = float(os.getenv("AUTODEV_PRICE_OUTPUT_PER_M", "2.50"))
+PRICE_CACHED_INPUT_PER_M = float(os.getenv("AUTODEV_PRICE_CACHED_INPUT_PER_M", "0.075"))
+
+
+class Span:
+    """One timed operation. Attributes are plain JSON values."""
+
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "status")
+
+    def __init__(self, name: str, kind: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = dict(attributes)
+        self.status = "ok"
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class JsonlExporter:
+    """Append each finished span as one JSON line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def export(self, span: Span) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(span.to_dict(), default=str) + "\n")
+
+
+class OtlpJsonFileExporter(JsonlExporter):
+    """Append each finished span as an OTLP/JSON ExportTraceServiceRequest line."""
+
+    def __init__(self, path: str, service_name: str = "autodev"):
+        super().__init__(path)
+        self.service_name = service_name
+
+    @staticmethod
+    def _value(value: Any) -> Dict[str, Any]:
+        if isinstance(value, bool):
+            return {"boolValue": value}
+        if isinstance(value, int):
+            return {"intValue": str(value)}
+        if isinstance(value, float):
+            return {"doubleValue": value}
+        return {"stringValue": value if isinstance(value, str) else json.dumps(value, default=str)}
+
+    def _encode(self, span: Span) -> Dict[str, Any]:
+        otlp_span = {
+            # OTel trace ids are 16 bytes, span ids 8 bytes, both lowercase hex
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": f"{span.kind}:{span.name}",
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": [
+                {"key": f"autodev.{key}", "value": self._value(value)}
+                for key, value in span.attributes.items()
+                if value is not None
+            ],
+            "status": {"code": 2 if span.status == "error" else 1},
+        }
+        if span.parent_id:
+            otlp_span["parentSpanId"] = span.parent_id
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+                "scopeSpans": [{"scope": {"name": "autodev.telemetry"}, "spans": [otlp_span]}],
+            }]
+        }
+
+    def export(self, span: Span) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(self._encode(span)) + "\n")
+
+
+_current: ContextVar[Optional[Span]] = ContextVar("autodev_current_span", default=None)
+
+
+class Tracer:
+    """Creates spans, forwards finished ones to exporters, and collects them per run."""
+
+    def __init__(self, exporters: Optional[List[Any]] = None, enabled: bool = True):
+        """
+        Args:
+            exporters: Objects with an export(span) method
+            enabled: When False, span() yields None and nothing is recorded
+        """
+        self.exporters = exporters or []
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._collected: Dict[str, List[Span]] = {}
+
+    @contextlib.contextmanager
+    def span(self, name: str, kind: str = "internal", **attributes: Any) -> Iterator[Optional[Span]]:
+        """Time the body as a child of the current span (or as a new trace)."""
+        if not self.enabled:
+            yield None
+            return
+        parent = _current.get()
+        span = Span(
+            name, kind,
+            trace_id=parent.trace_id if parent is not None else secrets.token_hex(16),
+            parent_id=parent.span_id if parent is not None else None,
+            attributes=attributes,
+        )
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.attributes["error"] = f"{type(e).__name__}: {e}"[:500]
+            raise
+        finally:
+            _current.reset(token)
+            self._finish(span)
+
+    def _finish(self, span: Span) -> None:
+        span.end_ns = time.time_ns()
+        with self._lock:
+            if span.trace_id in self._collected:
+                self._collected[span.trace_id].append(span)
+            for exporter in self.exporters:
+                try:
+                    exporter.export(span)
+                except OSError as e:
+                    print(f"[WARN] Could not export span: {e}")
+
+    @contextlib.contextmanager
+    def run(self, name: str = "graph", summary: bool = True, **attributes: Any) -> Iterator[Optional[Span]]:
+        """
+        Root span for one graph run; prints a summary table when it ends.
+
+        Yields:
+            The root span (None when tracing is disabled)
+        """
+        if not self.enabled:
+            yield None
+            return
+        trace_id = None
+        try:
+            with self.span(name, kind="run", **attributes) as root:
+                trace_id = root.trace_id
+                with self._lock:
+                    self._collected[trace_id] = []
+                yield root
+        finally:
+            with self._lock:
+                spans = self._collected.pop(trace_id, [])
+            if summary and spans:
+                print(format_summary(spans))
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def annotate(**attributes: Any) -> None:
+    """Set attributes on the current span, if any."""
+    span = _current.get()
+    if span is not None:
+        span.attributes.update(attributes)
+
+
+def increment(key: str, amount: float = 1) -> None:
+    """Add to a numeric attribute of the current span, if any."""
+    span = _current.get()
+    if span is not None:
+        span.attributes[key] = span.attributes.get(key, 0) + amount
+
+
+def mark_error(error: BaseException) -> None:
+    """Flag the current span as failed without raising (for handled errors)."""
+    span = _current.get()
+    if span is not None:
+        span.status = "error"
+        span.attributes["error"] = f"{type(error).__name__}: {error}"[:500]
+
+
+def cost_usd(input_tokens: int, output_tokens: int, cached_input_tokens: int = 0) -> float:
+    """Estimated price; cached_input_tokens are the part of input_tokens read from a prefix cache."""
+    fresh = max(input_tokens - cached_input_tokens, 0)
+    return (
+        fresh * PRICE_INPUT_PER_M
+        + cached_input_tokens * PRICE_CACHED_INPUT_PER_M
+        + output_tokens * PRICE_OUTPUT_PER_M
+    ) / 1e6
+
+
+def summarize(spans: List[Span]) -> List[Dict[str, Any]]:
+    """
+    Aggregate spans by kind and name.
+
+    Returns:
+        One row per (kind, name) with count, time and LLM counters
+    """
+    rows: Dict[tuple, Dict[str, Any]] = {}
+    for span in spans:
+        if span.kind in ("run", "story"):
+            continue
+        row = rows.setdefault((span.kind, span.name), {
+            "span": f"{span.kind}:{span.name}", "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+            "input_tokens": 0, "cached_input_tokens": 0, "output_tokens": 0, "cache_hits": 0, "retries": 0,
+            "parse_errors": 0, "errors": 0, "queue_wait_ms": 0.0,
+        })
+        attrs = span.attributes
+        row["count"] += 1
+        row["total_ms"] += span.duration_ms
+        row["max_ms"] = max(row["max_ms"], span.duration_ms)
+        row["input_tokens"] += int(attrs.get("input_tokens", 0))
+        row["cached_input_tokens"] += int(attrs.get("cached_input_tokens", 0))
+        row["output_tokens"] += int(attrs.get("output_tokens", 0))
+        row["cache_hits"] += 1 if attrs.get("cache_hit") else 0
+        row["retries"] += int(attrs.get("retries", 0))
+        row["parse_errors"] += 1 if attrs.get("parse_error") else 0
+        row["errors"] += 1 if span.status == "error" else 0
+        row["queue_wait_ms"] += float(attrs.get("queue_wait_ms", 0))
+    for row in rows.values():
+        row["cost_usd"] = cost_usd(row["input_tokens"], row["output_tokens"], row["cached_input_tokens"])
+    return sorted(rows.values(), key=lambda r: (not r["span"].startswith("node:"), r["span"]))
+
+
+def format_summary(spans: List[Span]) -> str:
+    """Render summarize() as a fixed-width table with a totals line."""
+    rows = summarize(spans)
+    header = f"{'span':<22}{'count':>6}{'total ms':>11}{'max ms':>10}{'in tok':>9}{'cached':>9}{'out tok':>9}{'cache':>7}{'retry':>7}{'parse!':>7}{'wait ms':>9}{'cost $':>10}"
+    lines = ["", "[TRACE] Run summary", header, "-" * len(header)]
+    for r in rows:
+        lines.append(
+            f"{r['span'][:21]:<22}{r['count']:>6}{r['total_ms']:>11.1f}{r['max_ms']:>10.1f}"
+            f"{r['input_tokens']:>9}{r['cached_input_tokens']:>9}{r['output_tokens']:>9}{r['cache_hits']:>7}{r['retries']:>7}"
+            f"{r['parse_errors']:>7}{r['queue_wait_ms']:>9.0f}{r['cost_usd']:>10.4f}"
+        )
+    llm_rows = [r for r in rows if r["span"].startswith("llm:")]
+    root = next((s for s in spans if s.kind == "run"), None)
+    wall = f"{root.duration_ms:.1f} ms wall, " if root is not None else ""
+    lines.append("-" * len(header))
+    lines.append(
+        f"{wall}{sum(r['count'] for r in llm_rows)} LLM calls, "
+        f"{sum(r['input_tokens'] + r['output_tokens'] for r in llm_rows)} tokens, "
+        f"${sum(r['cost_usd'] for r in llm_rows):.4f}"
+    )
+    return "\n".join(lines)
+
+
+def traced(name: str, fn: Callable) -> Callable:
+    """
+    Wrap a graph node (sync or async) in a "node" span.
+
+    The wrapper keeps fn's signature, so LangGraph still passes `config`
+    to nodes that accept it.
+    """
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            with get_tracer().span(name, kind="node"):
+                return await fn(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with get_tracer().span(name, kind="node"):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def tracer_from_env() -> Tracer:
+    """Build a tracer from AUTODEV_TRACE, AUTODEV_TRACE_FILE and AUTODEV_TRACE_OTLP_FILE."""
+    if os.getenv("AUTODEV_TRACE", "on").strip().lower() in ("off", "0", "false", "no"):
+        return Tracer(enabled=False)
+    exporters: List[Any] = []
+    jsonl_path = os.getenv("AUTODEV_TRACE_FILE", "")
+    if jsonl_path:
+        exporters.append(JsonlExporter(jsonl_path))
+    otlp_path = os.getenv("AUTODEV_TRACE_OTLP_FILE", "")
+    if otlp_path:
+        exporters.append(OtlpJsonFileExporter(otlp_path))
+    return Tracer(exporters)
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer, built from the environment on first use."""
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = tracer_from_env()
+        return _tracer
+
+
+def set_tracer(tracer: Tracer) -> Tracer:
+    """Replace the process-wide tracer (tests, benchmarks)."""
+    global _tracer
+    with _tracer_lock:
+        _tracer = tracer
+    return tracer
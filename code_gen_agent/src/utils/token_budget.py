@@ -0,0 +1,289 @@
+"""
+Token budgets for repair prompts.
+
+A repair prompt carries the agent's code and the errors to fix. Sent whole,
+a bigger project's code quickly dominates every call. PromptBudget counts
+the tokens of each section and keeps it under a per-agent limit:
+
+- files the errors refer to are sent in full,
+- other files are replaced by an outline (imports, class and function
+  signatures: via ast for Python, a small tokenizer for JS/TS), and dropped
+  to just their name if even the outlines do not fit,
+- the error list is capped at a share of the budget.
+
+Every trim is printed and recorded on the current telemetry span.
+
+Limits come from AUTODEV_REPAIR_MAX_TOKENS (default 16000), overridable per
+agent with AUTODEV_REPAIR_MAX_TOKENS_FRONTEND / _BACKEND / _INFRA.
+"""
+
+import ast
+import json
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.utils.telemetry import increment
+from src.utils.usage import estimate_tokens
+
+DEFAULT_MAX_TOKENS = 16000
+# Share of the budget the error list may use
+ERROR_SHARE = 0.2
+MAX_INSTRUCTION_CHARS = 600
+
+_SCRIPT_EXTENSIONS = (".js", ".jsx", ".ts", ".tsx", ".mjs", ".cjs")
+_SCRIPT_DECLARATION = re.compile(
+    r"^\s*(?:import\b|export\b|(?:async\s+)?function\b|class\b|interface\b|type\s+\w+\s*=|"
+    r"(?:const|let|var)\s+[\w${}\[\], ]+\s*=|module\.exports|app\.(?:get|post|put|patch|delete|use)\b|router\.)"
+)
+_SCRIPT_MEMBER = re.compile(r"^\s*(?:static\s+|async\s+|get\s+|set\s+)*[\w$]+\s*\([^)]*\)\s*\{")
+
+
+def _python_outline(source: str) -> Optional[str]:
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return None
+    lines = source.splitlines()
+
+    def header(node: ast.AST) -> str:
+        # Decorators plus the def/class line(s) up to the colon
+        start = min([d.lineno for d in getattr(node, "decorator_list", [])] + [node.lineno])
+        end = node.body[0].lineno - 1 if getattr(node, "body", None) else node.lineno
+        text = "\n".join(lines[start - 1:max(end, node.lineno)])
+        return text.rstrip()
+
+    out: List[str] = []
+
+    def segment(node: ast.stmt) -> List[str]:
+        # ast.get_source_segment re-splits the source on every call; slice lines instead
+        return lines[node.lineno - 1:node.end_lineno]
+
+    def visit(nodes: Iterable[ast.stmt], indent: str) -> None:
+        for node in nodes:
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                out.extend(line.rstrip() for line in segment(node))
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                out.append(header(node))
+                doc = ast.get_docstring(node)
+                inner = indent + "    "
+                if doc:
+                    out.append(f'{inner}"""{doc.strip().splitlines()[0]}"""')
+                if isinstance(node, ast.ClassDef):
+                    visit(node.body, inner)
+                else:
+                    out.append(f"{inner}...")
+            elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+                # Module constants and class attributes (pydantic / dataclass fields)
+                first = segment(node)[0].rstrip()
+                out.append(first if node.end_lineno == node.lineno and len(first) <= 120 else first[:80] + " ...")
+
+    visit(tree.body, "")
+    return "\n".join(out)
+
+
+def _strip_script_literals(source: str) -> List[str]:
+    """Source lines with comments removed and string/template contents blanked."""
+    out, buf = [], []
+    i, n = 0, len(source)
+    mode = None  # None, "block", or the quote character being scanned
+    while i < n:
+        ch = source[i]
+        nxt = source[i + 1] if i + 1 < n else ""
+        if ch == "\n":
+            out.append("".join(buf))
+            buf = []
+            if mode in ("'", '"'):
+                mode = None  # unterminated string; do not let it eat the file
+            i += 1
+            continue
+        if mode == "block":
+            if ch == "*" and nxt == "/":
+                mode = None
+                i += 2
+            else:
+                i += 1
+            continue
+        if mode is not None:
+            if ch == "\\":
+                i += 2
+                continue
+            if ch == mode:
+                buf.append(ch)
+                mode = None
+            i += 1
+            continue
+        if ch == "/" and nxt == "/":
+            end = source.find("\n", i)
+            i = n if end == -1 else end
+            continue
+        if ch == "/" and nxt == "*":
+            mode = "block"
+            i += 2
+            continue
+        if ch in "'\"`" and not (ch == "'" and source[i - 1:i].isalnum()):
+            mode = ch
+        buf.append(ch)
+        i += 1
+    out.append("".join(buf))
+    return out
+
+
+def _script_outline(source: str) -> str:
+    original = source.splitlines()
+    stripped = _strip_script_literals(source)
+    out: List[str] = []
+    depth = 0
+    class_depths: List[int] = []
+    for number, line in enumerate(stripped):
+        text = original[number] if number < len(original) else line
+        at_top = depth == 0
+        in_class = bool(class_depths) and depth == class_depths[-1] + 1
+        if (at_top and _SCRIPT_DECLARATION.match(line)) or (in_class and _SCRIPT_MEMBER.match(line)):
+            signature = text.rstrip()
+            # A line ending in "{" opens the body; keep everything before it
+            opens_body = line.rstrip().endswith("{") and not re.match(r"^\s*(?:export\s+(?:default\s+)?)?class\b", line)
+            if opens_body:
+                signature = text[:text.rstrip().rfind("{")].rstrip() + " { ... }"
+            elif len(signature) > 160:
+                signature = signature[:120] + " ..."
+            out.append(signature)
+            if re.match(r"^\s*(?:export\s+(?:default\s+)?)?class\b", line):
+                class_depths.append(depth)
+        depth += line.count("{") + line.count("(") + line.count("[") - line.count("}") - line.count(")") - line.count("]")
+        depth = max(depth, 0)
+        while class_depths and depth <= class_depths[-1]:
+            if depth == class_depths[-1]:
+                out.append("}")
+            class_depths.pop()
+    return "\n".join(out)
+
+
+def _json_outline(source: str) -> Optional[str]:
+    try:
+        data = json.loads(source)
+    except ValueError:
+        return None
+    if isinstance(data, dict):
+        return "{" + ", ".join(f'"{key}": ...' for key in data) + "}"
+    return f"[{len(data)} items]" if isinstance(data, list) else None
+
+
+def outline(path: str, source: str) -> str:
+    """
+    Signature-only view of a file for prompts.
+
+    Python uses ast; JS/TS a light tokenizer that keeps top-level
+    declarations and class members; JSON keeps the top-level keys. Other
+    files (or ones that do not parse) keep their first lines.
+    """
+    lower = path.lower()
+    result: Optional[str] = None
+    if lower.endswith(".py"):
+        result = _python_outline(source)
+    elif lower.endswith(_SCRIPT_EXTENSIONS):
+        result = _script_outline(source)
+    elif lower.endswith(".json"):
+        result = _json_outline(source)
+    if result is None:
+        result = "\n".join(source.splitlines()[:15])
+    return f"[outline: {len(source.splitlines())} lines, bodies omitted]\n{result}"
+
+
+class PromptBudget:
+    """Per-agent token limit for the code and error sections of a repair prompt."""
+
+    def __init__(self, max_tokens: int = DEFAULT_MAX_TOKENS, agent: str = ""):
+        """
+        Args:
+            max_tokens: Hard limit for code + errors, in estimated tokens
+            agent: Label used in the trim log
+        """
+        self.max_tokens = max_tokens
+        self.agent = agent
+        self.trimmed: List[Dict] = []
+
+    def _log(self, section: str, action: str, before: int, after: int) -> None:
+        self.trimmed.append({"section": section, "action": action, "tokens_before": before, "tokens_after": after})
+
+    def fit_errors(self, errors: List[Dict]) -> List[Dict]:
+        """Shorten long instructions and drop errors beyond the error share."""
+        limit = max(200, int(self.max_tokens * ERROR_SHARE))
+        kept: List[Dict] = []
+        used = 0
+        for error in errors:
+            before = estimate_tokens(json.dumps(error))
+            instruction = str(error.get("instruction", ""))
+            if len(instruction) > MAX_INSTRUCTION_CHARS:
+                error = {**error, "instruction": instruction[:MAX_INSTRUCTION_CHARS] + " ..."}
+            tokens = estimate_tokens(json.dumps(error))
+            if kept and used + tokens > limit:
+                dropped = errors[len(kept):]
+                self._log("errors", f"dropped {len(dropped)} error(s)", estimate_tokens(json.dumps(dropped)), 0)
+                break
+            if tokens < before:
+                self._log("errors", "shortened instruction", before, tokens)
+            kept.append(error)
+            used += tokens
+        return kept
+
+    def fit_files(self, files: Dict[str, str], relevant: Iterable[str], reserved: int = 0) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """
+        Choose how each file appears in the prompt.
+
+        Args:
+            files: {path: text} of the agent's code
+            relevant: Paths the errors refer to; always sent in full, even
+                past the budget, since they are the files to change
+            reserved: Tokens already used by other sections (errors)
+
+        Returns:
+            (shown, elided): shown maps path to the full text or an outline;
+            elided holds the original text of every other file not shown in
+            full, which the model is told to leave unchanged
+        """
+        budget = self.max_tokens - reserved
+        relevant = [p for p in dict.fromkeys(relevant) if p in files]
+        full_tokens = {path: estimate_tokens(text) for path, text in files.items()}
+        if sum(full_tokens.values()) <= budget:
+            return dict(files), {}
+
+        shown: Dict[str, str] = {path: files[path] for path in relevant}
+        elided: Dict[str, str] = {}
+        used = sum(full_tokens[path] for path in relevant)
+        if used > budget:
+            print(f"[WARN] {self.agent or 'repair'}: the {len(relevant)} file(s) named by the errors need ~{used:,} tokens, "
+                  f"over the {budget:,} left in the {self.max_tokens:,}-token budget; sending them in full anyway")
+
+        # Outlines for the rest, smallest first so more files stay visible
+        others = [p for p in files if p not in shown]
+        outlines = {p: outline(p, files[p]) for p in others}
+        for path in sorted(others, key=lambda p: estimate_tokens(outlines[p])):
+            elided[path] = files[path]
+            tokens = estimate_tokens(outlines[path])
+            if used + tokens <= budget:
+                shown[path] = outlines[path]
+                used += tokens
+                self._log(path, "outlined", full_tokens[path], tokens)
+            else:
+                self._log(path, "omitted", full_tokens[path], 0)
+
+        # Keep the project's file order
+        return {p: shown[p] for p in files if p in shown}, elided
+
+    def report(self) -> None:
+        """Print the trims and record the saved tokens on the current span."""
+        if not self.trimmed:
+            return
+        saved = sum(t["tokens_before"] - t["tokens_after"] for t in self.trimmed)
+        print(f"[BUDGET] {self.agent or 'repair'} prompt trimmed by ~{saved:,} tokens (limit {self.max_tokens:,}):")
+        for t in self.trimmed:
+            print(f"   - {t['section']}: {t['action']} ({t['tokens_before']:,} -> {t['tokens_after']:,} tokens)")
+        increment("prompt_trimmed_tokens", saved)
+
+
+def budget_for(agent: str = "") -> PromptBudget:
+    """PromptBudget with the limit from AUTODEV_REPAIR_MAX_TOKENS[_<AGENT>]."""
+    default = os.getenv("AUTODEV_REPAIR_MAX_TOKENS", str(DEFAULT_MAX_TOKENS))
+    value = os.getenv(f"AUTODEV_REPAIR_MAX_TOKENS_{agent.upper()}", default) if agent else default
+    return PromptBudget(max_tokens=int(value), agent=agent)
@@ -0,0 +1,106 @@
+"""
+Token usage accounting for LLM calls.
+
+Every call made through llm_helper is recorded twice: in process-wide totals
+and in the counter of the innermost `track_usage()` block. The scope is a
+ContextVar, so concurrent graph runs (each wrapped in its own block) keep
+separate counts even though their nodes share threads and event loops.
+"""
+
+import contextlib
+import threading
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+USAGE_KEYS = (
+    "calls", "cached_calls", "input_tokens", "cached_input_tokens", "output_tokens",
+    "estimated_calls", "retries", "queue_wait_ms",
+)
+
+_lock = threading.Lock()
+_totals: Dict[str, int] = dict.fromkeys(USAGE_KEYS, 0)
+_scope: ContextVar[Optional[Dict[str, int]]] = ContextVar("autodev_usage_scope", default=None)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) for providers that report none."""
+    return (len(text) + 3) // 4
+
+
+def _add(counts: Dict[str, int]) -> None:
+    scoped = _scope.get()
+    with _lock:
+        for key, value in counts.items():
+            _totals[key] += value
+            if scoped is not None:
+                scoped[key] += value
+
+
+def record_usage(response, prompt_text: str = "", response_text: str = "") -> Dict[str, int]:
+    """
+    Record one LLM round trip.
+
+    Uses the provider's usage_metadata when present, otherwise estimates from
+    the prompt and response text. input_tokens includes prefix-cache reads,
+    which are also counted separately as cached_input_tokens.
+
+    Returns:
+        The counts added for this call
+    """
+    metadata = getattr(response, "usage_metadata", None) or {}
+    if metadata.get("input_tokens") or metadata.get("output_tokens"):
+        counts = {
+            "calls": 1,
+            "input_tokens": int(metadata.get("input_tokens") or 0),
+            "cached_input_tokens": int((metadata.get("input_token_details") or {}).get("cache_read") or 0),
+            "output_tokens": int(metadata.get("output_tokens") or 0),
+        }
+    else:
+        counts = {
+            "calls": 1,
+            "estimated_calls": 1,
+            "input_tokens": estimate_tokens(prompt_text),
+            "output_tokens": estimate_tokens(response_text),
+        }
+    _add(counts)
+    return counts
+
+
+def record_cache_hit() -> None:
+    """Record a call answered from the response cache (no tokens spent)."""
+    _add({"cached_calls": 1})
+
+
+def record_wait(seconds: float) -> None:
+    """Record time a call spent queued behind the rate limiter."""
+    if seconds > 0:
+        _add({"queue_wait_ms": int(seconds * 1000)})
+
+
+def record_retry() -> None:
+    """Record a retried LLM request."""
+    _add({"retries": 1})
+
+
+def usage_totals() -> Dict[str, int]:
+    """Process-wide counts, with total_tokens added."""
+    with _lock:
+        totals = dict(_totals)
+    totals["total_tokens"] = totals["input_tokens"] + totals["output_tokens"]
+    return totals
+
+
+@contextlib.contextmanager
+def track_usage() -> Iterator[Dict[str, int]]:
+    """
+    Count the usage of every LLM call made inside the block.
+
+    Yields:
+        A dict of counters that is filled in as calls complete
+    """
+    counts = dict.fromkeys(USAGE_KEYS, 0)
+    token = _scope.set(counts)
+    try:
+        yield counts
+    finally:
+        _scope.reset(token)
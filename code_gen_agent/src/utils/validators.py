@@ -0,0 +1,415 @@
+"""
+Per-file static checkers and a parallel validation engine.
+
+Each checker takes (path, content) and returns a list of issues:
+
+    {"file": path, "line": 3, "checker": "python", "severity": "error", "message": "..."}
+
+Checkers are picked by file name (see CHECKERS / register_checker) and the
+engine fans files out over a process pool, so a large generated project
+validates in roughly the time of its slowest file.
+"""
+
+import json
+import multiprocessing
+import os
+import pickle
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+Issue = Dict[str, object]
+
+
+def _issue(path: str, checker: str, message: str, line: Optional[int] = None, severity: str = "error") -> Issue:
+    return {"file": path, "line": line, "checker": checker, "severity": severity, "message": message}
+
+
+# --- Python ---
+
+def check_python(path: str, content: str) -> List[Issue]:
+    """Compile the module to catch syntax errors (nothing is executed)."""
+    try:
+        compile(content, path, "exec")
+    except SyntaxError as e:
+        return [_issue(path, "python", f"SyntaxError: {e.msg}", e.lineno)]
+    except ValueError as e:
+        # e.g. source code containing null bytes
+        return [_issue(path, "python", f"ValueError: {e}")]
+    return []
+
+
+# --- JSON ---
+
+def check_json(path: str, content: str) -> List[Issue]:
+    try:
+        json.loads(content)
+    except json.JSONDecodeError as e:
+        return [_issue(path, "json", f"JSONDecodeError: {e.msg}", e.lineno)]
+    return []
+
+
+# --- YAML ---
+
+def check_yaml(path: str, content: str) -> List[Issue]:
+    try:
+        import yaml
+    except ImportError:
+        # YAML not available, just check it's not empty
+        return [] if content.strip() else [_issue(path, "yaml", "File is empty")]
+
+    try:
+        documents = [doc for doc in yaml.safe_load_all(content) if doc is not None]
+    except yaml.YAMLError as e:
+        mark = getattr(e, "problem_mark", None)
+        return [_issue(path, "yaml", f"YAMLError: {getattr(e, 'problem', None) or e}", mark.line + 1 if mark else None)]
+
+    issues = []
+    if not documents:
+        issues.append(_issue(path, "yaml", "File is empty"))
+    elif os.path.basename(path).startswith(("docker-compose", "compose.")):
+        if not isinstance(documents[0], dict) or "services" not in documents[0]:
+            issues.append(_issue(path, "yaml", "Compose file has no 'services' section"))
+    return issues
+
+
+# --- JavaScript / TypeScript / JSX ---
+
+_PAIRS = {")": "(", "]": "[", "}": "{"}
+# A '/' after one of these starts a regex literal rather than a division
+# ('<' is left out: "</" is almost always a JSX closing tag)
+_REGEX_PRECEDERS = set("(,=:[!&|?{};+-*%~^") | {""}
+
+
+def check_script(path: str, content: str) -> List[Issue]:
+    """
+    Tokenize JS/TS/JSX just enough to check bracket balance.
+
+    Skips comments, string/template literals and regex literals. A quote
+    directly after a letter is treated as JSX text (e.g. "Don't") rather
+    than the start of a string.
+    """
+    issues: List[Issue] = []
+    stack: List[Tuple[str, int]] = []
+    # Brace depth at which each open template literal's ${...} started
+    template_depths: List[int] = []
+    line = 1
+    i = 0
+    n = len(content)
+    prev = ""  # last significant (non-space) character outside literals
+
+    def scan_template(start: int) -> int:
+        """Scan a template literal body from `start`; return index after it or of '${'."""
+        nonlocal line
+        j = start
+        while j < n:
+            ch = content[j]
+            if ch == "\\":
+                j += 2
+                continue
+            if ch == "\n":
+                line += 1
+            if ch == "`":
+                return j + 1
+            if ch == "$" and j + 1 < n and content[j + 1] == "{":
+                template_depths.append(len(stack))
+                stack.append(("{", line))
+                return j + 2
+            j += 1
+        issues.append(_issue(path, "script", "Unterminated template literal", line))
+        return n
+
+    while i < n:
+        ch = content[i]
+        nxt = content[i + 1] if i + 1 < n else ""
+
+        if ch == "\n":
+            line += 1
+            i += 1
+            continue
+        if ch in " \t\r":
+            i += 1
+            continue
+
+        # Comments
+        if ch == "/" and nxt == "/":
+            end = content.find("\n", i)
+            i = n if end == -1 else end
+            continue
+        if ch == "/" and nxt == "*":
+            end = content.find("*/", i + 2)
+            if end == -1:
+                issues.append(_issue(path, "script", "Unterminated block comment", line))
+                break
+            line += content.count("\n", i, end)
+            i = end + 2
+            continue
+
+        # String literals (a quote glued to a word is JSX text, e.g. Don't)
+        if ch in "'\"" and not content[i - 1:i].isalnum():
+            j = i + 1
+            while j < n and content[j] != ch and content[j] != "\n":
+                j += 2 if content[j] == "\\" else 1
+            if j >= n or content[j] == "\n":
+                issues.append(_issue(path, "script", "Unterminated string literal", line, severity="warning"))
+            i = j + 1
+            prev = "a"
+            continue
+
+        # Template literals
+        if ch == "`":
+            i = scan_template(i + 1)
+            prev = "a"
+            continue
+
+        # Regex literals
+        if ch == "/" and prev in _REGEX_PRECEDERS:
+            j = i + 1
+            in_class = False
+            while j < n and content[j] != "\n":
+                c = content[j]
+                if c == "\\":
+                    j += 2
+                    continue
+                if c == "[":
+                    in_class = True
+                elif c == "]":
+                    in_class = False
+                elif c == "/" and not in_class:
+                    break
+                j += 1
+            if j < n and content[j] == "/":
+                i = j + 1
+                prev = "a"
+                continue
+            # Not a regex after all (e.g. JSX "</" or "/>"): treat as an operator
+
+        if ch in "([{":
+            stack.append((ch, line))
+        elif ch in ")]}":
+            if not stack:
+                issues.append(_issue(path, "script", f"Unexpected '{ch}'", line))
+            else:
+                opener, open_line = stack.pop()
+                if opener != _PAIRS[ch]:
+                    issues.append(_issue(
+                        path, "script", f"Mismatched '{ch}' (opened '{opener}' on line {open_line})", line
+                    ))
+                    break
+                if ch == "}" and template_depths and template_depths[-1] == len(stack):
+                    # End of ${...}: resume scanning the template literal
+                    template_depths.pop()
+                    i = scan_template(i + 1)
+                    prev = "a"
+                    continue
+
+        prev = ch if not ch.isalnum() and ch not in "_$" else "a"
+        i += 1
+
+    if stack and not any(issue["severity"] == "error" for issue in issues):
+        opener, open_line = stack[-1]
+        issues.append(_issue(path, "script", f"Unclosed '{opener}'", open_line))
+    return issues
+
+
+# --- Dockerfile ---
+
+_DOCKER_INSTRUCTIONS = {
+    "FROM", "RUN", "CMD", "LABEL", "MAINTAINER", "EXPOSE", "ENV", "ADD", "COPY", "ENTRYPOINT",
+    "VOLUME", "USER", "WORKDIR", "ARG", "ONBUILD", "STOPSIGNAL", "HEALTHCHECK", "SHELL",
+}
+
+
+def _dockerfile_instructions(content: str) -> List[Tuple[int, str, str]]:
+    """Join continuation lines and return (line, INSTRUCTION, arguments)."""
+    result = []
+    buffer, start = "", 0
+    for number, raw in enumerate(content.splitlines(), 1):
+        stripped = raw.strip()
+        if not buffer and (not stripped or stripped.startswith("#")):
+            continue
+        if not buffer:
+            start = number
+        if stripped.endswith("\\"):
+            buffer += stripped[:-1] + " "
+            continue
+        buffer += stripped
+        keyword, _, args = buffer.partition(" ")
+        result.append((start, keyword.upper(), args.strip()))
+        buffer = ""
+    if buffer:
+        keyword, _, args = buffer.partition(" ")
+        result.append((start, keyword.upper(), args.strip()))
+    return result
+
+
+def check_dockerfile(path: str, content: str) -> List[Issue]:
+    """A handful of hadolint-style rules that catch the usual LLM mistakes."""
+    issues = []
+    instructions = _dockerfile_instructions(content)
+    if not instructions:
+        return [_issue(path, "dockerfile", "Dockerfile is empty")]
+
+    first = next((ins for ins in instructions if ins[1] != "ARG"), None)
+    if first is None or first[1] != "FROM":
+        issues.append(_issue(path, "dockerfile", "First instruction must be FROM", first[0] if first else 1))
+
+    runs = {"CMD": 0, "ENTRYPOINT": 0}
+    for line, keyword, args in instructions:
+        if keyword not in _DOCKER_INSTRUCTIONS:
+            issues.append(_issue(path, "dockerfile", f"Unknown instruction '{keyword}'", line))
+            continue
+        if keyword == "FROM":
+            image = args.split()[0] if args else ""
+            if not image:
+                issues.append(_issue(path, "dockerfile", "FROM without an image", line))
+            elif image != "scratch" and "$" not in image and "@" not in image:
+                tag = image.rsplit("/", 1)[-1].partition(":")[2]
+                if not tag or tag == "latest":
+                    issues.append(_issue(path, "dockerfile", f"Pin a version tag for '{image}'", line, "warning"))
+        elif keyword in runs:
+            runs[keyword] += 1
+        elif keyword == "RUN":
+            if re.search(r"\bapt-get\s+install\b", args) and not re.search(r"\s(-y|--yes|--assume-yes)\b", args):
+                issues.append(_issue(path, "dockerfile", "apt-get install without -y will hang the build", line))
+            if re.search(r"(^|&&|;)\s*cd\s", args):
+                issues.append(_issue(path, "dockerfile", "Use WORKDIR instead of 'cd' in RUN", line, "warning"))
+        elif keyword == "ADD":
+            source = args.split()[0] if args else ""
+            if not re.match(r"https?://", source) and not re.search(r"\.(tar|tgz|tar\.\w+)$", source):
+                issues.append(_issue(path, "dockerfile", "Use COPY instead of ADD for local files", line, "warning"))
+        elif keyword == "WORKDIR" and args and not args.startswith(("/", "$")):
+            issues.append(_issue(path, "dockerfile", "WORKDIR should be an absolute path", line, "warning"))
+
+    for keyword, count in runs.items():
+        if count > 1:
+            issues.append(_issue(path, "dockerfile", f"Multiple {keyword} instructions; only the last takes effect", None, "warning"))
+    if not runs["CMD"] and not runs["ENTRYPOINT"]:
+        issues.append(_issue(path, "dockerfile", "No CMD or ENTRYPOINT", None, "warning"))
+    return issues
+
+
+# --- Registry ---
+
+Matcher = Callable[[str], bool]
+Checker = Callable[[str, str], List[Issue]]
+
+
+def _ext(*extensions: str) -> Matcher:
+    return lambda path: path.lower().endswith(extensions)
+
+
+def _is_dockerfile(path: str) -> bool:
+    name = os.path.basename(path)
+    return name == "Dockerfile" or name.startswith("Dockerfile.") or name.endswith(".Dockerfile")
+
+
+# (name, matcher, checker); every matching checker runs on a file
+CHECKERS: List[Tuple[str, Matcher, Checker]] = [
+    ("python", _ext(".py"), check_python),
+    ("json", _ext(".json"), check_json),
+    ("yaml", _ext(".yml", ".yaml"), check_yaml),
+    ("script", _ext(".js", ".jsx", ".ts", ".tsx", ".mjs", ".cjs"), check_script),
+    ("dockerfile", _is_dockerfile, check_dockerfile),
+]
+
+
+def register_checker(name: str, matcher: Matcher, checker: Checker) -> None:
+    """
+    Add a checker to the registry.
+
+    Matchers run in the calling process. Workers do not share the registry
+    (they start fresh and re-import this module), so each file is sent with
+    the checkers that match it, and `checker` must be picklable (a
+    module-level function); otherwise validation runs in-process.
+    """
+    CHECKERS.append((name, matcher, checker))
+
+
+def checkers_for(path: str) -> List[Tuple[str, Checker]]:
+    return [(name, checker) for name, matcher, checker in CHECKERS if matcher(path)]
+
+
+def run_checks(item: Tuple) -> Tuple[str, List[Issue]]:
+    """
+    Run checkers on one file. Module-level so it pickles.
+
+    Args:
+        item: (path, content), or (path, content, [(name, checker)]) with
+            the checkers already chosen by the caller's registry
+    """
+    path, content = item[0], item[1]
+    issues: List[Issue] = []
+    for name, checker in (item[2] if len(item) > 2 else checkers_for(path)):
+        try:
+            issues.extend(checker(path, content))
+        except Exception as e:  # a broken checker must not sink the whole run
+            issues.append(_issue(path, name, f"Checker crashed: {type(e).__name__}: {e}", severity="warning"))
+    return path, issues
+
+
+class ValidationEngine:
+    """Run the registered checkers over many files, in parallel when it pays off."""
+
+    def __init__(self, max_workers: Optional[int] = None, parallel_threshold: int = 8):
+        """
+        Args:
+            max_workers: Process pool size (default: AUTODEV_VALIDATION_WORKERS or CPU count)
+            parallel_threshold: Below this many files, validate in-process (pool startup costs more)
+        """
+        env_workers = os.getenv("AUTODEV_VALIDATION_WORKERS")
+        self.max_workers = max_workers or (int(env_workers) if env_workers else os.cpu_count() or 1)
+        self.parallel_threshold = parallel_threshold
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Forking a process that runs graph and server threads can copy held
+            # locks into the child; start workers from a clean server instead
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context(method))
+        return self._pool
+
+    def validate(self, files: Dict[str, str]) -> Dict[str, List[Issue]]:
+        """
+        Validate {path: content}.
+
+        Returns:
+            {path: [issues]} for every file that has at least one checker
+        """
+        # Checkers are matched here, so ones registered at runtime reach the workers too
+        items = [(path, content, checkers) for path, content in files.items() if (checkers := checkers_for(path))]
+        if not items:
+            return {}
+
+        if len(items) < self.parallel_threshold or self.max_workers <= 1:
+            return dict(run_checks(item) for item in items)
+
+        chunksize = max(1, len(items) // (self.max_workers * 4))
+        try:
+            return dict(self._get_pool().map(run_checks, items, chunksize=chunksize))
+        except (OSError, RuntimeError) as e:
+            # Pools can be unavailable (e.g. restricted sandboxes); fall back to serial
+            print(f"[WARN] Validation pool unavailable ({e}), validating serially")
+            self.shutdown()
+            return dict(run_checks(item) for item in items)
+        except (pickle.PicklingError, AttributeError, TypeError) as e:
+            # A registered checker that cannot be sent to a worker (lambda, closure)
+            print(f"[WARN] A checker cannot run in a worker process ({e}), validating serially")
+            return dict(run_checks(item) for item in items)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+_engine: Optional[ValidationEngine] = None
+
+
+def get_engine() -> ValidationEngine:
+    """Process-wide engine so the worker pool is reused across sandbox runs."""
+    global _engine
+    if _engine is None:
+        _engine = ValidationEngine()
+    return _engine
@@ -2,8 +2,14 @@ import streamlit as st
 import json
 import os
 from dotenv import load_dotenv
-from src.core.graph import create_graph
+from src.core.graph import create_graph, auto_mode_from_env
+from src.core.checkpointer import create_checkpointer
+from src.core.sessions import ThreadRegistry, new_thread_id
 from src.core.state import GraphState
+from src.utils.blob_store import get_blob_store
+from src.utils.file_history import checkpoints_with_files, diff_manifests, group_by_directory, language_for, unified_diff
+from src.job_client import client_from_env
+from src.utils.telemetry import get_tracer
 from langchain_core.messages import HumanMessage
 from typing import Any, Dict, cast
 from langchain_core.runnables import RunnableConfig
@@ -14,22 +20,209 @@ load_dotenv()
 st.set_page_config(page_title="AutoDev Agent", layout="wide")
 st.title("🤖 AutoDev: AI Software Architect")
 
+# --- Shared Resources ---
+@st.cache_resource
+def shared_graphs():
+    """
+    Graphs compiled once per process and shared by every browser session.
+
+    Review and automatic graphs share one checkpointer, so either can read
+    the thread; the registry bounds how many threads stay resident.
+    """
+    checkpointer = create_checkpointer()
+    graphs = {False: create_graph(checkpointer, auto=False), True: create_graph(checkpointer, auto=True)}
+    return graphs, ThreadRegistry(checkpointer)
+
+
 # --- Session State Management ---
 if "thread_id" not in st.session_state:
-    st.session_state.thread_id = "demo_thread_1"
-if "graph" not in st.session_state:
-    st.session_state.graph = create_graph()
+    # One thread per browser session (and per project started in it)
+    st.session_state.thread_id = new_thread_id()
+if "job_client" not in st.session_state:
+    # With AUTODEV_JOB_SERVICE_URL set, graphs run in the job service (src/service.py)
+    st.session_state.job_client = client_from_env()
+job_client = st.session_state.job_client
+if job_client is None:
+    graphs, threads = shared_graphs()
+    if "graph" not in st.session_state:
+        st.session_state.graph = graphs[auto_mode_from_env()]
 if "messages" not in st.session_state:
     st.session_state.messages = []
 
+# --- Live Output ---
+TOKEN_TAIL_CHARS = 1500
+
+
+def render_live_output(events):
+    """
+    Render each agent's tokens and completed files as they arrive.
+
+    Args:
+        events: (mode, chunk) pairs as yielded by
+            graph.stream(stream_mode=["updates", "custom"]) or JobClient.stream.
+            Node updates come from "updates"; LLM tokens, finished top-level
+            JSON members and retries ({"event": "token"|"item"|"retry"}) from
+            "custom".
+    """
+    panels: Dict[str, Dict[str, Any]] = {}
+
+    def panel(agent: str) -> Dict[str, Any]:
+        if agent not in panels:
+            box = live_area.expander(f"⏳ {agent or 'llm'}", expanded=True)
+            panels[agent] = {"items": [], "tokens": "", "items_slot": box.empty(), "tokens_slot": box.empty()}
+        return panels[agent]
+
+    for mode, chunk in events:
+        if mode == "custom" and isinstance(chunk, dict):
+            p = panel(chunk.get("agent", ""))
+            if chunk.get("event") == "token":
+                p["tokens"] = (p["tokens"] + chunk.get("text", ""))[-TOKEN_TAIL_CHARS:]
+                p["tokens_slot"].code(p["tokens"], language="json")
+            elif chunk.get("event") == "retry":
+                # The request is being re-sent; drop the partial output
+                p["items"], p["tokens"] = [], ""
+                p["items_slot"].warning(f"Retrying (attempt {chunk.get('attempt')}) in {chunk.get('delay', 0):.1f}s...")
+                p["tokens_slot"].empty()
+            elif chunk.get("event") == "item":
+                p["items"].append(str(chunk.get("key")))
+                p["items_slot"].markdown("\n".join(f"- ✅ `{name}`" for name in p["items"]))
+        elif mode == "updates" and isinstance(chunk, dict):
+            for node in chunk:
+                if node in panels:
+                    panels[node]["tokens_slot"].empty()
+
+
+def stream_with_live_output(graph_input, config: RunnableConfig):
+    """Run the graph in-process with live output."""
+    # One trace per run; the span summary table is printed to the console
+    with get_tracer().run("graph", thread_id=config["configurable"]["thread_id"]):
+        render_live_output(st.session_state.graph.stream(graph_input, config=config, stream_mode=["updates", "custom"]))
+
+
+def follow_job(job: Dict[str, Any]):
+    """Render a service job's live output until it finishes."""
+    st.session_state.job_error = None
+    render_live_output(job_client.stream(job["id"]))
+    job = job_client.job(job["id"])
+    if job["status"] == "failed":
+        st.session_state.job_error = job["error"]
+
+
+# --- File Browser ---
+# Files longer than this are cut in the page; the download button has the rest
+MAX_RENDER_LINES = 2000
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def file_preview(value: str) -> tuple:
+    """
+    (first MAX_RENDER_LINES lines, line count) of a manifest value.
+
+    In-process manifests hold digests, so the cache is keyed on the content
+    hash; the job service sends the text itself.
+    """
+    lines = get_blob_store().resolve(value).splitlines()
+    return "\n".join(lines[:MAX_RENDER_LINES]), len(lines)
+
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def cached_diff(old_value: str, new_value: str, path: str) -> str:
+    store = get_blob_store()
+    return unified_diff(store.resolve(old_value) if old_value else "", store.resolve(new_value) if new_value else "", path)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def parse_api_spec(api_spec: str):
+    """The spec as JSON, or None when it is empty or not valid JSON."""
+    try:
+        return json.loads(api_spec)
+    except ValueError:
+        return None
+
+
+def render_file_browser(section: str, manifest: Dict[str, str]):
+    """A directory picker and one file at a time; nothing else is read."""
+    groups = group_by_directory(manifest)
+    left, right = st.columns([1, 3])
+    with left:
+        folder = st.selectbox("Folder", list(groups), key=f"{section}_folder", format_func=lambda d: f"{d}/" if d else "/")
+        path = st.radio("File", groups[folder], key=f"{section}_file_{folder}", format_func=os.path.basename)
+    with right:
+        preview, line_count = file_preview(manifest[path])
+        st.markdown(f"**`{path}`** · {line_count} lines")
+        st.code(preview, language=language_for(path), line_numbers=True)
+        if line_count > MAX_RENDER_LINES:
+            st.caption(f"Showing the first {MAX_RENDER_LINES} of {line_count} lines.")
+            full_text = get_blob_store().resolve(manifest[path])
+            st.download_button("Download full file", full_text, file_name=os.path.basename(path), key=f"{section}_download")
+
+
+def checkpoint_history(head: str):
+    """Checkpoints with file changes, recomputed only when the thread moves on."""
+    key = (st.session_state.thread_id, head)
+    if st.session_state.get("history_key") != key:
+        snapshots = st.session_state.graph.get_state_history({"configurable": {"thread_id": st.session_state.thread_id}})
+        st.session_state.history = checkpoints_with_files(snapshots)
+        st.session_state.history_key = key
+    return st.session_state.history
+
+
+def render_history(checkpoints):
+    """Diff the generated files between any two checkpoints of the thread."""
+    if len(checkpoints) < 2:
+        st.info("Diffs appear once the files have changed at least once.")
+        return
+    labels = [c["label"] for c in checkpoints]
+    col1, col2 = st.columns(2)
+    with col1:
+        old_index = st.selectbox("From", range(len(labels)), index=len(labels) - 2, format_func=labels.__getitem__, key="diff_from")
+    with col2:
+        new_index = st.selectbox("To", range(len(labels)), index=len(labels) - 1, format_func=labels.__getitem__, key="diff_to")
+    old, new = checkpoints[old_index]["files"], checkpoints[new_index]["files"]
+    changes = []
+    for section in old.keys() | new.keys():
+        for kind, paths in diff_manifests(old.get(section, {}), new.get(section, {})).items():
+            changes.extend((section, kind, p) for p in paths)
+    if not changes:
+        st.info("No file changes between these checkpoints.")
+        return
+    changes.sort(key=lambda c: (c[0], c[2]))
+    marks = {"added": "+", "removed": "-", "changed": "~"}
+    section, kind, path = st.selectbox(
+        f"{len(changes)} changed file(s)", changes, format_func=lambda c: f"{marks[c[1]]} {c[0]}/{c[2]}", key="diff_file",
+    )
+    st.code(cached_diff(old.get(section, {}).get(path, ""), new.get(section, {}).get(path, ""), path) or "(identical)", language="diff")
+
+
+# Main-area slot for live output (the Start button lives in the sidebar)
+live_area = st.container()
+
 # --- Sidebar: Project Controls ---
 with st.sidebar:
     st.header("Project Configuration")
     user_story = st.text_area("User Story", "Build a simple To-Do List app with a dark mode UI.")
+    auto_mode = st.checkbox(
+        "Automatic repair (no review pause)",
+        value=auto_mode_from_env(),
+        help="Loop sandbox -> reflector -> agents until the sandbox passes or AUTODEV_MAX_ITERATIONS is reached",
+    )
     start_btn = st.button("🚀 Start New Project")
     
     if start_btn:
         st.session_state.messages = []
+        st.session_state.auto_mode = auto_mode
+        if job_client is not None:
+            with st.spinner("Architecting & Coding..."):
+                job = job_client.submit(user_story, auto=auto_mode)
+                st.session_state.thread_id = job["thread_id"]
+                follow_job(job)
+                st.rerun()
+        # A new project gets a new thread; the previous one is no longer reachable
+        threads.release(st.session_state.thread_id)
+        st.session_state.thread_id = new_thread_id()
+        st.session_state.has_project = True
+        threads.touch(st.session_state.thread_id)
+        st.session_state.graph = graphs[auto_mode]
         # Initial Run
         config: RunnableConfig = {"configurable": {"thread_id": st.session_state.thread_id}}
         initial_state: GraphState = {
@@ -47,49 +240,66 @@ with st.sidebar:
         
         with st.spinner("Architecting & Coding..."):
             # Run until the interrupt (Human Node)
-            for event in st.session_state.graph.stream(initial_state, config=config):
-                pass 
+            stream_with_live_output(initial_state, config)
             st.rerun()
 
 # --- Main Logic: Retrieve Current State ---
 config: RunnableConfig = {"configurable": {"thread_id": st.session_state.thread_id}}
-# Get the current snapshot of the graph (paused state)
-snapshot = st.session_state.graph.get_state(config)
-
-if snapshot.values:
+# Current values of the thread (paused state); the service returns file text instead of digests
+if job_client is not None:
+    state = job_client.thread_state(st.session_state.thread_id) or {}
+else:
+    if st.session_state.get("has_project"):
+        threads.touch(st.session_state.thread_id)
+    snapshot = st.session_state.graph.get_state(config)
     state = snapshot.values
+    head = (snapshot.config or {}).get("configurable", {}).get("checkpoint_id", "")
+
+if st.session_state.get("job_error"):
+    st.error(f"Job failed: {st.session_state.job_error}")
+
+if state:
     
     # 1. Display Architecture Plan
     if "api_spec" in state:
         with st.expander("📄 Architecture Plan & API Spec", expanded=False):
-            st.json(json.loads(state["api_spec"]))
+            spec = parse_api_spec(state["api_spec"] or "")
+            if spec is not None:
+                st.json(spec)
+            elif state["api_spec"]:
+                st.code(state["api_spec"])
             st.markdown(state.get("architecture_plan", ""))
 
-    # 2. Code Review Tabs
+    # 2. Code Review Tabs (one file at a time, read on selection)
     st.subheader("💻 Generated Codebase")
-    tab1, tab2 = st.tabs(["Frontend (React)", "Backend (FastAPI)"])
-    
-    with tab1:
-        files = state.get("frontend_files", {})
-        if files:
-            for fname, code in files.items():
-                st.markdown(f"**`{fname}`**")
-                st.code(code, language="javascript")
-        else:
-            st.info("Frontend code not generated yet.")
-
-    with tab2:
-        files = state.get("backend_files", {})
-        if files:
-            for fname, code in files.items():
-                st.markdown(f"**`{fname}`**")
-                st.code(code, language="python")
+    sections = {"frontend": "Frontend (React)", "backend": "Backend (FastAPI)", "infra": "Infra (Docker)"}
+    tabs = st.tabs(list(sections.values()) + ["History"])
+
+    for tab, (section, label) in zip(tabs, sections.items()):
+        with tab:
+            manifest = state.get(f"{section}_files") or {}
+            if manifest:
+                render_file_browser(section, manifest)
+            else:
+                st.info(f"{label.split(' ')[0]} code not generated yet.")
+
+    with tabs[-1]:
+        if job_client is not None:
+            st.info("Checkpoint diffs are available when the graph runs in this process.")
         else:
-            st.info("Backend code not generated yet.")
+            render_history(checkpoint_history(head))
 
     # 3. Human Feedback Loop (The "Sandbox")
     st.divider()
     st.subheader("🛠️ Sandbox / Human Review")
+
+    sandbox = state.get("sandbox_logs") or {}
+    if sandbox:
+        status = sandbox.get("status", "UNKNOWN")
+        message = f"Sandbox: {status} (iteration {state.get('iteration_count', 0)})"
+        (st.success if status == "SUCCESS" else st.error)(message)
+        if sandbox.get("error"):
+            st.code(sandbox["error"])
     
     col1, col2 = st.columns([3, 1])
     with col1:
@@ -101,7 +311,10 @@ if snapshot.values:
         # Resume the graph!
         # We update the state with the human feedback and resume
         with st.spinner("Analyzing Feedback & Fixing Code..."):
-            
+            if job_client is not None:
+                follow_job(job_client.feedback(st.session_state.thread_id, feedback, auto=st.session_state.get("auto_mode", False)))
+                st.rerun()
+
             # Update the state 'human_feedback' key
             st.session_state.graph.update_state(
                 config, 
@@ -109,10 +322,14 @@ if snapshot.values:
             )
             
             # Continue execution (will go to Reflector -> Router -> Agents)
-            for event in st.session_state.graph.stream(None, config=config):
-                pass
+            stream_with_live_output(None, config)
             
             st.rerun()
 
 else:
+    if st.session_state.get("has_project") and job_client is None:
+        # Released threads are normally spilled to disk and restored by touch();
+        # only with AUTODEV_THREAD_SPILL_DB disabled (or unusable) are they gone
+        st.warning("This project's history is no longer available: it was released while idle and no spill file keeps released projects (see AUTODEV_THREAD_SPILL_DB). Start a new one.")
+        st.session_state.has_project = False
     st.info("👈 Enter a User Story in the sidebar and click Start to begin.")
\ No newline at end of file
@@ -0,0 +1,64 @@
+import pytest
+
+
+@pytest.fixture(autouse=True, scope="session")
+def llm_cache_dir(tmp_path_factory):
+    """The response cache is on by default; keep it out of the working directory."""
+    patch = pytest.MonkeyPatch()
+    patch.setenv("AUTODEV_LLM_CACHE_DIR", str(tmp_path_factory.mktemp("llm_cache")))
+    yield
+    patch.undo()
+
+
+@pytest.fixture(autouse=True)
+def no_trace_files(monkeypatch):
+    """Tests never write span files; each starts with a tracer built from this environment."""
+    from src.utils import telemetry
+
+    monkeypatch.delenv("AUTODEV_TRACE_FILE", raising=False)
+    monkeypatch.delenv("AUTODEV_TRACE_OTLP_FILE", raising=False)
+    monkeypatch.setattr(telemetry, "_tracer", None)
+
+
+# Default stub replies per agent role (matched against the system prompt)
+STUB_RESPONSES = {
+    "Chief Architect": {"api_spec": "{}", "architecture_plan": "plan"},
+    "Backend Developer": {"backend/main.py": "from fastapi import FastAPI\napp = FastAPI()\n"},
+    "React Developer": {"frontend/package.json": "{}", "frontend/src/App.js": "export default 1;\n"},
+    "DevOps Engineer": {"docker-compose.yml": "services:\n  backend:\n    build: ./backend\n"},
+}
+
+
+@pytest.fixture
+def stub_graph(tmp_path, monkeypatch):
+    """
+    Build a graph whose agents answer from a StubChatModel, with blobs and
+    sandboxes under tmp_path (which becomes the working directory).
+
+    Call it as stub_graph(responses=None, rules=(), auto=False, checkpointer=None):
+        responses: {role: reply} replacing entries of STUB_RESPONSES
+        rules: Extra stub rules tried before the per-role ones
+        auto: Build the automatic graph instead of the review one
+        checkpointer: Shared checkpointer (default: a new MemorySaver)
+
+    Returns (graph, stub).
+    """
+    from langgraph.checkpoint.memory import MemorySaver
+
+    from src.core.graph import create_graph
+    from src.utils import llm_helper
+    from src.utils.llm_providers import StubChatModel
+
+    monkeypatch.setenv("AUTODEV_BLOB_DIR", str(tmp_path / "blobs"))
+    monkeypatch.setattr(llm_helper, "llm_cache", None)
+    monkeypatch.chdir(tmp_path)
+
+    def build(responses=None, rules=(), auto=False, checkpointer=None):
+        replies = {**STUB_RESPONSES, **(responses or {})}
+        stub = StubChatModel(rules=list(rules) + [{"match": role, "response": reply} for role, reply in replies.items()])
+        monkeypatch.setattr(llm_helper, "MODEL_NAME", stub.model_name, raising=False)
+        monkeypatch.setattr(llm_helper, "llm", stub)
+        graph = create_graph(checkpointer if checkpointer is not None else MemorySaver(), auto=auto)
+        return graph, stub
+
+    return build
@@ -0,0 +1,103 @@
+import asyncio
+import json
+import os
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from src.batch import BatchRunner, completed_ids, load_stories
+from src.utils.usage import track_usage, record_usage
+
+
+def test_load_stories_assigns_stable_ids(tmp_path):
+    path = tmp_path / "stories.jsonl"
+    path.write_text('{"id": "a", "story": "todo"}\n"notes"\n\n{"user_story": "notes"}\nnot json\n')
+
+    stories = load_stories(str(path))
+    assert [s["story"] for s in stories] == ["todo", "notes"]
+    assert stories[0]["id"] == "a"
+    assert stories[1]["id"] == load_stories(str(path))[1]["id"]
+
+
+def test_completed_ids_ignores_torn_line(tmp_path):
+    path = tmp_path / "results.jsonl"
+    path.write_text('{"id": "a", "status": "SUCCESS"}\n{"id": "b", "status": "SUCCESS"}\n{"id": "c", "sta')
+    assert completed_ids(str(path)) == {"a", "b"}
+
+
+def test_completed_ids_leaves_failed_stories_to_retry(tmp_path):
+    path = tmp_path / "results.jsonl"
+    path.write_text('{"id": "a", "status": "ERROR"}\n{"id": "b", "status": "FAILED"}\n'
+                    '{"id": "c", "status": "SUCCESS"}\n{"id": "a", "status": "SUCCESS"}\n[1]\n')
+    assert completed_ids(str(path)) == {"a", "c"}
+
+
+def test_usage_is_scoped_per_block():
+    with track_usage() as outer:
+        record_usage(None, "x" * 40, "y" * 8)
+        with track_usage() as inner:
+            record_usage(None, "", "z" * 4)
+    assert inner["output_tokens"] == 1
+    assert (outer["calls"], outer["input_tokens"], outer["output_tokens"], outer["estimated_calls"]) == (1, 10, 2, 1)
+
+
+def test_batch_runs_and_resumes(tmp_path, stub_graph):
+    graph, stub = stub_graph()
+
+    stories = [{"id": "one", "story": "todo"}, {"id": "two", "story": "blog"}]
+    results = tmp_path / "results.jsonl"
+    runner = BatchRunner(graph, str(results), concurrency=2, sandbox_root="boxes")
+    asyncio.run(runner.run(stories))
+
+    lines = [json.loads(line) for line in results.read_text().splitlines()]
+    assert sorted(r["id"] for r in lines) == ["one", "two"]
+    assert all(r["status"] == "SUCCESS" and r["files"]["backend"] == 1 for r in lines)
+    assert all(r["usage"]["calls"] == 4 for r in lines)
+    assert (tmp_path / "boxes" / "one" / ".manifest.json").exists()
+
+    calls = stub.calls
+    asyncio.run(runner.run(stories + [{"id": "three", "story": "shop"}]))
+    assert stub.calls == calls + 4
+    assert len(results.read_text().splitlines()) == 3
+
+
+def test_auto_mode_repairs_until_sandbox_passes(tmp_path, stub_graph):
+    fixed = {"backend/main.py": "from fastapi import FastAPI\napp = FastAPI()\n"}
+    graph, _ = stub_graph(
+        responses={"Backend Developer": {"backend/main.py": "app = (\n"}},
+        rules=[{"match": "Backend Developer", "user_match": "was never closed", "response": fixed}],
+        auto=True,
+    )
+
+    results = tmp_path / "results.jsonl"
+    runner = BatchRunner(graph, str(results), sandbox_root="boxes")
+    asyncio.run(runner.run([{"id": "one", "story": "todo"}]))
+
+    result = json.loads(results.read_text())
+    assert result["status"] == "SUCCESS"
+    assert result["iterations"] == 2
+    # architect + 3 builders, one backend repair; the reflector never calls the LLM
+    assert result["usage"]["calls"] == 5
+
+
+def test_collect_garbage_removes_unreferenced_blobs(tmp_path, monkeypatch):
+    from src.batch import collect_garbage
+    from src.utils.blob_store import get_blob_store
+
+    monkeypatch.setenv("AUTODEV_BLOB_DIR", str(tmp_path / "blobs"))
+    store = get_blob_store()
+    digest = store.put("left over from an old run")
+    for root, _, names in os.walk(store.root):
+        for name in names:
+            os.utime(os.path.join(root, name), (0, 0))  # older than the gc grace period
+
+    collect_garbage(MemorySaver())
+    assert not store.contains(digest)
+
+
+def test_initial_state_resets_the_repair_loop():
+    from src.batch import initial_state
+
+    state = initial_state("todo app")
+    assert state["user_story"] == "todo app" and state["iteration_count"] == 0
+    assert state["iteration_history"] == [] and state["stop_reason"] == "" and state["agent_errors"] == {}
+    assert not state["iteration_budget"]
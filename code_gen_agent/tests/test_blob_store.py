@@ -0,0 +1,34 @@
+from src.utils.blob_store import BlobStore, compute_digest, is_digest
+
+
+def test_put_files_deduplicates_and_round_trips(tmp_path):
+    store = BlobStore(str(tmp_path))
+    files = {"a.py": "print(1)\n", "b.py": "print(1)\n", "package.json": {"name": "app"}}
+
+    manifest = store.put_files(files)
+
+    assert all(is_digest(d) for d in manifest.values())
+    assert manifest["a.py"] == manifest["b.py"] == compute_digest("print(1)\n")
+    assert store.materialize(manifest)["a.py"] == "print(1)\n"
+    assert '"name": "app"' in store.materialize(manifest)["package.json"]
+
+
+def test_lazy_files_and_inline_text_fallback(tmp_path):
+    store = BlobStore(str(tmp_path), cache_size=0)
+    manifest = store.put_files({"main.py": "x = 1\n"})
+    manifest["legacy.py"] = "y = 2\n"  # state written before the blob store existed
+
+    files = store.open_files(manifest)
+    assert len(files) == 2
+    assert files["main.py"] == "x = 1\n"
+    assert files["legacy.py"] == "y = 2\n"
+
+
+def test_gc_removes_unreferenced_blobs(tmp_path):
+    store = BlobStore(str(tmp_path))
+    keep = store.put_files({"a": "keep"})
+    store.put("drop")
+
+    assert store.gc([keep]) == 1
+    assert store.contains(keep["a"])
+    assert not store.contains(compute_digest("drop"))
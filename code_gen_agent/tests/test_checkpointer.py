@@ -0,0 +1,77 @@
+import pytest
+
+from src.core.checkpointer import CompressedSerializer, collect_blob_garbage, create_checkpointer
+
+
+def test_compressed_serializer_round_trip():
+    serde = CompressedSerializer(min_size=64)
+    small = {"a": "b"}
+    large = {"files": {"main.py": "print('hello')\n" * 200}}
+
+    assert not serde.dumps_typed(small)[0].startswith("zlib:")
+    type_, data = serde.dumps_typed(large)
+    assert type_.startswith("zlib:")
+    assert serde.loads_typed((type_, data)) == large
+    assert serde.loads_typed(serde.dumps_typed(small)) == small
+
+
+def test_sqlite_checkpointer_prunes_old_checkpoints(tmp_path):
+    pytest.importorskip("langgraph.checkpoint.sqlite")
+    from langgraph.graph import StateGraph, END
+    from typing import TypedDict
+
+    class State(TypedDict):
+        count: int
+
+    def step(state):
+        return {"count": state["count"] + 1}
+
+    workflow = StateGraph(State)
+    workflow.add_node("step", step)
+    workflow.set_entry_point("step")
+    workflow.add_edge("step", END)
+
+    db_path = str(tmp_path / "checkpoints.db")
+    app = workflow.compile(checkpointer=create_checkpointer(db_path, keep_last=2))
+    config = {"configurable": {"thread_id": "t1"}}
+    for _ in range(3):
+        app.invoke({"count": 0}, config)
+
+    assert len(list(app.get_state_history(config))) == 2
+
+    # A fresh saver on the same file sees the persisted thread
+    reopened = workflow.compile(checkpointer=create_checkpointer(db_path, keep_last=2))
+    assert reopened.get_state(config).values["count"] == 1
+
+
+def test_prune_deletes_blobs_of_pruned_checkpoints(tmp_path):
+    pytest.importorskip("langgraph.checkpoint.sqlite")
+    from typing import Annotated, Dict, TypedDict
+    from langgraph.graph import StateGraph, END
+    from src.core.state import merge_files
+    from src.utils.blob_store import BlobStore
+
+    class State(TypedDict):
+        backend_files: Annotated[Dict[str, str], merge_files]
+        text: str
+
+    store = BlobStore(str(tmp_path / "blobs"))
+    workflow = StateGraph(State)
+    workflow.add_node("step", lambda s: {"backend_files": store.put_files({"main.py": s["text"]})})
+    workflow.set_entry_point("step")
+    workflow.add_edge("step", END)
+
+    saver = create_checkpointer(str(tmp_path / "checkpoints.db"), keep_last=0)
+    app = workflow.compile(checkpointer=saver)
+    config = {"configurable": {"thread_id": "t1"}}
+    for version in ("v1", "v2"):
+        app.invoke({"text": version}, config)
+    orphan = store.put("never checkpointed")
+
+    saver.prune(keep_last=1, store=store)
+    # The grace period keeps fresh blobs; the current file always survives
+    assert store.contains(orphan) and store.contains(app.get_state(config).values["backend_files"]["main.py"])
+
+    assert collect_blob_garbage(saver, store=store, min_age=0) == 2
+    assert not store.contains(orphan)
+    assert store.get(app.get_state(config).values["backend_files"]["main.py"]) == "v2"
@@ -0,0 +1,66 @@
+import os
+
+import pytest
+
+from src.utils import code_exporter
+from src.utils.code_exporter import CodeExporter, RunLog
+
+
+def _write_run(exporter):
+    exporter.export_by_agent("backend", {"main.py": "v0", "db.py": "db"}, metadata={"iteration": 0})
+    exporter.export_by_agent("frontend", {"App.js": "app"}, metadata={"iteration": 0})
+    exporter.export_by_agent("backend", {"main.py": "v1", "db.py": "db"}, metadata={"iteration": 1})
+    exporter.export_by_agent("backend", {"util.py": "u"}, metadata={"iteration": 1}, complete=False)
+    return exporter.export_by_agent("backend", {"main.py": "v2"}, metadata={"iteration": 2})
+
+
+@pytest.mark.parametrize("compression", ["gzip", "none"])
+def test_run_log_stores_changes_and_rebuilds_any_iteration(tmp_path, compression):
+    path = _write_run(CodeExporter(str(tmp_path), run_id="thread-1", compression=compression))
+    log = RunLog(path)
+
+    assert [list(e["stored"]) for e in log.entries()] == [["main.py", "db.py"], ["App.js"], ["main.py"], ["util.py"], ["main.py"]]
+    assert log.reconstruct(0) == {"backend": {"main.py": "v0", "db.py": "db"}, "frontend": {"App.js": "app"}}
+    assert log.reconstruct(1)["backend"] == {"main.py": "v1", "db.py": "db", "util.py": "u"}
+    assert log.reconstruct()["backend"] == {"main.py": "v2"}
+
+    data = CodeExporter(str(tmp_path)).load_from_json(path, iteration=1)
+    assert data["frontend"]["files"] == {"App.js": "app"} and data["backend"]["count"] == 3
+
+
+def test_index_is_rebuilt_and_torn_record_dropped(tmp_path):
+    path = _write_run(CodeExporter(str(tmp_path), run_id="t", compression="gzip"))
+    os.remove(RunLog.index_path_for(path))
+    with open(path, "ab") as f:
+        f.write(b"\x1f\x8b\x08partial")
+
+    log = RunLog(path)
+    assert len(log.entries()) == 5
+    assert log.reconstruct(1)["backend"]["main.py"] == "v1"
+
+
+def test_compaction_keeps_recent_iterations(tmp_path):
+    path = _write_run(CodeExporter(str(tmp_path), run_id="t", compression="none"))
+    log = RunLog(path)
+    stats = log.compact(keep_last=1, compression="gzip")
+
+    # Iterations 0 and 1 fold into one base snapshot per agent; iteration 2 stays
+    assert stats["records_before"] == 5 and stats["records_after"] == 3
+    reopened = RunLog(log.path)
+    assert log.path.endswith(".jsonl.gz") and not os.path.exists(path)
+    assert reopened.reconstruct(1)["backend"] == {"main.py": "v1", "db.py": "db", "util.py": "u"}
+    assert reopened.reconstruct(2) == {"backend": {"main.py": "v2"}, "frontend": {"App.js": "app"}}
+
+
+def test_cached_run_logs_are_bounded_and_released(tmp_path, monkeypatch):
+    monkeypatch.setattr(code_exporter, "MAX_OPEN_RUN_LOGS", 2)
+    monkeypatch.setattr(code_exporter, "_run_logs", code_exporter.OrderedDict())
+    first = code_exporter.get_run_log(str(tmp_path), "first")
+    assert code_exporter.get_run_log(str(tmp_path), "first") is first
+    code_exporter.get_run_log(str(tmp_path), "second")
+    code_exporter.get_run_log(str(tmp_path), "third")
+    assert len(code_exporter._run_logs) == 2 and first.path not in code_exporter._run_logs
+
+    assert code_exporter.release_run_log("third", output_dir=str(tmp_path))
+    assert not code_exporter.release_run_log("third", output_dir=str(tmp_path))
+    assert len(code_exporter._run_logs) == 1
@@ -0,0 +1,112 @@
+import json
+
+from src.agents.sandbox import sandbox_status
+from src.utils.contract_checker import backend_routes, check_contract, frontend_calls, spec_index
+from src.utils.error_classifier import classify_sandbox
+
+SPEC = {
+    "servers": [{"url": "http://localhost:8000/api"}],
+    "paths": {
+        "/todos": {"get": {}, "post": {}},
+        "/todos/{todo_id}": {"put": {}, "delete": {}},
+    },
+}
+
+FASTAPI_MAIN = '''
+from fastapi import FastAPI
+from routers import todos
+
+app = FastAPI()
+app.include_router(todos.router, prefix="/api")
+
+@app.get("/health")
+def health():
+    return {"ok": True}
+'''
+
+FASTAPI_ROUTER = '''
+from fastapi import APIRouter
+
+router = APIRouter(prefix="/todos")
+
+@router.get("")
+def list_todos():
+    return []
+
+@router.post("/")
+def create(todo: dict):
+    return todo
+
+@router.put("/{todo_id}")
+def update(todo_id: int, todo: dict):
+    return todo
+'''
+
+FRONTEND = '''
+import axios from "axios";
+const api = axios.create({ baseURL: "http://localhost:8000/api" });
+// fetch("/api/commented-out")
+export const list = () => api.get("/todos");
+export const add = (t) => fetch(`${API_URL}/api/todos`, { method: "POST", body: JSON.stringify(t) });
+export const update = (id, t) => api.patch(`/todos/${id}`, t);
+export const remove = (id) => axios.delete(API_URL + "/api/todo/" + id);
+export const weather = () => fetch("https://api.weather.example.com/today");
+'''
+
+
+def test_spec_and_fastapi_routes_apply_prefixes():
+    assert set(spec_index(json.dumps(SPEC))) == {
+        ("GET", "/api/todos"), ("POST", "/api/todos"), ("PUT", "/api/todos/{}"), ("DELETE", "/api/todos/{}"),
+    }
+    routes = backend_routes({"main.py": FASTAPI_MAIN, "routers/todos.py": FASTAPI_ROUTER})
+    assert {(r["method"], r["path"]) for r in routes} == {
+        ("GET", "/health"), ("GET", "/api/todos"), ("POST", "/api/todos"), ("PUT", "/api/todos/{}"),
+    }
+    assert next(r for r in routes if r["method"] == "PUT")["line"] == 14
+
+
+def test_express_routes_use_the_mount_prefix():
+    files = {
+        "server.js": "const express = require('express');\nconst todos = require('./routes/todos');\n"
+                     "const app = express();\napp.use('/api/todos', todos);\n",
+        "routes/todos.js": "const router = require('express').Router();\n"
+                           "router.get('/', list);\n// router.delete('/:id', remove);\nrouter.put('/:id', update);\n",
+    }
+    assert sorted((r["method"], r["path"], r["line"]) for r in backend_routes(files)) == [
+        ("GET", "/api/todos", 2), ("PUT", "/api/todos/{}", 4),
+    ]
+
+
+def test_frontend_calls_become_path_templates():
+    calls = frontend_calls({"src/api.js": FRONTEND, "src/App.css": "body {}"})
+    assert [(c["method"], c["path"], c["line"]) for c in calls] == [
+        ("POST", "/api/todos", 6), ("GET", "/api/todos", 5), ("PATCH", "/api/todos/{}", 7), ("DELETE", "/api/todo/{}", 8),
+    ]
+
+
+def test_mismatches_become_structured_errors_and_fail_the_sandbox():
+    report = check_contract(
+        SPEC, {"src/api.js": FRONTEND}, {"main.py": FASTAPI_MAIN, "routers/todos.py": FASTAPI_ROUTER},
+    )
+    assert all(e["source"] == "contract" for e in report["errors"])
+    by_agent = {}
+    for error in report["errors"]:
+        by_agent.setdefault(error["agent"], []).append(error)
+    assert [e["file"] for e in by_agent["backend"]] == ["routers/todos.py"]
+    assert "DELETE /todos/{todo_id}" in by_agent["backend"][0]["instruction"]
+    assert [e["line"] for e in by_agent["frontend"]] == [7, 8]
+    assert "The spec defines DELETE, PUT" in by_agent["frontend"][0]["instruction"]
+    assert "Did you mean DELETE /api/todos/{}" in by_agent["frontend"][1]["instruction"]
+    assert any("/health" in w for w in report["warnings"])
+    assert report["ms"] < 100
+
+    assert sandbox_status({"contract": {**report, "mode": "on"}}) == "FAILED"
+    assert sandbox_status({"contract": {**report, "mode": "warn"}}) == "SUCCESS"
+    assert classify_sandbox({"contract": {**report, "mode": "on"}}) == report["errors"]
+    assert classify_sandbox({"contract": {**report, "mode": "warn"}}) == []
+
+
+def test_unknown_backend_framework_reports_no_backend_errors():
+    report = check_contract(SPEC, {}, {"main.go": "package main"})
+    assert report["errors"] == [] and report["backend_routes"] == 0
+    assert check_contract("not json", {"src/api.js": FRONTEND}, {})["errors"] == []
@@ -0,0 +1,74 @@
+from src.agents import reflector
+from src.agents.router import route_after_reflection
+from src.utils.convergence import assess, error_fingerprint, files_fingerprint
+
+ERROR = {"agent": "backend", "file": "main.py", "instruction": "Fix NameError at line 4"}
+
+
+def _entry(errors: int, error_fp: str, files_fp: str) -> dict:
+    return {"errors": errors, "error_fp": error_fp, "files_fp": files_fp}
+
+
+def test_fingerprints_ignore_order_and_line_numbers():
+    other = {"agent": "frontend", "file": "App.js", "instruction": "Fix the import"}
+    assert error_fingerprint([ERROR, other]) == error_fingerprint([other, {**ERROR, "instruction": "Fix NameError at line 9"}])
+    assert error_fingerprint([ERROR]) != error_fingerprint([other])
+    assert files_fingerprint({"main.py": "sha256:a"}, {}) != files_fingerprint({"main.py": "sha256:b"}, {})
+    # The same path in another section is another file
+    assert files_fingerprint({"x": "sha256:a"}, {}) != files_fingerprint({}, {"x": "sha256:a"})
+
+
+def test_repeated_errors_and_oscillating_code_stop_early():
+    assert assess([_entry(2, "e1", "f1"), _entry(2, "e1", "f2")], 2, 3) == ("no_progress", 3)
+    flipping = [_entry(3, "e1", "A"), _entry(2, "e2", "B"), _entry(3, "e3", "A")]
+    assert assess(flipping, 3, 5) == ("oscillating", 5)
+    assert assess([_entry(0, "e0", "A")], 1, 3) == ("passed", 3)
+    assert assess([_entry(0, "e0", "A")], 1, 3, sandbox_status="ERROR") == ("sandbox_error", 3)
+    assert assess([_entry(3, "e1", "A"), _entry(2, "e2", "B")], 2, 3) == ("", 3)
+
+
+def test_budget_grows_only_while_errors_fall(monkeypatch):
+    monkeypatch.setenv("AUTODEV_MAX_ITERATIONS", "3")
+    falling = [_entry(n, f"e{n}", f"f{n}") for n in (8, 5, 3, 2)]
+    assert assess(falling, 4, 3) == ("", 4)
+    assert assess(falling, 7, 6) == ("max_iterations", 6)  # cap: 2x the base
+    stuck = [_entry(n, f"e{i}", f"f{i}") for i, n in enumerate((5, 3, 4, 2))]
+    assert assess(stuck, 4, 3) == ("max_iterations", 3)
+
+    monkeypatch.setenv("AUTODEV_CONVERGENCE", "off")
+    assert assess([_entry(2, "e1", "f1"), _entry(2, "e1", "f1")], 2, 3) == ("", 3)
+    assert assess(falling, 4, 3) == ("max_iterations", 3)
+
+
+def test_reflector_records_history_and_router_stops_on_repeats(monkeypatch):
+    monkeypatch.setattr(reflector, "invoke_llm_json", lambda *a, **k: [])
+    state = {
+        "human_feedback": "SyntaxError: invalid syntax (main.py, line 4)",
+        "iteration_count": 0,
+        "backend_files": {"main.py": "sha256:m1"},
+        "sandbox_logs": {"file_checks": {}},
+    }
+    first = reflector.reflector_node(state)
+    assert first["stop_reason"] == "" and len(first["iteration_history"]) == 1
+    assert route_after_reflection({**state, **first}) != ["end_node"]
+
+    state.update(first, backend_files={"main.py": "sha256:m2"}, human_feedback="SyntaxError: invalid syntax (main.py, line 6)")
+    second = reflector.reflector_node(state)
+    assert second["stop_reason"] == "no_progress" and second["iteration_count"] == 2
+    assert [h["iteration"] for h in second["iteration_history"]] == [1, 2]
+    assert route_after_reflection({**state, **second}) == ["end_node"]
+
+
+def test_sandbox_crash_is_not_reported_as_passed(monkeypatch):
+    monkeypatch.setattr(reflector, "invoke_llm_json", lambda *a, **k: [])
+    state = {
+        "human_feedback": "",
+        "iteration_count": 0,
+        "backend_files": {"main.py": "sha256:m1"},
+        "sandbox_logs": {"status": "ERROR", "error": "PermissionError: sandbox_env"},
+    }
+    result = reflector.reflector_node(state)
+    assert result["structured_errors"] == [] and result["stop_reason"] == "sandbox_error"
+
+    state["sandbox_logs"] = {"status": "SUCCESS", "file_checks": {}}
+    assert reflector.reflector_node(state)["stop_reason"] == "passed"
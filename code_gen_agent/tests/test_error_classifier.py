@@ -0,0 +1,71 @@
+import json
+
+from src.agents import reflector
+from src.utils.error_classifier import classify_log, classify_sandbox
+
+
+def test_sandbox_checker_errors_map_to_agent_file_and_line():
+    summary = {
+        "file_checks": {
+            "backend/backend/main.py": [
+                {"file": "backend/main.py", "line": 7, "checker": "python", "severity": "error", "message": "invalid syntax"},
+                {"file": "backend/main.py", "line": 2, "checker": "python", "severity": "warning", "message": "unused import"},
+            ],
+            "infra/docker-compose.yml": [
+                {"file": "docker-compose.yml", "line": 3, "checker": "yaml", "severity": "error", "message": "bad indent"},
+            ],
+        },
+    }
+    errors = classify_sandbox(summary, frontend_paths=["frontend/src/App.jsx"])
+    by_agent = {e["agent"]: e for e in errors}
+    assert by_agent["backend"]["file"] == "backend/main.py"
+    assert by_agent["backend"]["line"] == 7
+    assert by_agent["infra"]["file"] == "docker-compose.yml"
+    assert by_agent["frontend"]["file"] == "frontend/package.json"
+    assert len(errors) == 3
+
+
+def test_traceback_is_fully_explained():
+    log = (
+        "Traceback (most recent call last):\n"
+        '  File "backend/main.py", line 12, in <module>\n'
+        "    app = FastAPI(\n"
+        "NameError: name 'FastAPI' is not defined\n"
+    )
+    errors, explained = classify_log(log)
+    assert explained
+    assert errors == [{
+        "agent": "backend",
+        "instruction": "Fix NameError in backend/main.py at line 12: name 'FastAPI' is not defined",
+        "source": "rules",
+        "file": "backend/main.py",
+        "line": 12,
+    }]
+
+
+def test_free_form_feedback_is_left_to_the_llm():
+    errors, explained = classify_log("Please make the header dark blue and add a logout button")
+    assert errors == [] and not explained
+
+    errors, explained = classify_log(
+        "npm ERR! enoent ENOENT: no such file or directory, open '/app/frontend/package.json'\n"
+        "Also the buttons should be rounded please"
+    )
+    assert errors[0]["agent"] == "frontend"
+    assert not explained
+
+
+def test_reflector_skips_llm_for_mechanical_errors(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("LLM should not be called")
+
+    monkeypatch.setattr(reflector, "invoke_llm_json", fail)
+    state = {
+        "human_feedback": "SyntaxError: invalid syntax (main.py, line 4)",
+        "iteration_count": 0,
+        "sandbox_logs": json.dumps({"file_checks": {}}),
+    }
+    result = reflector.reflector_node(state)
+    assert result["iteration_count"] == 1
+    assert result["structured_errors"][0]["file"] == "main.py"
+    assert result["structured_errors"][0]["line"] == 4
@@ -0,0 +1,98 @@
+import asyncio
+
+from langgraph.types import Send
+
+from src.agents.router import route_after_reflection
+from src.core.state import merge_files
+from src.utils.blob_store import get_blob_store
+
+
+def test_merge_files_updates_and_deletes_paths():
+    merged = merge_files({"a.py": "sha256:a", "b.py": "sha256:b"}, {"b.py": "sha256:b2", "a.py": None, "c.py": "sha256:c"})
+    assert merged == {"b.py": "sha256:b2", "c.py": "sha256:c"}
+
+
+def test_router_sends_one_task_per_named_file(monkeypatch):
+    monkeypatch.setenv("AUTODEV_REPAIR_MODE", "patch")
+    state = {
+        "iteration_count": 1,
+        "backend_files": {"backend/main.py": "sha256:m", "backend/schemas.py": "sha256:s"},
+        "frontend_files": {"frontend/src/App.js": "sha256:a"},
+        "structured_errors": [
+            {"agent": "backend", "instruction": "Fix SyntaxError", "file": "backend/schemas.py", "line": 3},
+            {"agent": "frontend", "instruction": "Make the header blue"},
+        ],
+    }
+    routes = route_after_reflection(state)
+    sends = [r for r in routes if isinstance(r, Send)]
+    assert "frontend" in routes and "backend" not in routes
+    assert [(s.node, s.arg["path"]) for s in sends] == [("fix_file", "backend/schemas.py")]
+
+
+def test_broken_file_is_repaired_alone(tmp_path, monkeypatch, stub_graph):
+    monkeypatch.setenv("AUTODEV_REPAIR_MODE", "patch")
+    graph, stub = stub_graph(
+        responses={"Backend Developer": {
+            "backend/main.py": "from fastapi import FastAPI\napp = FastAPI()\n",
+            "backend/schemas.py": "ITEMS = (\n",
+        }},
+        rules=[{"match": "Backend Developer", "user_match": "was never closed",
+                "response": {"backend/schemas.py": {"replace": "ITEMS = []\n"}}}],
+        auto=True,
+    )
+    config = {"configurable": {"thread_id": "t", "sandbox_dir": str(tmp_path / "box")}}
+    state = asyncio.run(graph.ainvoke({"user_story": "todo", "iteration_count": 0, "structured_errors": [], "human_feedback": ""}, config=config))
+
+    files = get_blob_store().materialize(state["backend_files"])
+    assert files == {"backend/main.py": "from fastapi import FastAPI\napp = FastAPI()\n", "backend/schemas.py": "ITEMS = []\n"}
+    assert state["sandbox_logs"]["status"] == "SUCCESS"
+    # architect + 3 builders + one single-file repair
+    assert stub.calls == 5
+
+
+def test_failed_file_repair_leaves_the_file_alone(tmp_path, monkeypatch):
+    from src.agents.file_fixer import _finish
+
+    monkeypatch.setenv("AUTODEV_BLOB_DIR", str(tmp_path / "blobs"))
+    task = {"agent": "backend", "path": "schemas.py", "files": {"schemas.py": "sha256:s", "main.py": "sha256:m"}}
+    # Failed call (empty reply) and a reply for some other path
+    for reply in ({}, {"models.py": "ITEMS = []\n"}, {"main.py": "x = 1\n"}):
+        result = _finish(task, reply)
+        assert "backend_files" not in result
+        assert merge_files(task["files"], result.get("backend_files")) == task["files"]
+
+
+def test_file_repair_can_delete_its_file(tmp_path, monkeypatch):
+    from src.agents import repair
+    from src.agents.file_fixer import _build_plan, _finish
+
+    monkeypatch.setenv("AUTODEV_BLOB_DIR", str(tmp_path / "blobs"))
+    manifest = get_blob_store().put_files({"schemas.py": "ITEMS = (\n", "main.py": "x = 1\n"})
+    task = {"agent": "backend", "path": "schemas.py", "files": manifest, "errors": [{"agent": "backend", "instruction": "Remove it"}]}
+    for reply in ({"schemas.py": {"delete": True}}, {"schemas.py": None}):
+        result = _finish(task, reply)
+        assert merge_files(manifest, result["backend_files"]) == {"main.py": manifest["main.py"]}
+
+    # A patch reply deleting the file reaches _finish as {path: None}
+    monkeypatch.setattr(repair, "invoke_llm_json", lambda *a, **k: {"schemas.py": {"delete": True}})
+    assert repair.execute_plan("", _build_plan(task)) == {"schemas.py": None}
+
+
+def test_failed_agent_call_keeps_the_previous_files(tmp_path, monkeypatch):
+    from src.agents import backend, reflector, repair
+
+    monkeypatch.setenv("AUTODEV_BLOB_DIR", str(tmp_path / "blobs"))
+    monkeypatch.setenv("AUTODEV_REPAIR_MODE", "full")
+    monkeypatch.setenv("AUTODEV_REPAIR_MAX_TOKENS_BACKEND", "300")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(repair, "invoke_llm_json", lambda *a, **k: {})
+    manifest = get_blob_store().put_files({"main.py": "x = (\n", "other.py": "y = 1\n" * 500})
+    state = {"backend_files": manifest, "structured_errors": [{"agent": "backend", "instruction": "Fix main.py", "file": "main.py"}]}
+
+    result = backend.backend_node(state)
+    assert "backend_files" not in result and "backend" in result["agent_errors"]
+    assert merge_files(manifest, result.get("backend_files")) == manifest
+
+    monkeypatch.setattr(reflector, "invoke_llm_json", lambda *a, **k: [])
+    errors = reflector.reflector_node({**state, **result, "iteration_count": 0})["structured_errors"]
+    assert errors[0]["agent"] == "backend" and "could not be used" in errors[0]["instruction"]
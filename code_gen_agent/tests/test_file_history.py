@@ -0,0 +1,46 @@
+from typing import Annotated, Dict, TypedDict
+
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, START, StateGraph
+
+from src.core.state import merge_files
+from src.utils.file_history import checkpoints_with_files, diff_manifests, group_by_directory, language_for, unified_diff
+
+
+class FilesState(TypedDict, total=False):
+    backend_files: Annotated[Dict[str, str], merge_files]
+    iteration_count: int
+
+
+def test_files_group_by_directory_with_languages():
+    groups = group_by_directory(["src/App.jsx", "package.json", "src/components/List.tsx", "src/index.css"])
+    assert groups == {"": ["package.json"], "src": ["src/App.jsx", "src/index.css"], "src/components": ["src/components/List.tsx"]}
+    assert [language_for(p) for p in ("main.py", "Dockerfile", "docker-compose.yml", "LICENSE")] == ["python", "docker", "yaml", "text"]
+
+
+def test_manifest_diff_compares_digests_only():
+    old = {"a.py": "sha256:1", "b.py": "sha256:2", "c.py": "sha256:3"}
+    new = {"a.py": "sha256:1", "b.py": "sha256:9", "d.py": "sha256:4"}
+    assert diff_manifests(old, new) == {"added": ["d.py"], "removed": ["c.py"], "changed": ["b.py"]}
+    patch = unified_diff("x = 1\ny = 2\n", "x = 1\ny = 3\n", "b.py")
+    assert patch.startswith("--- a/b.py\n+++ b/b.py") and "-y = 2\n+y = 3\n" in patch
+
+
+def test_history_keeps_checkpoints_where_files_changed():
+    builder = StateGraph(FilesState)
+    builder.add_node("generate", lambda s: {"backend_files": {"main.py": "sha256:v1", "db.py": "sha256:d"}})
+    builder.add_node("review", lambda s: {"iteration_count": 1})
+    builder.add_node("repair", lambda s: {"backend_files": {"main.py": "sha256:v2"}, "iteration_count": 2})
+    builder.add_edge(START, "generate")
+    builder.add_edge("generate", "review")
+    builder.add_edge("review", "repair")
+    builder.add_edge("repair", END)
+    graph = builder.compile(checkpointer=MemorySaver())
+    config = {"configurable": {"thread_id": "t"}}
+    graph.invoke({"iteration_count": 0}, config)
+
+    checkpoints = checkpoints_with_files(graph.get_state_history(config))
+    assert [c["iteration"] for c in checkpoints] == [0, 2]
+    assert checkpoints[1]["label"] == f"step {checkpoints[1]['step']} · iteration 2 · 2 files"
+    assert all(c["checkpoint_id"] for c in checkpoints)
+    assert diff_manifests(checkpoints[0]["files"]["backend"], checkpoints[1]["files"]["backend"])["changed"] == ["main.py"]
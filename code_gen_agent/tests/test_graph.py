@@ -1,11 +1,29 @@
-import os
-import pytest
+from src.utils import llm_helper
+from src.utils.llm_cache import LLMResponseCache
+from src.utils.llm_providers import create_llm
 
-#if os.getenv("GOOGLE_API_KEY") is None:
-# 	 Skip LLM tests when no key is available (e.g., in CI).
-# 	pytest.skip("Skipping LLM integration tests - GOOGLE_API_KEY not set", allow_module_level=True)
 
-from code_gen_agent.src.utils.llm_helper import invoke_llm_json
+def _use_stub(monkeypatch, rules):
+    name, stub = create_llm("stub", rules=rules)
+    monkeypatch.setattr(llm_helper, "MODEL_NAME", name, raising=False)
+    monkeypatch.setattr(llm_helper, "llm", stub)
+    return stub
 
-result = invoke_llm_json("", "how are you?")
-print(result)
\ No newline at end of file
+
+def test_invoke_llm_json_runs_offline(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_helper, "llm_cache", LLMResponseCache(cache_dir=str(tmp_path / "cache")))
+    _use_stub(monkeypatch, [{"match": "", "user_match": "how are you?", "response": {"status": "fine"}}])
+    assert llm_helper.invoke_llm_json("", "how are you?") == {"status": "fine"}
+
+    # Another recording answers the same prompt itself, not from the cache
+    stub = _use_stub(monkeypatch, [{"match": "", "response": {"status": "tired"}}])
+    assert llm_helper.invoke_llm_json("", "how are you?") == {"status": "tired"}
+    assert stub.calls == 1
+
+
+def test_graph_runs_to_the_end_on_the_stub(stub_graph):
+    graph, _ = stub_graph(auto=True)
+    state = graph.invoke({"user_story": "todo app", "iteration_count": 0, "messages": []},
+                         {"configurable": {"thread_id": "t"}})
+    assert state["sandbox_logs"]["status"] == "SUCCESS"
+    assert set(state["backend_files"]) == {"backend/main.py"}
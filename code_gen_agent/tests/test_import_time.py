@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import time budgets (ms, from -X importtime). Generous for slow
+# machines; the heavy stacks they guard against cost 500+ ms on their own.
+BUDGET_MS = {
+    "src.agents.sandbox": 250,
+    "src.utils.python_sandbox": 250,
+    "src.utils.llm_helper": 250,
+}
+HEAVY = ("langgraph", "langchain_core", "langchain_google_genai", "streamlit", "dotenv")
+
+
+def _profile(module: str):
+    """(cumulative import ms of `module`, heavy packages it loaded) in a fresh interpreter."""
+    code = f"import sys, {module}; print(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, timeout=60,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    cumulative_us = next(
+        int(line.split("|")[1])
+        for line in proc.stderr.splitlines()
+        if line.startswith("import time:") and line.split("|")[-1].strip() == module
+    )
+    loaded = [m for m in proc.stdout.strip().split(",") if m]
+    return cumulative_us / 1000, loaded
+
+
+@pytest.mark.parametrize("module", sorted(BUDGET_MS))
+def test_cold_import_stays_within_budget(module):
+    ms, loaded = _profile(module)
+    assert loaded == [], f"{module} imports {loaded} eagerly"
+    assert ms < BUDGET_MS[module], f"{module} took {ms:.0f} ms to import (budget {BUDGET_MS[module]} ms)"
+
+
+def test_llm_client_is_built_on_first_access():
+    code = (
+        "import src.utils.llm_helper as h\n"
+        "assert 'llm' not in vars(h) and 'llm_cache' not in vars(h)\n"
+        "assert type(h.llm).__name__ == 'StubChatModel' and h.MODEL_NAME.startswith('stub:')\n"
+        "h.llm = None\n"
+        "assert h._get('llm') is None\n"
+    )
+    env = {**os.environ, "AUTODEV_LLM_PROVIDER": "stub", "AUTODEV_LLM_CACHE": "off"}
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, timeout=60, env=env)
+    assert proc.returncode == 0, proc.stderr[-2000:]
@@ -0,0 +1,38 @@
+import json
+
+from src.utils.json_stream import IncrementalJSONParser
+
+
+def _feed_in_pieces(text, size):
+    parser = IncrementalJSONParser()
+    members = []
+    for i in range(0, len(text), size):
+        members.extend(parser.feed(text[i:i + size]))
+    return parser, members
+
+
+def test_object_members_complete_in_order():
+    files = {
+        "src/App.jsx": "export default () => <div>{\"a,b\"}</div>;\n",
+        "package.json": {"name": "app", "deps": [1, 2]},
+        "weird\"}.txt": "braces } ] and , commas",
+    }
+    text = "```json\n" + json.dumps(files) + "\n```"
+    for size in (1, 7, len(text)):
+        parser, members = _feed_in_pieces(text, size)
+        assert dict(members) == files
+        assert [k for k, _ in members] == list(files)
+        assert parser.done
+
+
+def test_list_members_are_indexed():
+    errors = [{"agent": "backend", "instruction": "fix [x]"}, {"agent": "infra"}]
+    _, members = _feed_in_pieces(json.dumps(errors), 5)
+    assert members == [(0, errors[0]), (1, errors[1])]
+
+
+def test_member_reported_when_its_comma_arrives():
+    parser = IncrementalJSONParser()
+    assert parser.feed('{"a": "1"') == []
+    assert parser.feed(', "b"') == [("a", "1")]
+    assert parser.feed(': 2}') == [("b", 2)]
@@ -0,0 +1,79 @@
+import json
+import os
+import time
+
+from src.utils.llm_cache import LLMResponseCache
+
+
+def test_hit_and_miss_counters(tmp_path):
+    cache = LLMResponseCache(cache_dir=str(tmp_path))
+    key = cache.make_key("gemini-2.5-flash", 0, "sys", "usr")
+
+    assert cache.get(key) is None
+    cache.put(key, '{"ok": true}')
+    assert cache.get(key) == '{"ok": true}'
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_key_depends_on_every_input():
+    base = LLMResponseCache.make_key("m", 0, "sys", "usr")
+    assert base != LLMResponseCache.make_key("m2", 0, "sys", "usr")
+    assert base != LLMResponseCache.make_key("m", 0.5, "sys", "usr")
+    assert base != LLMResponseCache.make_key("m", 0, "sys2", "usr")
+    assert base != LLMResponseCache.make_key("m", 0, "sys", "usr2")
+
+
+def test_entry_limit_evicts_least_recently_used(tmp_path):
+    cache = LLMResponseCache(cache_dir=str(tmp_path), max_entries=2)
+    keys = [cache.make_key("m", 0, "sys", str(i)) for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.put(key, str(i))
+        # Ensure distinct mtimes on coarse filesystems
+        os.utime(cache._path(key), (time.time() + i, time.time() + i))
+
+    cache.evict()
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[2]) == "2"
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = LLMResponseCache(cache_dir=str(tmp_path), max_age_seconds=60)
+    old, used = cache.make_key("m", 0, "sys", "old"), cache.make_key("m", 0, "sys", "used")
+    cache.put(old, "old")
+    cache.put(used, "used")
+    # Age counts from the last use, in lookups and eviction alike
+    for key in (old, used):
+        with open(cache._path(key), "r", encoding="utf-8") as f:
+            entry = json.load(f)
+        entry["created"] = time.time() - 120
+        with open(cache._path(key), "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+    os.utime(cache._path(old), (time.time() - 120, time.time() - 120))
+
+    assert cache.get(old) is None
+    assert cache.get(used) == "used"
+    os.utime(cache._path(used), (time.time() - 120, time.time() - 120))
+    assert cache.evict() == 1 and not os.path.exists(cache._path(used))
+
+
+def test_puts_scan_the_directory_only_when_a_limit_is_crossed(tmp_path, monkeypatch):
+    cache = LLMResponseCache(cache_dir=str(tmp_path), max_entries=10)
+    scans = []
+    real_evict = cache.evict
+    monkeypatch.setattr(cache, "evict", lambda: scans.append(1) or real_evict())
+    for i in range(12):
+        cache.put(cache.make_key("m", 0, "sys", str(i)), str(i))
+
+    # One scan to learn the totals, one when the 11th entry crossed the limit
+    assert len(scans) == 2
+    assert len([n for _, _, names in os.walk(tmp_path) for n in names]) == 10
+
+
+def test_readonly_mode_never_writes(tmp_path):
+    cache = LLMResponseCache(cache_dir=str(tmp_path), readonly=True)
+    key = cache.make_key("m", 0, "sys", "usr")
+    cache.put(key, "value")
+    assert cache.get(key) is None
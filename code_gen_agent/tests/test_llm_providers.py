@@ -0,0 +1,49 @@
+import asyncio
+import json
+
+import pytest
+
+from langchain_core.prompts import ChatPromptTemplate
+
+from src.utils.llm_providers import StubChatModel, create_llm
+
+
+def _prompt(system_prompt, user_prompt):
+    template = ChatPromptTemplate.from_messages([("system", "{sys}"), ("user", "{usr}")])
+    return template.invoke({"sys": system_prompt, "usr": user_prompt})
+
+
+def test_stub_replays_first_matching_rule():
+    stub = StubChatModel(rules=[
+        {"match": "Architect", "user_match": "todo", "response": {"api_spec": "todo"}},
+        {"match": "Architect", "response": {"api_spec": "other"}},
+    ])
+
+    assert json.loads(stub.invoke(_prompt("You are an Architect", "a todo app")).content) == {"api_spec": "todo"}
+    assert json.loads(stub.invoke(_prompt("You are an Architect", "a blog")).content) == {"api_spec": "other"}
+    assert json.loads(stub.invoke(_prompt("Unknown", "x")).content) == {}
+    assert stub.calls == 3
+
+
+def test_stub_async_and_chain():
+    stub = StubChatModel(rules=[{"match": "", "response": "[]"}], latency=0.01)
+    chain = ChatPromptTemplate.from_messages([("system", "{sys}"), ("user", "{usr}")]) | stub
+    result = asyncio.run(chain.ainvoke({"sys": "s", "usr": "u"}))
+    assert result.content == "[]"
+
+
+def test_stub_from_fixture_file(tmp_path):
+    (tmp_path / "files.json").write_text(json.dumps({"main.py": "print(1)"}))
+    (tmp_path / "rules.json").write_text(json.dumps([{"match": "Backend", "response_file": "files.json"}]))
+
+    name, stub = create_llm("stub", fixture=str(tmp_path / "rules.json"))
+    assert name.startswith("stub:") and name == stub.model_name
+    # Different recordings never share response-cache keys
+    assert name != StubChatModel(rules=[{"match": "Backend", "response": {"main.py": "print(2)"}}]).model_name
+    assert json.loads(stub.invoke(_prompt("Backend dev", "go")).content) == {"main.py": "print(1)"}
+
+
+def test_gemini_client_leaves_retries_to_the_rate_limiter():
+    pytest.importorskip("langchain_google_genai")
+    _, llm = create_llm("gemini", google_api_key="test-key")
+    assert llm.max_retries == 0
@@ -0,0 +1,80 @@
+import pytest
+
+from src.utils.patching import PatchError, apply_file_patches, apply_unified_diff, select_target_files
+
+ORIGINAL = "import os\n\ndef main():\n    print('hi')\n    return 1\n"
+
+
+def test_apply_unified_diff_with_line_drift():
+    diff = (
+        "--- a/main.py\n+++ b/main.py\n"
+        "@@ -10,2 +10,2 @@\n"  # wrong line numbers, context still matches
+        " def main():\n"
+        "-    print('hi')\n"
+        "+    print('hello')\n"
+    )
+    assert apply_unified_diff(ORIGINAL, diff) == ORIGINAL.replace("'hi'", "'hello'")
+
+
+def test_dashes_and_pluses_inside_a_hunk_are_content():
+    original = "CREATE TABLE t (id INT);\n-- old comment\n"
+    diff = (
+        "--- a/schema.sql\n+++ b/schema.sql\n"
+        "@@ -1,2 +1,2 @@\n"
+        " CREATE TABLE t (id INT);\n"
+        "--- old comment\n"
+        "+++ new comment\n"
+        "--- a/other.sql\n+++ b/other.sql\n"  # next file's headers once the hunk is complete
+    )
+    assert apply_unified_diff(original, diff) == "CREATE TABLE t (id INT);\n++ new comment\n"
+
+
+def test_apply_unified_diff_rejects_mismatched_context():
+    diff = "@@ -1,1 +1,1 @@\n-import sys\n+import json\n"
+    with pytest.raises(PatchError):
+        apply_unified_diff(ORIGINAL, diff)
+
+
+def test_apply_file_patches_mixed_operations():
+    files = {"main.py": ORIGINAL, "old.py": "x = 1\n", "util.py": "y = 1\n"}
+    patches = {
+        "main.py": {"diff": "@@ -5,1 +5,1 @@\n-    return 1\n+    return 0\n"},
+        "old.py": {"delete": True},
+        "util.py": {"replace": "y = 2\n"},
+        "new.py": "z = 3\n",
+    }
+
+    updated = apply_file_patches(files, patches)
+
+    assert updated["main.py"].endswith("return 0\n")
+    assert "old.py" not in updated
+    assert updated["util.py"] == "y = 2\n"
+    assert updated["new.py"] == "z = 3\n"
+    assert files["util.py"] == "y = 1\n"  # input is not mutated
+
+
+def test_apply_file_patches_rejects_diff_for_unknown_file():
+    with pytest.raises(PatchError):
+        apply_file_patches({}, {"missing.py": {"diff": "@@ -1,1 +1,1 @@\n-a\n+b\n"}})
+
+
+def test_apply_file_patches_allows_empty_files():
+    files = {"app/__init__.py": "", "app/old.py": "x = 1\n"}
+    updated = apply_file_patches(files, {
+        "app/__init__.py": {"replace": ""},
+        "app/models/__init__.py": "",
+        "app/old.py": {"diff": "@@ -1 +0,0 @@\n-x = 1\n"},
+    })
+    assert updated == {"app/__init__.py": "", "app/models/__init__.py": "", "app/old.py": ""}
+    with pytest.raises(PatchError, match="empty content"):
+        apply_file_patches(files, {"app/old.py": ""})
+
+
+def test_select_target_files_uses_fields_and_instruction_text():
+    files = ["backend/main.py", "backend/schemas.js", "backend/app.js"]
+    errors = [
+        {"agent": "backend", "file": "schemas.js", "instruction": "Fix the export"},
+        {"agent": "backend", "instruction": "SyntaxError in backend/main.py line 3"},
+    ]
+    assert select_target_files(files, errors) == ["backend/main.py", "backend/schemas.js"]
+    assert select_target_files(files, [{"agent": "backend", "instruction": "Use dark mode"}]) == []
@@ -0,0 +1,67 @@
+from src.utils import llm_helper
+from src.utils.llm_providers import StubChatModel
+from src.utils.prefix_cache import GeminiPrefixCache, PrefixCache, SimulatedPrefixCache, shared_context
+from src.utils.usage import track_usage
+
+
+def _use_stub(monkeypatch, prefix_cache):
+    stub = StubChatModel(rules=[{"match": "Backend", "response": {"main.py": "x = 1"}}])
+    monkeypatch.setattr(llm_helper, "llm", stub)
+    monkeypatch.setattr(llm_helper, "llm_cache", None)
+    monkeypatch.setattr(llm_helper, "prefix_cache", prefix_cache)
+    return stub
+
+
+def test_simulated_cache_reports_reads_after_first_call(monkeypatch):
+    _use_stub(monkeypatch, SimulatedPrefixCache())
+    context = shared_context({"api_spec": "{\"paths\": {\"/todos\": {}}}" * 20, "architecture_plan": "FastAPI"})
+
+    with track_usage() as usage:
+        first = llm_helper.invoke_llm_json("Backend dev", "generate", agent="backend", context=context)
+        written = usage["cached_input_tokens"]
+        llm_helper.invoke_llm_json("Backend dev", "fix error 1", agent="backend", context=context)
+        llm_helper.invoke_llm_json("Backend dev", "fix error 2", agent="backend", context=context)
+
+    assert first == {"main.py": "x = 1"}
+    assert written == 0
+    assert usage["cached_input_tokens"] > 0
+    assert usage["cached_input_tokens"] < usage["input_tokens"]
+
+
+def test_prefix_off_sends_context_in_system_message(monkeypatch):
+    stub = _use_stub(monkeypatch, PrefixCache())
+    seen = []
+    answer = stub._answer
+    monkeypatch.setattr(stub, "_answer", lambda input: seen.append(input.to_messages()) or answer(input))
+
+    llm_helper.invoke_llm_json("Backend dev", "delta only", context="API Contract:\nspec")
+
+    system, user = seen[0]
+    assert system.content == "Backend dev\n\nAPI Contract:\nspec"
+    assert user.content == "delta only"
+
+
+def test_gemini_cache_binds_cached_content_and_drops_system_message():
+    class Caches:
+        created = []
+
+        def create(self, model, config):
+            self.created.append((model, config.system_instruction))
+            return type("Cache", (), {"name": f"cachedContents/{len(self.created)}"})()
+
+    class FakeGemini:
+        client = type("Client", (), {"caches": Caches()})()
+
+        def bind(self, **kwargs):
+            return ("bound", kwargs)
+
+    cache = GeminiPrefixCache(min_tokens=10)
+    llm = FakeGemini()
+    prefix = "system prompt " * 20
+
+    assert cache.prepare(llm, "gemini-2.5-flash", "short") == (llm, True, {})
+    bound, send_prefix, info = cache.prepare(llm, "gemini-2.5-flash", prefix)
+    assert bound == ("bound", {"cached_content": "cachedContents/1"})
+    assert send_prefix is False and info == {"prefix_cache": "write"}
+    assert cache.prepare(llm, "gemini-2.5-flash", prefix)[2] == {"prefix_cache": "hit"}
+    assert len(Caches.created) == 1
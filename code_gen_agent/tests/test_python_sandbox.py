@@ -0,0 +1,51 @@
+import os
+
+from src.utils.python_sandbox import PythonSandbox
+
+
+def test_only_changed_files_are_rewritten_and_revalidated(tmp_path):
+    out = str(tmp_path / "sandbox")
+    sandbox = PythonSandbox(out)
+    sandbox.save_generated_files({}, {"main.py": "x = 1\n", "bad.py": "def (\n"}, {})
+    first = sandbox.run_tests()
+    assert set(first["backend_syntax_errors"]) == {"bad.py"}
+    assert first["incremental"] == {"revalidated": 2, "cached": 0}
+
+    sandbox = PythonSandbox(out)
+    sandbox.save_generated_files({}, {"main.py": "x = 2\n", "bad.py": "def (\n"}, {})
+    assert sandbox.changed_files == {"backend/main.py"}
+    second = sandbox.run_tests()
+    assert set(second["backend_syntax_errors"]) == {"bad.py"}
+    assert second["incremental"] == {"revalidated": 1, "cached": 1}
+
+
+def test_files_missing_from_state_are_deleted(tmp_path):
+    out = str(tmp_path / "sandbox")
+    sandbox = PythonSandbox(out)
+    sandbox.save_generated_files({"src/App.js": "x"}, {"bad.py": "def (\n"}, {})
+
+    sandbox = PythonSandbox(out)
+    sandbox.save_generated_files({}, {"main.py": "x = 1\n"}, {})
+
+    assert sandbox.removed_files == {"frontend/src/App.js", "backend/bad.py"}
+    assert not os.path.exists(os.path.join(out, "backend", "bad.py"))
+    assert not os.path.exists(os.path.join(out, "frontend"))
+    assert sandbox.run_tests()["backend_syntax_errors"] == {}
+
+
+def test_static_checkers_cover_every_language(tmp_path):
+    sandbox = PythonSandbox(str(tmp_path / "sandbox"))
+    sandbox.save_generated_files(
+        {"package.json": "{\"name\": }", "src/App.jsx": "const App = () => (<p>Don't</p>;\n"},
+        {"main.py": "x = 1\n"},
+        {"docker-compose.yml": "services:\n  web:\n    image: app:1\n", "backend/Dockerfile": "RUN apt-get install curl\n"},
+    )
+
+    checks = sandbox.run_tests()["file_checks"]
+
+    assert checks["frontend/package.json"][0]["checker"] == "json"
+    assert checks["frontend/src/App.jsx"][0]["message"] == "Unclosed '('"
+    assert any("FROM" in issue["message"] for issue in checks["infra/backend/Dockerfile"])
+    assert any("-y" in issue["message"] for issue in checks["infra/backend/Dockerfile"])
+    assert "infra/docker-compose.yml" not in checks
+    assert "backend/main.py" not in checks
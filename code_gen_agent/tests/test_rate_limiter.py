@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+import pytest
+
+from src.utils import llm_helper, telemetry
+from src.utils.llm_providers import StubChatModel
+from src.utils.rate_limiter import (
+    RateLimiter, RetryPolicy, TokenBucket, call_with_retry, acall_with_retry, is_retryable, retry_after,
+)
+
+
+class QuotaError(Exception):
+    def __init__(self, message, status_code=429):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def test_bucket_queues_callers_once_burst_is_spent():
+    bucket = TokenBucket(rate_per_min=60, capacity=2)  # 1 per second
+    t0 = bucket.updated
+    assert bucket.reserve(1, now=t0) == 0
+    assert bucket.reserve(1, now=t0) == 0
+    assert bucket.reserve(1, now=t0) == pytest.approx(1.0)
+    assert bucket.reserve(1, now=t0) == pytest.approx(2.0)
+    assert bucket.reserve(1, now=t0 + 3) == pytest.approx(0.0)
+    # Oversized requests are clamped to the bucket size instead of waiting forever
+    big = TokenBucket(60, capacity=10)
+    assert big.reserve(1000, now=big.updated) == 0
+
+
+def test_limiter_reports_queue_wait():
+    limiter = RateLimiter(requests_per_min=600, tokens_per_min=0)
+    limiter.requests.capacity = limiter.requests.balance = 1
+    started = time.perf_counter()
+    waits = [limiter.acquire() for _ in range(3)]
+    assert time.perf_counter() - started >= 0.15
+    assert waits[0] == 0 and waits[1] > 0 and waits[2] > 0
+    stats = limiter.stats()
+    assert stats["acquired"] == 3 and stats["wait_max_s"] == pytest.approx(waits[2], abs=1e-3)
+
+
+def test_retry_classification_and_retry_after():
+    assert is_retryable(QuotaError("quota"))
+    assert is_retryable(TimeoutError())
+    assert not is_retryable(QuotaError("bad request", status_code=400))
+    assert not is_retryable(ValueError("bad json"))
+    assert retry_after(QuotaError("429 RESOURCE_EXHAUSTED ... 'retryDelay': '7s'")) == 7.0
+    assert retry_after(QuotaError("quota")) is None
+    assert RetryPolicy(base_delay=0.01, seed=1).delay(0, retry_after=2.0) == 2.0
+
+
+def test_call_with_retry_recovers_and_gives_up():
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise QuotaError("slow down")
+        return "ok"
+
+    policy = RetryPolicy(max_retries=3, base_delay=0.001)
+    assert call_with_retry(flaky, RateLimiter(), policy) == "ok"
+    assert len(attempts) == 3
+
+    async def always_fails():
+        raise QuotaError("slow down")
+
+    with pytest.raises(QuotaError):
+        asyncio.run(acall_with_retry(always_fails, None, RetryPolicy(max_retries=1, base_delay=0.001)))
+
+
+def test_invoke_llm_json_retries_transient_errors(monkeypatch):
+    stub = StubChatModel(rules=[{"match": "", "response": {"main.py": "x = 1"}}])
+    failures = [QuotaError("429 too many requests")]
+    answer = stub._answer
+
+    def flaky_answer(input):
+        if failures:
+            raise failures.pop()
+        return answer(input)
+
+    monkeypatch.setattr(stub, "_answer", flaky_answer)
+    monkeypatch.setattr(llm_helper, "llm", stub)
+    monkeypatch.setattr(llm_helper, "llm_cache", None)
+    monkeypatch.setattr(llm_helper, "retry_policy", RetryPolicy(max_retries=2, base_delay=0.001))
+    monkeypatch.setattr(telemetry, "_tracer", telemetry.Tracer())
+
+    assert llm_helper.invoke_llm_json("sys", "usr") == {"main.py": "x = 1"}
+    assert not failures
@@ -0,0 +1,109 @@
+import json
+import time
+
+import pytest
+
+from src.utils.error_classifier import classify_sandbox
+from src.utils.runtime_smoke import SmokeTestPool, routes_from_spec, run_smoke_test, smoke_cache_key
+
+SPEC = {
+    "paths": {
+        "/items/{item_id}": {"get": {"parameters": [{"name": "item_id", "in": "path", "schema": {"type": "integer"}}]}},
+        "/items": {
+            "get": {},
+            "post": {"requestBody": {"content": {"application/json": {"schema": {"$ref": "#/components/schemas/Item"}}}}},
+        },
+    },
+    "components": {"schemas": {"Item": {"type": "object", "properties": {"name": {"type": "string"}, "qty": {"type": "integer"}}}}},
+}
+
+# Plain ASGI app, so the test does not depend on FastAPI being installed
+RAW_APP = '''
+import json
+from helpers import divide
+
+async def app(scope, receive, send):
+    if scope["type"] != "http":
+        return
+    await receive()
+    if scope["path"] == "/items/1":
+        divide(1, 0)
+    body = json.dumps({"path": scope["path"]}).encode()
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": body})
+'''
+
+
+def test_routes_from_spec_fills_parameters_and_bodies():
+    routes = routes_from_spec(json.dumps(SPEC))
+    assert [(r["method"], r["path"]) for r in routes] == [("POST", "/items"), ("GET", "/items"), ("GET", "/items/1")]
+    assert routes[0]["body"] == {"name": "string", "qty": 1}
+    assert routes_from_spec("not json") == []
+
+
+def test_crashing_route_fails_with_a_located_error(tmp_path):
+    (tmp_path / "main.py").write_text(RAW_APP)
+    (tmp_path / "helpers.py").write_text("def divide(a, b):\n    return a / b\n")
+
+    result = SmokeTestPool(max_workers=2).run(str(tmp_path), SPEC)
+    assert result["status"] == "failed" and result["import_ok"]
+    by_path = {e["path"]: e for e in result["endpoints"]}
+    assert by_path["/items"]["ok"] and by_path["/items"]["status"] == 200 and "ms" in by_path["/items"]
+    assert not by_path["/items/{item_id}"]["ok"] and "ZeroDivisionError" in by_path["/items/{item_id}"]["error"]
+
+    errors = classify_sandbox({"runtime": result})
+    assert [(e["agent"], e["file"], e["line"]) for e in errors] == [("backend", "helpers.py", 2)]
+    assert errors[0]["instruction"].startswith("GET /items/{item_id} fails at runtime")
+
+
+def test_import_errors_fail_but_missing_packages_skip(tmp_path):
+    (tmp_path / "main.py").write_text("import models\napp = models.build()\n")
+    (tmp_path / "models.py").write_text("def build():\n    return undefined_name\n")
+    result = run_smoke_test(str(tmp_path), {})
+    assert result["status"] == "failed" and "NameError" in result["import_error"]
+    assert classify_sandbox({"runtime": result})[0]["file"] == "models.py"
+
+    (tmp_path / "main.py").write_text("import surely_not_installed_pkg\napp = None\n")
+    skipped = run_smoke_test(str(tmp_path), {})
+    assert skipped["status"] == "skipped" and "surely_not_installed_pkg" in skipped["reason"]
+
+
+def test_hanging_import_is_killed_after_the_timeout(tmp_path):
+    # The backend starts a grandchild; killing the process group stops it too
+    marker = tmp_path / "grandchild_alive"
+    (tmp_path / "grandchild.py").write_text(f"import time\ntime.sleep(2)\nopen({str(marker)!r}, 'w').close()\n")
+    (tmp_path / "main.py").write_text(
+        "import subprocess, sys, time\n"
+        "subprocess.Popen([sys.executable, 'grandchild.py'])\n"
+        "time.sleep(30)\napp = None\n"
+    )
+    result = run_smoke_test(str(tmp_path), {}, timeout=1, cache_key="hang")
+    assert result["status"] == "failed" and "TimeoutError" in result["import_error"]
+    time.sleep(2.5)
+    assert not marker.exists()
+    assert "cached" not in run_smoke_test(str(tmp_path / "missing"), {}, timeout=1, cache_key="hang")
+
+
+def test_results_are_cached_by_backend_digest(tmp_path):
+    (tmp_path / "main.py").write_text("app = None\n")
+    key = smoke_cache_key({"backend/main.py": "h1"}, SPEC)
+    first = run_smoke_test(str(tmp_path), {}, cache_key=key)
+    (tmp_path / "main.py").write_text("raise SystemExit(3)\n")  # not seen: same digest
+    again = run_smoke_test(str(tmp_path), {}, cache_key=key)
+    assert again["cached"] and again["status"] == first["status"] and "cached" not in first
+    assert key != smoke_cache_key({"backend/main.py": "h2"}, SPEC) != smoke_cache_key({"backend/main.py": "h1"}, {})
+
+
+def test_fastapi_app_reports_unimplemented_routes(tmp_path):
+    pytest.importorskip("fastapi")
+    (tmp_path / "main.py").write_text(
+        "from fastapi import FastAPI\nfrom pydantic import BaseModel\n\napp = FastAPI()\n\n"
+        "class Item(BaseModel):\n    name: str\n    qty: int\n\nITEMS = []\n\n"
+        "@app.post('/items')\ndef create(item: Item):\n    ITEMS.append(item)\n    return item\n\n"
+        "@app.get('/items')\ndef list_items():\n    return ITEMS\n"
+    )
+    result = run_smoke_test(str(tmp_path), SPEC)
+    by_path = {e["path"]: e for e in result["endpoints"]}
+    assert by_path["/items"]["ok"]
+    assert by_path["/items/{item_id}"]["error"].startswith("route not implemented")
+    assert "has no handler" in classify_sandbox({"runtime": result})[0]["instruction"]
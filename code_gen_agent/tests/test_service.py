@@ -0,0 +1,126 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from src.job_client import JobClient, JobServiceError
+from src.service import JobService
+
+
+@pytest.fixture
+def client(stub_graph):
+    from src.core.graph import create_graph
+
+    graph, _ = stub_graph()
+    graphs = {False: graph, True: create_graph(graph.checkpointer, auto=True)}
+    service = JobService(workers=2, graphs=graphs)
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(service.start("127.0.0.1", 0))
+    port = server.sockets[0].getsockname()[1]
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    job_client = JobClient(f"http://127.0.0.1:{port}", timeout=10)
+    job_client.service = service
+    yield job_client
+
+    async def shutdown():
+        server.close()
+        await service.stop()
+
+    asyncio.run_coroutine_threadsafe(shutdown(), loop).result(10)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(10)
+
+
+def test_job_pauses_for_review_and_resumes_with_feedback(client):
+    job = client.submit("todo app")
+    assert job["status"] == "queued"
+
+    events = list(client.stream(job["id"], poll_interval=0.05))
+    nodes = {node for mode, chunk in events if mode == "updates" for node in chunk}
+    assert {"architect", "backend", "frontend", "sandbox"} <= nodes
+
+    done = client.wait(job["id"], timeout=30, poll_interval=0.05)
+    assert done["status"] == "done" and done["result"]["paused_before"] == ["reflector"]
+    state = client.thread_state(job["thread_id"])
+    assert state["backend_files"]["backend/main.py"].startswith("from fastapi")
+
+    resumed = client.wait(client.feedback(job["thread_id"], "success")["id"], timeout=30, poll_interval=0.05)
+    assert resumed["status"] == "done" and resumed["result"]["paused_before"] == []
+
+
+def test_workers_run_auto_jobs_on_separate_threads(client):
+    jobs = [client.submit(f"story {i}", auto=True) for i in range(3)]
+    finished = [client.wait(job["id"], timeout=30, poll_interval=0.05) for job in jobs]
+
+    assert len({job["thread_id"] for job in finished}) == 3
+    assert all(job["status"] == "done" and job["result"]["sandbox_status"] == "SUCCESS" for job in finished)
+    assert client.health()["running"] == 0
+    # Idle threads do not keep their lock
+    assert client.service._thread_locks == {} and client.service._lock_users == {}
+
+
+def test_errors_are_reported_as_http_statuses(client):
+    with pytest.raises(JobServiceError, match="400"):
+        client.submit("   ")
+    with pytest.raises(JobServiceError, match="404"):
+        client.job("missing")
+    assert client.thread_state("no-such-thread") is None
+
+
+def test_thread_ids_cannot_leave_the_sandbox_root(client, tmp_path):
+    for bad in ("../escape", "/etc", "a" * 65, "x/y"):
+        with pytest.raises(JobServiceError, match="400"):
+            client.submit("todo app", thread_id=bad)
+    with pytest.raises(JobServiceError, match="400"):
+        client.feedback("..", "success")
+    assert client.submit("todo app", thread_id="user_1-a")["thread_id"] == "user_1-a"
+
+    service = JobService(graphs={}, sandbox_root=str(tmp_path / "boxes"))
+    assert service.sandbox_dir("t1") == str(tmp_path / "boxes" / "t1")
+    with pytest.raises(ValueError):
+        service.sandbox_dir("..")
+
+
+def test_malformed_numbers_are_rejected_with_400(client):
+    import http.client
+    from urllib.parse import urlsplit
+
+    job = client.submit("story", auto=True)
+    with pytest.raises(JobServiceError, match="400"):
+        client.events(job["id"], after="x")
+
+    parts = urlsplit(client.base_url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=10)
+    conn.putrequest("POST", "/jobs")
+    conn.putheader("Content-Length", "ten")
+    conn.endheaders()
+    assert conn.getresponse().status == 400
+    conn.close()
+    client.wait(job["id"], timeout=30, poll_interval=0.05)
+
+
+def _run_to_idle(client, story):
+    job = client.wait(client.submit(story, auto=True)["id"], timeout=30, poll_interval=0.05)
+    # The worker touches the registry once more after the job is marked done
+    deadline = time.time() + 10
+    while client.service._lock_users and time.time() < deadline:
+        time.sleep(0.02)
+    return job
+
+
+def test_released_threads_lose_their_sandbox_and_come_back_on_demand(client):
+    client.service.threads.max_threads = 1
+    first = _run_to_idle(client, "story 1")
+    sandbox = client.service.sandbox_dir(first["thread_id"])
+    assert os.path.isdir(sandbox)
+
+    _run_to_idle(client, "story 2")
+    assert first["thread_id"] not in client.service.threads
+    assert not os.path.exists(sandbox)
+
+    # The spilled thread is loaded back for a state query
+    state = client.thread_state(first["thread_id"])
+    assert state["backend_files"]["backend/main.py"].startswith("from fastapi")
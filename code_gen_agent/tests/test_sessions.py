@@ -0,0 +1,137 @@
+from typing import Annotated, Dict, TypedDict
+
+import os
+
+import pytest
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, StateGraph
+
+from src.core.checkpointer import create_checkpointer
+from src.core.sessions import ThreadRegistry, new_thread_id
+from src.core.state import merge_files
+from src.utils.blob_store import compute_digest, get_blob_store
+from src.utils.code_exporter import get_run_log
+
+
+@pytest.fixture(autouse=True)
+def blob_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("AUTODEV_BLOB_DIR", str(tmp_path / "blobs"))
+
+
+class State(TypedDict):
+    count: int
+
+
+class FilesState(TypedDict):
+    backend_files: Annotated[Dict[str, str], merge_files]
+    text: str
+
+
+def _graph(checkpointer):
+    workflow = StateGraph(State)
+    workflow.add_node("step", lambda s: {"count": s["count"] + 1})
+    workflow.set_entry_point("step")
+    workflow.add_edge("step", END)
+    return workflow.compile(checkpointer=checkpointer)
+
+
+def _run(graph, thread_id):
+    config = {"configurable": {"thread_id": thread_id}}
+    graph.invoke({"count": 0}, config)
+    return config
+
+
+def test_least_recently_used_threads_leave_memory():
+    saver = MemorySaver()
+    graph, registry = _graph(saver), ThreadRegistry(saver, max_threads=2, idle_ttl=0, spill_db="")
+    ids = [new_thread_id() for _ in range(3)]
+    assert len(set(ids)) == 3
+    configs = {}
+    for thread_id in ids[:2]:
+        configs[thread_id] = _run(graph, thread_id)
+        registry.touch(thread_id)
+    registry.touch(ids[0])  # ids[1] is now the least recently used
+
+    configs[ids[2]] = _run(graph, ids[2])
+    assert registry.touch(ids[2]) == [ids[1]]
+    assert ids[1] not in registry and len(registry) == 2
+    assert graph.get_state(configs[ids[1]]).values == {}
+    assert graph.get_state(configs[ids[0]]).values == {"count": 1}
+
+
+def test_idle_threads_expire_after_the_ttl():
+    now = [0.0]
+    saver = MemorySaver()
+    graph, registry = _graph(saver), ThreadRegistry(saver, max_threads=0, idle_ttl=60, clock=lambda: now[0], spill_db="")
+    idle = _run(graph, "idle")
+    registry.touch("idle")
+    now[0] = 30
+    registry.touch("active")
+    now[0] = 70
+    assert registry.touch("active") == ["idle"]
+    assert graph.get_state(idle).values == {} and registry.evicted == 1
+
+    registry.release("active")
+    assert len(registry) == 0 and registry.evicted == 2
+
+
+def test_durable_checkpointer_keeps_released_threads(tmp_path):
+    pytest.importorskip("langgraph.checkpoint.sqlite")
+    saver = create_checkpointer(str(tmp_path / "threads.db"))
+    graph, registry = _graph(saver), ThreadRegistry(saver, max_threads=1, idle_ttl=0)
+    first = _run(graph, "first")
+    registry.touch("first")
+    assert registry.durable and registry.spill is None and registry.touch("second") == ["first"]
+    assert graph.get_state(first).values == {"count": 1}
+
+
+def test_released_memory_threads_are_spilled_and_restored(tmp_path):
+    pytest.importorskip("langgraph.checkpoint.sqlite")
+    saver = MemorySaver()
+    graph = _graph(saver)
+    registry = ThreadRegistry(saver, max_threads=1, idle_ttl=0, spill_db=str(tmp_path / "spill.db"))
+    first = _run(graph, "first")
+    registry.touch("first")
+    run_log = get_run_log("output", "first")
+
+    assert registry.touch("second") == ["first"]
+    assert "first" not in saver.storage and graph.get_state(first).values == {}
+    assert get_run_log("output", "first") is not run_log
+
+    registry.touch("first")
+    assert graph.get_state(first).values == {"count": 1}
+    assert len(list(graph.get_state_history(first))) == 3
+    assert registry.spill.get_tuple(first) is None
+    graph.invoke(None, first)  # the restored thread keeps running
+
+
+def test_released_threads_free_their_blobs():
+    store = get_blob_store()
+    saver = MemorySaver()
+    workflow = StateGraph(FilesState)
+    workflow.add_node("step", lambda s: {"backend_files": store.put_files({"main.py": s["text"]})})
+    workflow.set_entry_point("step")
+    workflow.add_edge("step", END)
+    graph, registry = workflow.compile(checkpointer=saver), ThreadRegistry(saver, max_threads=1, idle_ttl=0, gc_interval=0, spill_db="")
+
+    for thread_id in ("old", "new"):
+        graph.invoke({"text": f"{thread_id} project"}, {"configurable": {"thread_id": thread_id}})
+    for root, _, names in os.walk(store.root):
+        for name in names:
+            os.utime(os.path.join(root, name), (0, 0))  # older than the gc grace period
+    registry.touch("old")
+
+    assert registry.touch("new") == ["old"]
+    current = graph.get_state({"configurable": {"thread_id": "new"}}).values["backend_files"]["main.py"]
+    assert store.get(current) == "new project" and not store.contains(compute_digest("old project"))
+
+
+def test_threads_in_use_are_kept_and_released_ones_cleaned_up():
+    busy, cleaned = {"a"}, []
+    registry = ThreadRegistry(MemorySaver(), max_threads=1, idle_ttl=0, spill_db="",
+                              in_use=busy.__contains__, on_release=cleaned.append)
+    registry.touch("a")
+    assert registry.touch("b") == [] and len(registry) == 2
+
+    busy.clear()
+    assert registry.touch("b") == ["a"] and cleaned == ["a"]
@@ -0,0 +1,96 @@
+import asyncio
+import json
+
+import pytest
+
+from src.utils import llm_helper, telemetry
+from src.utils.llm_providers import StubChatModel
+from src.utils.telemetry import JsonlExporter, OtlpJsonFileExporter, Tracer, format_summary, traced
+
+
+class ListExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+
+@pytest.fixture
+def tracer(monkeypatch):
+    exporter = ListExporter()
+    tracer = Tracer([exporter])
+    monkeypatch.setattr(telemetry, "_tracer", tracer)
+    tracer.exported = exporter.spans
+    return tracer
+
+
+def test_spans_nest_and_record_errors(tracer):
+    with tracer.run("graph", summary=False) as root:
+        with tracer.span("frontend", kind="node") as node:
+            telemetry.increment("retries")
+            telemetry.increment("retries")
+        with pytest.raises(ValueError):
+            with tracer.span("backend", kind="node"):
+                raise ValueError("boom")
+
+    frontend, backend, run = tracer.exported
+    assert frontend.parent_id == root.span_id and frontend.trace_id == root.trace_id
+    assert frontend.attributes["retries"] == 2
+    assert backend.status == "error" and "boom" in backend.attributes["error"]
+    assert run is root and node.end_ns >= node.start_ns
+
+
+def test_traced_wraps_sync_and_async_nodes(tracer):
+    def node(state, config=None):
+        return {"seen": config}
+
+    async def anode(state):
+        return {"ok": True}
+
+    assert traced("n", node)({}, config={"x": 1}) == {"seen": {"x": 1}}
+    assert asyncio.run(traced("a", anode)({})) == {"ok": True}
+    assert [(s.kind, s.name) for s in tracer.exported] == [("node", "n"), ("node", "a")]
+
+
+def test_llm_span_attributes_and_summary(tracer, monkeypatch):
+    stub = StubChatModel(rules=[{"match": "", "response": "not json"}])
+    monkeypatch.setattr(llm_helper, "llm", stub)
+    monkeypatch.setattr(llm_helper, "llm_cache", None)
+
+    with tracer.run("graph", summary=False):
+        assert llm_helper.invoke_llm_json("sys", "usr", agent="backend") == {}
+
+    llm_span = next(s for s in tracer.exported if s.kind == "llm")
+    assert llm_span.name == "backend"
+    assert llm_span.attributes["parse_error"] is True
+    assert llm_span.attributes["output_tokens"] > 0
+
+    table = format_summary(tracer.exported)
+    assert "llm:backend" in table and "1 LLM calls" in table
+
+
+def test_file_exporters(tmp_path):
+    tracer = Tracer([JsonlExporter(str(tmp_path / "spans.jsonl")), OtlpJsonFileExporter(str(tmp_path / "otlp.jsonl"))])
+    with tracer.span("architect", kind="llm", input_tokens=3, cache_hit=True):
+        pass
+
+    record = json.loads((tmp_path / "spans.jsonl").read_text())
+    assert record["name"] == "architect" and record["attributes"]["input_tokens"] == 3
+
+    otlp = json.loads((tmp_path / "otlp.jsonl").read_text())
+    span = otlp["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+    assert len(span["traceId"]) == 32 and len(span["spanId"]) == 16
+    attributes = {a["key"]: a["value"] for a in span["attributes"]}
+    assert attributes["autodev.input_tokens"] == {"intValue": "3"}
+    assert attributes["autodev.cache_hit"] == {"boolValue": True}
+
+
+def test_span_files_are_opt_in(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with telemetry.get_tracer().span("architect"):
+        pass
+    assert telemetry.get_tracer().exporters == [] and list(tmp_path.iterdir()) == []
+
+    monkeypatch.setenv("AUTODEV_TRACE_FILE", str(tmp_path / "spans.jsonl"))
+    assert isinstance(telemetry.tracer_from_env().exporters[0], JsonlExporter)
@@ -0,0 +1,78 @@
+from src.agents.repair import _restore_elided, plan_repair
+from src.utils.token_budget import PromptBudget, outline
+
+
+def test_python_outline_keeps_signatures_only():
+    source = (
+        "import os\n\n"
+        "@app.get('/items')\n"
+        "async def list_items(limit: int = 10) -> list:\n"
+        "    \"\"\"List items.\"\"\"\n"
+        "    return [os.sep] * limit\n\n"
+        "class Item(BaseModel):\n"
+        "    name: str\n"
+        "    def total(self, qty):\n"
+        "        return qty\n"
+    )
+    text = outline("backend/main.py", source)
+    assert "async def list_items(limit: int = 10) -> list:" in text
+    assert "@app.get('/items')" in text and "name: str" in text
+    assert "return" not in text
+
+
+def test_script_outline_skips_bodies_strings_and_comments():
+    source = (
+        "import React from 'react';\n"
+        "// function ignored() {\n"
+        "const API = '/api/{id}';\n"
+        "export default function App({ items }) {\n"
+        "  const hidden = 1;\n"
+        "  return items;\n"
+        "}\n"
+    )
+    lines = outline("frontend/src/App.jsx", source).splitlines()[1:]
+    assert lines == [
+        "import React from 'react';",
+        "const API = '/api/{id}';",
+        "export default function App({ items }) { ... }",
+    ]
+
+
+def test_budget_outlines_unrelated_files_and_caps_errors():
+    files = {
+        "main.py": "def broken(:\n    pass\n",
+        "big.py": "".join(f"def f{i}(x):\n    return x * {i}\n" for i in range(300)),
+        "huge.py": "".join(f"V{i} = {i}\n" for i in range(4000)),
+    }
+    errors = [{"agent": "backend", "instruction": "x" * 2000, "file": "main.py"}] * 3
+    budget = PromptBudget(max_tokens=3000, agent="backend")
+    kept = budget.fit_errors(errors)
+    assert len(kept[0]["instruction"]) < 700
+
+    shown, elided = budget.fit_files(files, ["main.py"])
+    assert shown["main.py"] == files["main.py"]
+    assert shown["big.py"].startswith("[outline:")
+    assert "huge.py" not in shown and set(elided) == {"big.py", "huge.py"}
+    assert {t["action"] for t in budget.trimmed} >= {"outlined", "omitted", "shortened instruction"}
+
+
+def test_full_repair_restores_elided_files(monkeypatch):
+    monkeypatch.setenv("AUTODEV_REPAIR_MODE", "full")
+    monkeypatch.setenv("AUTODEV_REPAIR_MAX_TOKENS_BACKEND", "500")
+    files = {"main.py": "x = (\n", "other.py": "y = 1\n" * 2000}
+    plan = plan_repair(files, [{"agent": "backend", "instruction": "Fix main.py", "file": "main.py"}], agent="backend")
+    assert "y = 1" not in plan["prompt"] and "other.py" in plan["prompt"]
+    assert _restore_elided(plan, {"main.py": "x = ()\n"}) == {"other.py": files["other.py"], "main.py": "x = ()\n"}
+
+
+def test_files_named_by_errors_are_never_elided(monkeypatch):
+    files = {"a.py": "A = 1\n" * 400, "b.py": "B = 2\n" * 400, "c.py": "C = 3\n" * 400}
+    budget = PromptBudget(max_tokens=500, agent="backend")
+    shown, elided = budget.fit_files(files, ["a.py", "b.py"])
+    assert shown["a.py"] == files["a.py"] and shown["b.py"] == files["b.py"]
+    assert set(elided) == {"c.py"}
+
+    monkeypatch.setenv("AUTODEV_REPAIR_MODE", "full")
+    monkeypatch.setenv("AUTODEV_REPAIR_MAX_TOKENS_BACKEND", "500")
+    plan = plan_repair(files, [{"agent": "backend", "instruction": "Server crashed", "file": ""}], agent="backend")
+    assert "need no changes" not in plan["prompt"] and "kept as they are" in plan["prompt"]
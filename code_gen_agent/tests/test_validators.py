@@ -0,0 +1,72 @@
+from src.utils import validators
+from src.utils.validators import ValidationEngine, check_dockerfile, check_script
+
+
+def test_script_checker_skips_literals_comments_and_jsx_text():
+    source = (
+        "// a ( comment\n"
+        "const re = /[)]/g;\n"
+        "const s = 'a { string';\n"
+        "const t = `x ${items.map((i) => `${i}`)} y`;\n"
+        "export default () => (<p>Don't {name}</p>);\n"
+    )
+    assert check_script("App.jsx", source) == []
+
+
+def test_script_checker_reports_line_of_mismatch():
+    issues = check_script("app.js", "function f() {\n  return [1, 2);\n}\n")
+    assert issues[0]["line"] == 2
+    assert issues[0]["severity"] == "error"
+
+
+def test_dockerfile_rules():
+    messages = [i["message"] for i in check_dockerfile("Dockerfile", "FROM node\nADD . /app\nCMD x\nCMD y\n")]
+    assert any("Pin a version" in m for m in messages)
+    assert any("COPY instead of ADD" in m for m in messages)
+    assert any("Multiple CMD" in m for m in messages)
+
+
+def test_parallel_engine_matches_serial_results():
+    files = {f"pkg/mod_{i}.py": ("x = (\n" if i % 3 == 0 else "x = 1\n") for i in range(12)}
+    files["data.json"] = "{bad json}"
+    files["README.md"] = "no checker for this one"
+
+    serial = ValidationEngine(max_workers=1).validate(files)
+    engine = ValidationEngine(max_workers=2, parallel_threshold=1)
+    try:
+        parallel = engine.validate(files)
+        # Workers are never forked from the (threaded) parent
+        assert engine._pool._mp_context.get_start_method() in ("forkserver", "spawn")
+    finally:
+        engine.shutdown()
+
+    assert parallel == serial
+    assert "README.md" not in serial
+    assert sum(1 for issues in serial.values() if issues) == 5
+
+
+def check_todo(path, content):
+    return [{"file": path, "line": None, "checker": "todo", "severity": "warning", "message": "TODO left"}] if "TODO" in content else []
+
+
+def test_checkers_registered_at_runtime_reach_the_workers(monkeypatch):
+    monkeypatch.setattr(validators, "CHECKERS", list(validators.CHECKERS))
+    validators.register_checker("todo", lambda path: path.endswith(".txt"), check_todo)
+    validators.register_checker("local", lambda path: path.endswith(".txt"), lambda path, content: [])
+    files = {f"notes/{i}.txt": "TODO: write" for i in range(4)}
+
+    engine = ValidationEngine(max_workers=2, parallel_threshold=1)
+    try:
+        parallel = engine.validate(files)
+    finally:
+        engine.shutdown()
+    assert parallel == ValidationEngine(max_workers=1).validate(files)
+    assert all(issues[0]["checker"] == "todo" for issues in parallel.values())
+
+    # A picklable registry runs in the pool
+    monkeypatch.setattr(validators, "CHECKERS", validators.CHECKERS[:-1])
+    engine = ValidationEngine(max_workers=2, parallel_threshold=1)
+    try:
+        assert engine.validate(files) == parallel and engine._pool is not None
+    finally:
+        engine.shutdown()
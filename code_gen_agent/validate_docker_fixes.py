@@ -5,7 +5,6 @@ Verifies all fixes are working correctly without Docker
 """
 
 import sys
-import json
 from pathlib import Path
 
 def validate_no_emojis():
@@ -82,7 +81,7 @@ def validate_sandbox_integration():
             print("[FAIL] sandbox_logs not in result")
             return False
         
-        logs = json.loads(result["sandbox_logs"])
+        logs = result["sandbox_logs"]
         if "status" not in logs:
             print("[FAIL] No status in sandbox logs")
             return False
@@ -105,13 +104,8 @@ def validate_state_schema():
         # Get type hints
         hints = typing.get_type_hints(GraphState)
         
-        # Check for sandbox_logs (should not exist)
-        if 'sandbox_logs' in hints:
-            print("[FAIL] sandbox_logs field should not exist in GraphState")
-            return False
-        
-        # Check for required fields
-        required = ['messages', 'user_story', 'frontend_files', 'backend_files']
+        # Check for required fields (sandbox_logs carries the sandbox results to the reflector)
+        required = ['messages', 'user_story', 'frontend_files', 'backend_files', 'sandbox_logs']
         for field in required:
             if field not in hints:
                 print(f"[FAIL] Missing required field: {field}")